@@ -1,24 +1,30 @@
 """Provide methods to bootstrap a Home Assistant instance."""
+import asyncio
 import logging
 import logging.handlers
 import os
 import sys
 from time import time
+from timeit import default_timer as timer
 from collections import OrderedDict
 
-from typing import Any, Optional, Dict
+from typing import Any, Optional, Dict, List, Set
 
 import voluptuous as vol
 
 from homeassistant import (
-    core, config as conf_util, config_entries, components as core_components)
+    core, config as conf_util, config_entries, components as core_components,
+    loader)
 from homeassistant.components import persistent_notification
 from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
 from homeassistant.setup import async_setup_component
+from homeassistant.util.json import save_json
 from homeassistant.util.logging import AsyncHandler
 from homeassistant.util.package import async_get_user_site, is_virtual_env
 from homeassistant.util.yaml import clear_secret_cache
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_per_platform
+from homeassistant.profiler import DATA_PROFILER, PROFILE_FILE, StartupProfiler
 from homeassistant.helpers.signal import async_register_signal_handling
 
 _LOGGER = logging.getLogger(__name__)
@@ -28,6 +34,16 @@ ERROR_LOG_FILENAME = 'home-assistant.log'
 # hass.data key for logging information.
 DATA_LOGGING = 'logging'
 
+# hass.data key for the setup times of the components during startup.
+DATA_STARTUP_TIMELINE = 'startup_timeline'
+
+# File in the config dir the startup timeline is written to when startup
+# is profiled
+STARTUP_TIMELINE_FILE = '.startup_timeline.json'
+
+# Number of slowest component setups that are logged after startup
+STARTUP_TIMELINE_LOG_COUNT = 5
+
 FIRST_INIT_COMPONENT = {'system_log', 'recorder', 'mqtt', 'mqtt_eventstream',
                         'logger', 'introduction', 'frontend', 'history'}
 
@@ -102,6 +118,9 @@ async def async_from_config_dict(config: Dict[str, Any],
                       "Further initialization aborted")
         return None
 
+    if hass.config.profile_startup:
+        hass.data[DATA_PROFILER] = StartupProfiler()
+
     await hass.async_add_executor_job(
         conf_util.process_ha_config_upgrade, hass)
 
@@ -130,6 +149,10 @@ async def async_from_config_dict(config: Dict[str, Any],
                      if key != core.DOMAIN)
     components.update(hass.config_entries.async_domains())
 
+    if hass.config.preload_components:
+        await loader.async_preload_components(
+            hass, _configured_components(config, components))
+
     # setup components
     res = await core_components.async_setup(hass, config)
     if not res:
@@ -141,21 +164,14 @@ async def async_from_config_dict(config: Dict[str, Any],
 
     _LOGGER.info("Home Assistant core initialized")
 
-    # stage 1
-    for component in components:
-        if component not in FIRST_INIT_COMPONENT:
-            continue
-        hass.async_create_task(async_setup_component(hass, component, config))
+    await _async_setup_components(hass, config, components)
 
     await hass.async_block_till_done()
 
-    # stage 2
-    for component in components:
-        if component in FIRST_INIT_COMPONENT:
-            continue
-        hass.async_create_task(async_setup_component(hass, component, config))
-
-    await hass.async_block_till_done()
+    if DATA_PROFILER in hass.data:
+        await _async_save_startup_profile(
+            hass, hass.data[DATA_PROFILER],
+            hass.data.get(DATA_STARTUP_TIMELINE, []))
 
     stop = time()
     _LOGGER.info("Home Assistant initialized in %.2fs", stop-start)
@@ -164,6 +180,151 @@ async def async_from_config_dict(config: Dict[str, Any],
     return hass
 
 
+async def _async_setup_components(hass: core.HomeAssistant,
+                                  config: Dict[str, Any],
+                                  components: Set[str]) -> None:
+    """Set up the components as soon as their dependencies are set up.
+
+    The components in FIRST_INIT_COMPONENT and their dependencies are set up
+    before all other components. At most hass.config.setup_concurrency
+    components are set up at once. The time every component waited and took
+    to set up is stored in the startup timeline.
+    """
+    graph = _dependency_graph(hass, components)
+    first = _dependency_closure(graph, components & FIRST_INIT_COMPONENT)
+
+    for name, dependencies in graph.items():
+        if name not in first:
+            dependencies.update(first)
+
+    semaphore = asyncio.Semaphore(
+        hass.config.setup_concurrency or len(graph) or 1, loop=hass.loop)
+    tasks = {}  # type: Dict[str, asyncio.Task]
+    timeline = hass.data[DATA_STARTUP_TIMELINE] = []  # type: List[Dict]
+    begin = timer()
+
+    async def setup_when_ready(name: str) -> bool:
+        """Set up a component after its dependencies."""
+        if graph[name]:
+            await asyncio.wait([tasks[dep] for dep in graph[name]],
+                               loop=hass.loop)
+        ready = timer()
+
+        async with semaphore:
+            start = timer()
+            result = await async_setup_component(hass, name, config)
+            end = timer()
+
+        timeline.append({
+            'component': name,
+            'dependencies': sorted(graph[name]),
+            'wait_dependencies': ready - begin,
+            'wait_concurrency': start - ready,
+            'setup': end - start,
+            'success': result,
+        })
+        return result
+
+    for name in graph:
+        tasks[name] = hass.async_create_task(setup_when_ready(name))
+
+    if tasks:
+        await asyncio.wait(list(tasks.values()), loop=hass.loop)
+
+    _log_startup_timeline(timeline)
+
+
+def _dependency_graph(hass: core.HomeAssistant,
+                      components: Set[str]) -> Dict[str, Set[str]]:
+    """Return the dependencies of the components and their dependencies.
+
+    Components that can't be loaded or whose dependencies can't be resolved
+    get no dependencies, their setup fails and reports the error.
+    """
+    graph = {}  # type: Dict[str, Set[str]]
+    to_resolve = list(components)
+
+    while to_resolve:
+        name = to_resolve.pop()
+
+        if name in graph:
+            continue
+
+        component = loader.get_component(hass, name)
+        dependencies = set(getattr(component, 'DEPENDENCIES', []))
+
+        if component is None or \
+                dependencies & loader.DEPENDENCY_BLACKLIST or \
+                not loader.load_order_component(hass, name):
+            graph[name] = set()
+            continue
+
+        graph[name] = dependencies
+        to_resolve.extend(dependencies)
+
+    return graph
+
+
+def _dependency_closure(graph: Dict[str, Set[str]],
+                        components: Set[str]) -> Set[str]:
+    """Return the components and all their dependencies."""
+    closure = set()  # type: Set[str]
+    to_resolve = list(components)
+
+    while to_resolve:
+        name = to_resolve.pop()
+
+        if name not in closure:
+            closure.add(name)
+            to_resolve.extend(graph[name])
+
+    return closure
+
+
+def _log_startup_timeline(timeline: List[Dict]) -> None:
+    """Log the slowest component setups of the startup timeline."""
+    slowest = sorted(timeline, key=lambda entry: entry['setup'],
+                     reverse=True)[:STARTUP_TIMELINE_LOG_COUNT]
+
+    if slowest:
+        _LOGGER.info("Slowest component setups: %s", ', '.join(
+            '{} ({:.2f}s, waited {:.2f}s)'.format(
+                entry['component'], entry['setup'],
+                entry['wait_dependencies'] + entry['wait_concurrency'])
+            for entry in slowest))
+
+
+async def _async_save_startup_profile(hass: core.HomeAssistant,
+                                      profiler: StartupProfiler,
+                                      timeline: List[Dict]) -> None:
+    """Stop profiling and write the profile and the startup timeline."""
+    profiler.finish()
+
+    if hass.config.config_dir is None:
+        return
+
+    for path, data in ((STARTUP_TIMELINE_FILE, timeline),
+                       (PROFILE_FILE, profiler.as_trace())):
+        try:
+            await hass.async_add_executor_job(
+                save_json, hass.config.path(path), data)
+        except HomeAssistantError as err:
+            _LOGGER.warning("Unable to write startup profile: %s", err)
+
+
+def _configured_components(config: Dict[str, Any],
+                           components: Set[str]) -> Set[str]:
+    """Return the components and platforms used in the configuration."""
+    configured = set(components)
+
+    for component in components:
+        for platform, _ in config_per_platform(config, component):
+            if platform is not None:
+                configured.add('{}.{}'.format(component, platform))
+
+    return configured
+
+
 def from_config_file(config_path: str,
                      hass: Optional[core.HomeAssistant] = None,
                      verbose: bool = False,
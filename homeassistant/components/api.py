@@ -17,14 +17,15 @@ from homeassistant.const import (
     EVENT_HOMEASSISTANT_STOP, EVENT_TIME_CHANGED, HTTP_BAD_REQUEST,
     HTTP_CREATED, HTTP_NOT_FOUND, MATCH_ALL, URL_API, URL_API_COMPONENTS,
     URL_API_CONFIG, URL_API_DISCOVERY_INFO, URL_API_ERROR_LOG, URL_API_EVENTS,
-    URL_API_SERVICES, URL_API_STATES, URL_API_STATES_ENTITY, URL_API_STREAM,
-    URL_API_TEMPLATE, __version__)
+    URL_API_SERVICES, URL_API_STARTUP_PROFILE, URL_API_STATES,
+    URL_API_STATES_ENTITY, URL_API_STREAM, URL_API_TEMPLATE, __version__)
 import homeassistant.core as ha
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import template
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.helpers.state import AsyncTrackStates
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import event_to_json
+from homeassistant.profiler import DATA_PROFILER
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,6 +59,9 @@ def setup(hass, config):
     if DATA_LOGGING in hass.data:
         hass.http.register_view(APIErrorLog)
 
+    if DATA_PROFILER in hass.data:
+        hass.http.register_view(APIStartupProfileView)
+
     return True
 
 
@@ -102,7 +106,7 @@ class APIEventStream(HomeAssistantView):
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=JSONEncoder)
+                data = event_to_json(event)
 
             await to_write.put(data)
 
@@ -183,7 +187,9 @@ class APIStatesView(HomeAssistantView):
     @ha.callback
     def get(self, request):
         """Get current states."""
-        return self.json(request.app['hass'].states.async_all())
+        return self.json_encoded('[{}]'.format(', '.join(
+            state.as_json() for state
+            in request.app['hass'].states.async_all())).encode('UTF-8'))
 
 
 class APIEntityStateView(HomeAssistantView):
@@ -197,7 +203,7 @@ class APIEntityStateView(HomeAssistantView):
         """Retrieve state of entity."""
         state = request.app['hass'].states.get(entity_id)
         if state:
-            return self.json(state)
+            return self.json_encoded(state.as_json().encode('UTF-8'))
         return self.json_message("Entity not found.", HTTP_NOT_FOUND)
 
     async def post(self, request, entity_id):
@@ -364,6 +370,23 @@ class APIErrorLog(HomeAssistantView):
         return web.FileResponse(request.app['hass'].data[DATA_LOGGING])
 
 
+class APIStartupProfileView(HomeAssistantView):
+    """View to fetch the durations of the component setups at startup."""
+
+    url = URL_API_STARTUP_PROFILE
+    name = 'api:startup-profile'
+
+    @ha.callback
+    def get(self, request):
+        """Retrieve the startup profile."""
+        profiler = request.app['hass'].data[DATA_PROFILER]
+
+        if request.query.get('format') == 'trace':
+            return self.json(profiler.as_trace())
+
+        return self.json(profiler.as_dict())
+
+
 async def async_services_json(hass):
     """Generate services data to JSONify."""
     descriptions = await async_get_all_descriptions(hass)
@@ -14,7 +14,7 @@ import hashlib
 from random import SystemRandom
 
 import attr
-from aiohttp import web
+from aiohttp import hdrs, web
 import async_timeout
 import voluptuous as vol
 
@@ -60,6 +60,14 @@ _RND = SystemRandom()
 FALLBACK_STREAM_INTERVAL = 1  # seconds
 MIN_STREAM_INTERVAL = 0.5  # seconds
 
+# Seconds a camera image is reused for by default, 0 fetches a new image
+# for every request that does not overlap with a running fetch.
+DEFAULT_IMAGE_CACHE_TTL = 0
+IMAGE_FETCH_TIMEOUT = 10  # seconds
+
+# hass.data key of the StillStreamBroadcasters by image_cb and interval
+DATA_STILL_STREAMS = 'camera_still_streams'
+
 CAMERA_SERVICE_SCHEMA = vol.Schema({
     vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
 })
@@ -81,6 +89,7 @@ class Image:
 
     content_type = attr.ib(type=str)
     content = attr.ib(type=bytes)
+    etag = attr.ib(type=str, default=None)
 
 
 @bind_hass
@@ -146,10 +155,10 @@ async def async_get_image(hass, entity_id, timeout=10):
 
     with suppress(asyncio.CancelledError, asyncio.TimeoutError):
         with async_timeout.timeout(timeout, loop=hass.loop):
-            image = await camera.async_camera_image()
+            image = await camera.async_get_cached_image()
 
             if image:
-                return Image(camera.content_type, image)
+                return image
 
     raise HomeAssistantError('Unable to get image')
 
@@ -165,43 +174,184 @@ async def async_get_mjpeg_stream(hass, request, entity_id):
 async def async_get_still_stream(request, image_cb, content_type, interval):
     """Generate an HTTP MJPEG stream from camera images.
 
+    Requests for the same image_cb and interval share one
+    StillStreamBroadcaster, so the camera is asked for an image once per
+    interval however many clients watch the stream.
+
     This method must be run in the event loop.
     """
-    response = web.StreamResponse()
-    response.content_type = ('multipart/x-mixed-replace; '
-                             'boundary=--frameboundary')
-    await response.prepare(request)
-
-    async def write_to_mjpeg_stream(img_bytes):
-        """Write image to stream."""
-        await response.write(bytes(
-            '--frameboundary\r\n'
-            'Content-Type: {}\r\n'
-            'Content-Length: {}\r\n\r\n'.format(
-                content_type, len(img_bytes)),
-            'utf-8') + img_bytes + b'\r\n')
-
-    last_image = None
-
-    while True:
-        img_bytes = await image_cb()
-        if not img_bytes:
-            break
-
-        if img_bytes != last_image:
-            await write_to_mjpeg_stream(img_bytes)
+    hass = request.app['hass']
+    broadcasters = hass.data.setdefault(DATA_STILL_STREAMS, {})
+    key = (image_cb, content_type, interval)
+    broadcaster = broadcasters.get(key)
+
+    if broadcaster is None:
+        broadcaster = broadcasters[key] = StillStreamBroadcaster(
+            hass, image_cb, content_type, interval)
+
+    subscriber = broadcaster.async_subscribe()
+    first_frame = True
+
+    try:
+        response = web.StreamResponse()
+        response.content_type = ('multipart/x-mixed-replace; '
+                                 'boundary=--frameboundary')
+        await response.prepare(request)
+
+        while True:
+            frame = await subscriber.async_get()
+            if frame is None:
+                break
+
+            await _async_write_frame(response, frame)
 
             # Chrome seems to always ignore first picture,
             # print it twice.
-            if last_image is None:
-                await write_to_mjpeg_stream(img_bytes)
-            last_image = img_bytes
-
-        await asyncio.sleep(interval)
+            if first_frame:
+                await _async_write_frame(response, frame)
+                first_frame = False
+    finally:
+        broadcaster.async_unsubscribe(subscriber)
 
     return response
 
 
+async def _async_write_frame(response, frame):
+    """Write a frame of a still stream to the response."""
+    header, img_bytes = frame
+    await response.write(header)
+    await response.write(img_bytes)
+    await response.write(b'\r\n')
+
+
+class StillStreamSubscriber:
+    """Hold the newest frame of a still stream for one client.
+
+    Only the newest frame is kept, a client that writes slower than the
+    camera produces frames skips the frames it missed.
+    """
+
+    def __init__(self, loop):
+        """Initialize the subscriber."""
+        self._event = asyncio.Event(loop=loop)
+        self._frame = None
+        self._closed = False
+
+    @callback
+    def async_put(self, frame):
+        """Replace the frame that is written next."""
+        self._frame = frame
+        self._event.set()
+
+    @callback
+    def async_close(self):
+        """End the stream after the frame that is written next."""
+        self._closed = True
+        self._event.set()
+
+    async def async_get(self):
+        """Wait for the next frame, None when the stream ended."""
+        await self._event.wait()
+        frame, self._frame = self._frame, None
+
+        if not self._closed:
+            self._event.clear()
+
+        return frame
+
+
+class StillStreamBroadcaster:
+    """Fetch camera images once per interval for all clients of a stream.
+
+    The frames are shared by the subscribers, the image bytes are not
+    copied per client. Fetching stops when the last subscriber leaves.
+    """
+
+    def __init__(self, hass, image_cb, content_type, interval):
+        """Initialize the broadcaster."""
+        self.hass = hass
+        self._image_cb = image_cb
+        self._content_type = content_type
+        self._interval = interval
+        self._subscribers = set()
+        self._frame = None
+        self._task = None
+
+    @property
+    def _key(self):
+        """Return the key of the broadcaster in hass.data."""
+        return (self._image_cb, self._content_type, self._interval)
+
+    @callback
+    def async_subscribe(self):
+        """Return a new subscriber and start fetching if needed."""
+        subscriber = StillStreamSubscriber(self.hass.loop)
+        self._subscribers.add(subscriber)
+
+        if self._frame is not None:
+            subscriber.async_put(self._frame)
+
+        if self._task is None:
+            self._task = self.hass.async_add_job(self._async_fetch())
+
+        return subscriber
+
+    @callback
+    def async_unsubscribe(self, subscriber):
+        """Remove a subscriber and stop fetching after the last one."""
+        self._subscribers.discard(subscriber)
+
+        if not self._subscribers:
+            self._async_stop()
+
+    @callback
+    def _async_stop(self):
+        """Stop fetching and end the stream of all subscribers."""
+        broadcasters = self.hass.data.get(DATA_STILL_STREAMS, {})
+        if broadcasters.get(self._key) is self:
+            broadcasters.pop(self._key)
+
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        for subscriber in self._subscribers:
+            subscriber.async_close()
+
+    async def _async_fetch(self):
+        """Fetch an image every interval and pass new ones on."""
+        last_image = None
+
+        try:
+            while True:
+                img_bytes = await self._image_cb()
+                if not img_bytes:
+                    break
+
+                if img_bytes != last_image:
+                    header = bytes(
+                        '--frameboundary\r\n'
+                        'Content-Type: {}\r\n'
+                        'Content-Length: {}\r\n\r\n'.format(
+                            self._content_type, len(img_bytes)),
+                        'utf-8')
+                    self._frame = (header, img_bytes)
+
+                    for subscriber in self._subscribers:
+                        subscriber.async_put(self._frame)
+
+                    last_image = img_bytes
+
+                await asyncio.sleep(self._interval, loop=self.hass.loop)
+        except asyncio.CancelledError:
+            raise
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error fetching image for still stream")
+
+        self._task = None
+        self._async_stop()
+
+
 def _get_camera_from_entity_id(hass, entity_id):
     """Get camera component from entity_id."""
     component = hass.data.get(DOMAIN)
@@ -281,6 +431,11 @@ async def async_unload_entry(hass, entry):
 class Camera(Entity):
     """The base class for camera entities."""
 
+    # Expiry time and Image of the most recent image
+    _image_cache = None
+    # Task fetching an image for async_get_cached_image
+    _image_fetch = None
+
     def __init__(self):
         """Initialize a camera."""
         self.is_streaming = False
@@ -328,6 +483,11 @@ class Camera(Entity):
         """Return the interval between frames of the mjpeg stream."""
         return 0.5
 
+    @property
+    def image_cache_ttl(self):
+        """Return the seconds an image is reused for, 0 to disable."""
+        return DEFAULT_IMAGE_CACHE_TTL
+
     def camera_image(self):
         """Return bytes of camera image."""
         raise NotImplementedError()
@@ -340,6 +500,46 @@ class Camera(Entity):
         """
         return self.hass.async_add_job(self.camera_image)
 
+    async def async_get_cached_image(self):
+        """Return an Image of the camera, None if there is none.
+
+        An image is reused for image_cache_ttl seconds and concurrent calls
+        wait for the same fetch, so the camera is asked at most once.
+        This method must be run in the event loop.
+        """
+        if self._image_cache is not None:
+            expires, image = self._image_cache
+            if expires > self.hass.loop.time():
+                return image
+
+        if self._image_fetch is None:
+            self._image_fetch = self.hass.async_add_job(
+                self._async_fetch_image())
+
+        # A caller that times out must not cancel the fetch for the others
+        return await asyncio.shield(self._image_fetch, loop=self.hass.loop)
+
+    async def _async_fetch_image(self):
+        """Fetch an image from the camera for async_get_cached_image."""
+        try:
+            with async_timeout.timeout(IMAGE_FETCH_TIMEOUT,
+                                       loop=self.hass.loop):
+                content = await self.async_camera_image()
+        finally:
+            self._image_fetch = None
+
+        if not content:
+            return None
+
+        image = Image(self.content_type, content,
+                      '"{}"'.format(hashlib.sha1(content).hexdigest()))
+
+        if self.image_cache_ttl:
+            self._image_cache = (
+                self.hass.loop.time() + self.image_cache_ttl, image)
+
+        return image
+
     async def handle_async_still_stream(self, request, interval):
         """Generate an HTTP MJPEG stream from camera images.
 
@@ -476,15 +676,37 @@ class CameraImageView(CameraView):
         """Serve camera image."""
         with suppress(asyncio.CancelledError, asyncio.TimeoutError):
             with async_timeout.timeout(10, loop=request.app['hass'].loop):
-                image = await camera.async_camera_image()
+                image = await camera.async_get_cached_image()
 
             if image:
-                return web.Response(body=image,
-                                    content_type=camera.content_type)
+                # Browsers revalidate with the ETag, unchanged images are
+                # answered without a body.
+                headers = {
+                    hdrs.CACHE_CONTROL: 'no-cache',
+                    hdrs.ETAG: image.etag,
+                }
+
+                if _etag_matches(request, image.etag):
+                    return web.Response(status=304, headers=headers)
+
+                return web.Response(body=image.content,
+                                    content_type=image.content_type,
+                                    headers=headers)
 
         raise web.HTTPInternalServerError()
 
 
+def _etag_matches(request, etag):
+    """Return if the If-None-Match header of the request matches etag."""
+    if_none_match = request.headers.get(hdrs.IF_NONE_MATCH)
+
+    if not if_none_match:
+        return False
+
+    return any(tag.strip() in (etag, '*')
+               for tag in if_none_match.split(','))
+
+
 class CameraMjpegStream(CameraView):
     """Camera View to serve an MJPEG stream."""
 
@@ -18,7 +18,7 @@ from homeassistant.const import (
     HTTP_BASIC_AUTHENTICATION, HTTP_DIGEST_AUTHENTICATION, CONF_VERIFY_SSL)
 from homeassistant.exceptions import TemplateError
 from homeassistant.components.camera import (
-    PLATFORM_SCHEMA, DEFAULT_CONTENT_TYPE, Camera)
+    PLATFORM_SCHEMA, DEFAULT_CONTENT_TYPE, DEFAULT_IMAGE_CACHE_TTL, Camera)
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers import config_validation as cv
 from homeassistant.util.async_ import run_coroutine_threadsafe
@@ -29,6 +29,7 @@ CONF_CONTENT_TYPE = 'content_type'
 CONF_LIMIT_REFETCH_TO_URL_CHANGE = 'limit_refetch_to_url_change'
 CONF_STILL_IMAGE_URL = 'still_image_url'
 CONF_FRAMERATE = 'framerate'
+CONF_IMAGE_CACHE_TTL = 'image_cache_ttl'
 
 DEFAULT_NAME = 'Generic Camera'
 
@@ -42,6 +43,8 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_USERNAME): cv.string,
     vol.Optional(CONF_CONTENT_TYPE, default=DEFAULT_CONTENT_TYPE): cv.string,
     vol.Optional(CONF_FRAMERATE, default=2): cv.positive_int,
+    vol.Optional(CONF_IMAGE_CACHE_TTL, default=DEFAULT_IMAGE_CACHE_TTL):
+        vol.All(vol.Coerce(float), vol.Range(min=0)),
     vol.Optional(CONF_VERIFY_SSL, default=True): cv.boolean,
 })
 
@@ -66,6 +69,7 @@ class GenericCamera(Camera):
         self._still_image_url.hass = hass
         self._limit_refetch = device_info[CONF_LIMIT_REFETCH_TO_URL_CHANGE]
         self._frame_interval = 1 / device_info[CONF_FRAMERATE]
+        self._image_cache_ttl = device_info[CONF_IMAGE_CACHE_TTL]
         self.content_type = device_info[CONF_CONTENT_TYPE]
         self.verify_ssl = device_info[CONF_VERIFY_SSL]
 
@@ -88,6 +92,11 @@ class GenericCamera(Camera):
         """Return the interval between frames of the mjpeg stream."""
         return self._frame_interval
 
+    @property
+    def image_cache_ttl(self):
+        """Return the seconds an image is reused for, 0 to disable."""
+        return self._image_cache_ttl
+
     def camera_image(self):
         """Return bytes of camera image."""
         return run_coroutine_threadsafe(
@@ -7,7 +7,7 @@ https://home-assistant.io/components/device_tracker/
 import asyncio
 from datetime import timedelta
 import logging
-from typing import Any, List, Sequence, Callable
+from typing import Any, Dict, List, Optional, Sequence, Callable
 
 import voluptuous as vol
 
@@ -57,6 +57,9 @@ DEFAULT_CONSIDER_HOME = timedelta(seconds=180)
 CONF_SCAN_INTERVAL = 'interval_seconds'
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=12)
 
+# Maximum number of devices a scanner platform looks up at once
+SCAN_LOOKUP_CONCURRENCY = 10
+
 CONF_AWAY_HIDE = 'hide_if_away'
 DEFAULT_AWAY_HIDE = False
 
@@ -603,6 +606,20 @@ class DeviceScanner:
         """
         return self.hass.async_add_job(self.get_device_name, device)
 
+    def get_device_names(self, devices: List[str]) -> Dict[str, str]:
+        """Get the names of devices.
+
+        Implement this when the names of all devices can be fetched at once.
+        """
+        raise NotImplementedError()
+
+    def async_get_device_names(self, devices: List[str]) -> Any:
+        """Get the names of devices.
+
+        This method must be run in the event loop and returns a coroutine.
+        """
+        return self.hass.async_add_job(self.get_device_names, devices)
+
     def get_extra_attributes(self, device: str) -> dict:
         """Get the extra attributes of a device."""
         raise NotImplementedError()
@@ -675,10 +692,64 @@ def async_setup_scanner_platform(hass: HomeAssistantType, config: ConfigType,
     """
     interval = config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
     update_lock = asyncio.Lock(loop=hass.loop)
+    lookup_semaphore = asyncio.Semaphore(SCAN_LOOKUP_CONCURRENCY,
+                                         loop=hass.loop)
+    # Sync scanner methods are written to be called one at a time
+    executor_lock = asyncio.Lock(loop=hass.loop)
     scanner.hass = hass
 
     # Initial scan of each mac we also tell about host name for config
     seen = set()  # type: Any
+    # Optional scanner methods, set to False when not implemented
+    supported = {'device_names': True, 'extra_attributes': True}
+
+    async def async_get_device_names(macs: List[str]) \
+            -> Optional[Dict[str, str]]:
+        """Get the names of new devices at once if the scanner can."""
+        if not macs or not supported['device_names']:
+            return None
+
+        try:
+            host_names = await scanner.async_get_device_names(macs)
+        except NotImplementedError:
+            supported['device_names'] = False
+            return None
+
+        seen.update(macs)
+        return host_names
+
+    async def async_call_scanner(method: str, mac: str) -> Any:
+        """Call an async scanner method for a device.
+
+        Methods that the scanner doesn't override run the sync method in the
+        executor and are called one at a time.
+        """
+        if getattr(type(scanner), method, None) is \
+                getattr(DeviceScanner, method):
+            async with executor_lock:
+                return await getattr(scanner, method)(mac)
+        return await getattr(scanner, method)(mac)
+
+    async def async_lookup_device(mac: str, host_names: Optional[Dict]):
+        """Get the host name and extra attributes of a device."""
+        async with lookup_semaphore:
+            if mac in seen:
+                host_name = None if host_names is None \
+                    else host_names.get(mac)
+            else:
+                host_name = await async_call_scanner(
+                    'async_get_device_name', mac)
+                seen.add(mac)
+
+            if not supported['extra_attributes']:
+                return host_name, dict()
+
+            try:
+                return host_name, (await async_call_scanner(
+                    'async_get_extra_attributes', mac))
+            except NotImplementedError:
+                supported['extra_attributes'] = False
+                return host_name, dict()
 
     async def async_device_tracker_scan(now: dt_util.dt.datetime):
         """Handle interval matches."""
@@ -689,21 +760,18 @@ def async_setup_scanner_platform(hass: HomeAssistantType, config: ConfigType,
             return
 
         async with update_lock:
-            found_devices = await scanner.async_scan_devices()
+            found_devices = list(await scanner.async_scan_devices())
 
-        for mac in found_devices:
-            if mac in seen:
-                host_name = None
-            else:
-                host_name = await scanner.async_get_device_name(mac)
-                seen.add(mac)
+        host_names = await async_get_device_names(
+            [mac for mac in found_devices if mac not in seen])
 
-            try:
-                extra_attributes = (await
-                                    scanner.async_get_extra_attributes(mac))
-            except NotImplementedError:
-                extra_attributes = dict()
+        results = await asyncio.gather(*(
+            async_lookup_device(mac, host_names) for mac in found_devices
+        ), loop=hass.loop)
+
+        zone_home = hass.states.get(zone.ENTITY_ID_HOME)
 
+        for mac, (host_name, extra_attributes) in zip(found_devices, results):
             kwargs = {
                 'mac': mac,
                 'host_name': host_name,
@@ -714,7 +782,6 @@ def async_setup_scanner_platform(hass: HomeAssistantType, config: ConfigType,
                 }
             }
 
-            zone_home = hass.states.get(zone.ENTITY_ID_HOME)
             if zone_home:
                 kwargs['gps'] = [zone_home.attributes[ATTR_LATITUDE],
                                  zone_home.attributes[ATTR_LONGITUDE]]
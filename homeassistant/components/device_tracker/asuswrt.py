@@ -143,6 +143,11 @@ class AsusWrtDeviceScanner(DeviceScanner):
             return None
         return self.last_results[device].name
 
+    def get_device_names(self, devices):
+        """Return the names of the given devices that we know."""
+        return {device: self.last_results[device].name for device in devices
+                if device in self.last_results}
+
     def _update_info(self):
         """Ensure the information from the ASUSWRT router is up to date.
 
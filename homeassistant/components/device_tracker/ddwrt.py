@@ -63,34 +63,46 @@ class DdWrtDeviceScanner(DeviceScanner):
         """Return the name of the given device or None if we don't know."""
         # If not initialised and not already scanned and not found.
         if device not in self.mac2name:
-            url = 'http://{}/Status_Lan.live.asp'.format(self.host)
-            data = self.get_ddwrt_data(url)
-
-            if not data:
-                return None
-
-            dhcp_leases = data.get('dhcp_leases', None)
-
-            if not dhcp_leases:
-                return None
-
-            # Remove leading and trailing quotes and spaces
-            cleaned_str = dhcp_leases.replace(
-                "\"", "").replace("\'", "").replace(" ", "")
-            elements = cleaned_str.split(',')
-            num_clients = int(len(elements) / 5)
-            self.mac2name = {}
-            for idx in range(0, num_clients):
-                # The data is a single array
-                # every 5 elements represents one host, the MAC
-                # is the third element and the name is the first.
-                mac_index = (idx * 5) + 2
-                if mac_index < len(elements):
-                    mac = elements[mac_index]
-                    self.mac2name[mac] = elements[idx * 5]
+            self._update_mac2name()
 
         return self.mac2name.get(device)
 
+    def get_device_names(self, devices):
+        """Return the names of the given devices with one request."""
+        if any(device not in self.mac2name for device in devices):
+            self._update_mac2name()
+
+        return {device: self.mac2name.get(device) for device in devices}
+
+    def _update_mac2name(self):
+        """Fetch the names of the DHCP clients from the router."""
+        url = 'http://{}/Status_Lan.live.asp'.format(self.host)
+        data = self.get_ddwrt_data(url)
+
+        if not data:
+            return
+
+        dhcp_leases = data.get('dhcp_leases', None)
+
+        if not dhcp_leases:
+            return
+
+        # Remove leading and trailing quotes and spaces
+        cleaned_str = dhcp_leases.replace(
+            "\"", "").replace("\'", "").replace(" ", "")
+        elements = cleaned_str.split(',')
+        num_clients = int(len(elements) / 5)
+        mac2name = {}
+        for idx in range(0, num_clients):
+            # The data is a single array
+            # every 5 elements represents one host, the MAC
+            # is the third element and the name is the first.
+            mac_index = (idx * 5) + 2
+            if mac_index < len(elements):
+                mac = elements[mac_index]
+                mac2name[mac] = elements[idx * 5]
+        self.mac2name = mac2name
+
     def _update_info(self):
         """Ensure the information from the DD-WRT router is up to date.
 
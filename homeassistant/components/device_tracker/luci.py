@@ -72,6 +72,22 @@ class LuciDeviceScanner(DeviceScanner):
 
     def get_device_name(self, device):
         """Return the name of the given device or None if we don't know."""
+        if not self._update_mac2name():
+            return
+        return self.mac2name.get(device.upper(), None)
+
+    def get_device_names(self, devices):
+        """Return the names of the given devices with one request."""
+        if not self._update_mac2name():
+            return {}
+        return {device: self.mac2name.get(device.upper(), None)
+                for device in devices}
+
+    def _update_mac2name(self):
+        """Fetch the names of the DHCP hosts if not done yet.
+
+        Returns boolean if the names are known.
+        """
         if self.mac2name is None:
             url = '{}/cgi-bin/luci/rpc/uci'.format(self.origin)
             result = _req_json_rpc(
@@ -85,8 +101,8 @@ class LuciDeviceScanner(DeviceScanner):
                 self.mac2name = dict(mac2name_list)
             else:
                 # Error, handled in the _req_json_rpc
-                return
-        return self.mac2name.get(device.upper(), None)
+                return False
+        return True
 
     def _update_info(self):
         """Ensure the information from the Luci router is up to date.
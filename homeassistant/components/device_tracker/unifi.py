@@ -140,6 +140,10 @@ class UnifiScanner(DeviceScanner):
         _LOGGER.debug("Device mac %s name %s", device, name)
         return name
 
+    def get_device_names(self, devices):
+        """Return the names (if known) of the devices."""
+        return {device: self.get_device_name(device) for device in devices}
+
     def get_extra_attributes(self, device):
         """Return the extra attributes of the device."""
         if not self._monitored_conditions:
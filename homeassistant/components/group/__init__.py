@@ -408,6 +408,11 @@ class Group(Entity):
         self._order = order
         self._assumed_state = False
         self._async_unsub_state_changed = None
+        # Current states of the members and how many of them are on or
+        # assumed, kept up to date from the member state changes
+        self._member_states = {}
+        self._on_count = 0
+        self._assumed_count = 0
 
     @staticmethod
     def create_group(hass, name, entity_ids=None, user_defined=True,
@@ -570,6 +575,7 @@ class Group(Entity):
         if self._async_unsub_state_changed is None:
             return
 
+        self._async_update_member(entity_id, new_state)
         self._async_update_group_state(new_state)
         await self.async_update_ha_state()
 
@@ -586,63 +592,81 @@ class Group(Entity):
 
         return states
 
+    @callback
+    def _async_update_member(self, entity_id, new_state):
+        """Update the member counters from the old to the new member state.
+
+        This method must be run in the event loop.
+        """
+        old_state = self._member_states.pop(entity_id, None)
+
+        if old_state is not None:
+            self._async_count_member(old_state, -1)
+
+        if new_state is None:
+            return
+
+        self._member_states[entity_id] = new_state
+
+        if self.group_on is None:
+            gr_on, gr_off = _get_group_on_off(new_state.state)
+
+            if gr_on is not None:
+                self.group_on, self.group_off = gr_on, gr_off
+                self._async_count_members()
+                return
+
+        self._async_count_member(new_state, 1)
+
+    @callback
+    def _async_count_member(self, state, delta):
+        """Add delta to the counters the member state belongs to."""
+        if state.state == self.group_on:
+            self._on_count += delta
+
+        if state.attributes.get(ATTR_ASSUMED_STATE):
+            self._assumed_count += delta
+
+    @callback
+    def _async_count_members(self):
+        """Count the member states that are on or assumed."""
+        self._on_count = self._assumed_count = 0
+
+        for state in self._member_states.values():
+            self._async_count_member(state, 1)
+
     @callback
     def _async_update_group_state(self, tr_state=None):
         """Update group state.
 
-        Optionally you can provide the only state changed since last update
-        allowing this method to take shortcuts.
+        Without tr_state, the state of every member is fetched again. With
+        tr_state, the only state changed since the last update, the member
+        counters are already up to date and the other members are not
+        looked at.
 
         This method must be run in the event loop.
         """
-        # To store current states of group entities. Might not be needed.
-        states = None
-        gr_state = self._state
-        gr_on = self.group_on
-        gr_off = self.group_off
-
-        # We have not determined type of group yet
-        if gr_on is None:
-            if tr_state is None:
-                states = self._tracking_states
+        if tr_state is None:
+            states = self._tracking_states
+            self._member_states = {state.entity_id: state for state in states}
 
+            # The first member with an on/off state determines the type
+            if self.group_on is None:
                 for state in states:
-                    gr_on, gr_off = \
-                        _get_group_on_off(state.state)
+                    gr_on, gr_off = _get_group_on_off(state.state)
                     if gr_on is not None:
+                        self.group_on, self.group_off = gr_on, gr_off
                         break
-            else:
-                gr_on, gr_off = _get_group_on_off(tr_state.state)
 
-            if gr_on is not None:
-                self.group_on, self.group_off = gr_on, gr_off
+            self._async_count_members()
 
         # We cannot determine state of the group
-        if gr_on is None:
+        if self.group_on is None:
             return
 
-        if tr_state is None or ((gr_state == gr_on and
-                                 tr_state.state == gr_off) or
-                                tr_state.state not in (gr_on, gr_off)):
-            if states is None:
-                states = self._tracking_states
-
-            if any(state.state == gr_on for state in states):
-                self._state = gr_on
-            else:
-                self._state = gr_off
-
-        elif tr_state.state in (gr_on, gr_off):
-            self._state = tr_state.state
-
-        if tr_state is None or self._assumed_state and \
-           not tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            if states is None:
-                states = self._tracking_states
-
-            self._assumed_state = any(
-                state.attributes.get(ATTR_ASSUMED_STATE) for state
-                in states)
+        if self._on_count:
+            self._state = self.group_on
+        else:
+            self._state = self.group_off
 
-        elif tr_state.attributes.get(ATTR_ASSUMED_STATE):
-            self._assumed_state = True
+        self._assumed_state = self._assumed_count > 0
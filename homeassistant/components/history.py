@@ -4,22 +4,31 @@ Provide pre-made queries on top of the recorder component.
 For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/history/
 """
+import asyncio
 from collections import defaultdict
 from datetime import timedelta
-from itertools import groupby
+from itertools import chain, groupby
+import json
 import logging
+import threading
 import time
 
+from aiohttp import web
+
 import voluptuous as vol
 
 from homeassistant.const import (
-    HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE)
+    CONTENT_TYPE_JSON, HTTP_BAD_REQUEST, CONF_DOMAINS, CONF_ENTITIES,
+    CONF_EXCLUDE, CONF_INCLUDE)
 import homeassistant.util.dt as dt_util
 from homeassistant.components import recorder, script
+from homeassistant.components.recorder import rollup, snapshot
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.const import ATTR_HIDDEN
 from homeassistant.components.recorder.util import session_scope, execute
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.json import JSONEncoder
+from homeassistant.util.async_ import run_coroutine_threadsafe
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -37,6 +46,13 @@ CONFIG_SCHEMA = vol.Schema({
 SIGNIFICANT_DOMAINS = ('thermostat', 'climate')
 IGNORE_DOMAINS = ('zone', 'scene',)
 
+# Rows fetched from the database at once when streaming
+STREAM_BATCH_SIZE = 500
+# Characters of JSON written to the response at once when streaming
+STREAM_CHUNK_SIZE = 65536
+# JSON chunks that may wait to be written to the response
+STREAM_QUEUE_SIZE = 4
+
 
 def last_recorder_run(hass):
     """Retrieve the last closed recorder run from the database."""
@@ -65,16 +81,8 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
     from homeassistant.components.recorder.models import States
 
     with session_scope(hass=hass) as session:
-        query = session.query(States).filter(
-            (States.domain.in_(SIGNIFICANT_DOMAINS) |
-             (States.last_changed == States.last_updated)) &
-            (States.last_updated > start_time))
-
-        if filters:
-            query = filters.apply(query, entity_ids)
-
-        if end_time is not None:
-            query = query.filter(States.last_updated < end_time)
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters)
 
         query = query.order_by(States.last_updated)
 
@@ -93,6 +101,123 @@ def get_significant_states(hass, start_time, end_time=None, entity_ids=None,
         include_start_time_state)
 
 
+def significant_states_json(hass, start_time, end_time=None,
+                            entity_ids=None, filters=None,
+                            include_start_time_state=True):
+    """Yield the significant states during a period as JSON text chunks.
+
+    The chunks form a JSON list with a list of states per entity, ordered by
+    entity id. Rows are fetched with a server side cursor and converted one
+    by one, so memory use does not grow with the length of the period.
+    """
+    from homeassistant.components.recorder.models import States
+
+    start_states = {}
+    if include_start_time_state:
+        for state in get_states(hass, start_time, entity_ids,
+                                filters=filters):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            start_states[state.entity_id] = state
+    pending_entity_ids = sorted(start_states, reverse=True)
+
+    buffer = _JSONChunkBuffer()
+    buffer.write('[')
+
+    with session_scope(hass=hass) as session:
+        query = _significant_states_query(
+            session, start_time, end_time, entity_ids, filters)
+
+        query = query.order_by(States.entity_id, States.last_updated) \
+            .yield_per(STREAM_BATCH_SIZE) \
+            .execution_options(stream_results=True)
+
+        rows = (row.to_native() for row in query)
+        states = (
+            state for state in rows
+            if (state is not None and _is_significant(state) and
+                not state.attributes.get(ATTR_HIDDEN, False)))
+
+        for ent_id, group in groupby(states, lambda state: state.entity_id):
+            # Entities without changes only have a start time state
+            while pending_entity_ids and pending_entity_ids[-1] < ent_id:
+                yield from buffer.write_states(
+                    [start_states.pop(pending_entity_ids.pop())])
+
+            if pending_entity_ids and pending_entity_ids[-1] == ent_id:
+                pending_entity_ids.pop()
+                group = chain([start_states.pop(ent_id)], group)
+
+            yield from buffer.write_states(group)
+
+    while pending_entity_ids:
+        yield from buffer.write_states(
+            [start_states.pop(pending_entity_ids.pop())])
+
+    buffer.write(']')
+    yield from buffer.chunks(flush=True)
+
+
+def get_rollups(hass, start_time, end_time=None, entity_ids=None,
+                filters=None, period=rollup.ROLLUP_PERIOD):
+    """Return the rollups of the numeric states during a period.
+
+    Returns a dict of entity id to a list of buckets of length period, a
+    multiple of ROLLUP_PERIOD. Buckets hold the min, max, mean and last value
+    of the states recorded in them and are combined from the rollups stored
+    by the recorder.
+    """
+    from homeassistant.components.recorder.models import (
+        StateRollups, _process_timestamp)
+
+    result = defaultdict(list)
+
+    with session_scope(hass=hass) as session:
+        query = session.query(
+            StateRollups.entity_id, StateRollups.start, StateRollups.min,
+            StateRollups.max, StateRollups.mean, StateRollups.last,
+            StateRollups.count
+        ).filter(StateRollups.start >= rollup.bucket_start(start_time, period))
+
+        if end_time is not None:
+            query = query.filter(StateRollups.start < end_time)
+
+        if filters:
+            query = filters.apply(query, entity_ids, StateRollups.entity_id)
+        elif entity_ids is not None:
+            query = query.filter(StateRollups.entity_id.in_(entity_ids))
+
+        query = query.order_by(StateRollups.entity_id, StateRollups.start)
+
+        for row in query:
+            bucket_time = rollup.bucket_start(
+                _process_timestamp(row.start), period)
+            buckets = result[row.entity_id]
+
+            if not buckets or buckets[-1]['start'] != bucket_time:
+                buckets.append({
+                    'entity_id': row.entity_id,
+                    'start': bucket_time,
+                    'min': row.min,
+                    'max': row.max,
+                    'mean': row.mean,
+                    'last': row.last,
+                    'count': row.count,
+                })
+                continue
+
+            bucket = buckets[-1]
+            count = bucket['count'] + row.count
+            bucket['mean'] = (bucket['mean'] * bucket['count'] +
+                              row.mean * row.count) / count
+            bucket['min'] = min(bucket['min'], row.min)
+            bucket['max'] = max(bucket['max'], row.max)
+            bucket['last'] = row.last
+            bucket['count'] = count
+
+    return result
+
+
 def state_changes_during_period(hass, start_time, end_time=None,
                                 entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
@@ -153,8 +278,6 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
         if run is None:
             return []
 
-    from sqlalchemy import and_, func
-
     with session_scope(hass=hass) as session:
         if entity_ids and len(entity_ids) == 1:
             # Use an entirely different (and extremely fast) query if we only
@@ -172,34 +295,10 @@ def get_states(hass, utc_point_in_time, entity_ids=None, run=None,
         else:
             # We have more than one entity to look at (most commonly we want
             # all entities,) so we need to do a search on all states since the
-            # last recorder run started.
-
-            most_recent_states_by_date = session.query(
-                States.entity_id.label('max_entity_id'),
-                func.max(States.last_updated).label('max_last_updated')
-            ).filter(
-                (States.last_updated >= run.start) &
-                (States.last_updated < utc_point_in_time)
-            )
-
-            if entity_ids:
-                most_recent_states_by_date.filter(
-                    States.entity_id.in_(entity_ids))
-
-            most_recent_states_by_date = most_recent_states_by_date.group_by(
-                States.entity_id)
-
-            most_recent_states_by_date = most_recent_states_by_date.subquery()
-
-            most_recent_state_ids = session.query(
-                func.max(States.state_id).label('max_state_id')
-            ).join(most_recent_states_by_date, and_(
-                States.entity_id == most_recent_states_by_date.c.max_entity_id,
-                States.last_updated == most_recent_states_by_date.c.
-                max_last_updated))
-
-            most_recent_state_ids = most_recent_state_ids.group_by(
-                States.entity_id)
+            # last recorder run started. This search starts from the most
+            # recent snapshot of the states taken by the recorder.
+            most_recent_state_ids = snapshot.most_recent_state_ids(
+                session, utc_point_in_time, run.start)
 
         most_recent_state_ids = most_recent_state_ids.subquery()
 
@@ -252,6 +351,68 @@ def states_to_json(
     return result
 
 
+def _significant_states_query(session, start_time, end_time, entity_ids,
+                              filters):
+    """Return a query for the significant states during a period."""
+    from homeassistant.components.recorder.models import States
+
+    query = session.query(States).filter(
+        (States.domain.in_(SIGNIFICANT_DOMAINS) |
+         (States.last_changed == States.last_updated)) &
+        (States.last_updated > start_time))
+
+    if filters:
+        query = filters.apply(query, entity_ids)
+
+    if end_time is not None:
+        query = query.filter(States.last_updated < end_time)
+
+    return query
+
+
+class _JSONChunkBuffer:
+    """Collect JSON text and hand it out in chunks of STREAM_CHUNK_SIZE."""
+
+    def __init__(self):
+        """Initialize the buffer."""
+        self._parts = []
+        self._size = 0
+        self._first_list = True
+
+    def write(self, text):
+        """Add text to the buffer."""
+        self._parts.append(text)
+        self._size += len(text)
+
+    def write_states(self, states):
+        """Add a JSON list of states to the buffer.
+
+        Yields the chunks that fill up while the states are written, a long
+        list of states is never held in the buffer at once.
+        """
+        self.write('[' if self._first_list else ',[')
+        self._first_list = False
+
+        separator = ''
+        for state in states:
+            self.write(separator)
+            self.write(json.dumps(state, cls=JSONEncoder))
+            separator = ','
+            yield from self.chunks()
+
+        self.write(']')
+        yield from self.chunks()
+
+    def chunks(self, flush=False):
+        """Yield the buffered text once it is large enough or flushed."""
+        if self._size < STREAM_CHUNK_SIZE and not (flush and self._size):
+            return
+
+        yield ''.join(self._parts)
+        self._parts = []
+        self._size = 0
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = list(get_states(hass, utc_point_in_time, (entity_id,), run))
@@ -327,30 +488,103 @@ class HistoryPeriodView(HomeAssistantView):
 
         hass = request.app['hass']
 
+        rollup_minutes = request.query.get('rollup')
+        if rollup_minutes is not None:
+            try:
+                period = timedelta(minutes=int(rollup_minutes))
+            except ValueError:
+                period = None
+
+            if period is None or period < rollup.ROLLUP_PERIOD or \
+                    period % rollup.ROLLUP_PERIOD:
+                return self.json_message('Invalid rollup', HTTP_BAD_REQUEST)
+
+            result = await hass.async_add_job(
+                get_rollups, hass, start_time, end_time, entity_ids,
+                self.filters, period)
+            return await hass.async_add_job(
+                self.json, self._ordered_values(result))
+
+        if 'stream' in request.query:
+            return await self._async_stream(
+                request, significant_states_json(
+                    hass, start_time, end_time, entity_ids, self.filters,
+                    include_start_time_state))
+
         result = await hass.async_add_job(
             get_significant_states, hass, start_time, end_time,
             entity_ids, self.filters, include_start_time_state)
-        result = list(result.values())
+        result = self._ordered_values(result)
         if _LOGGER.isEnabledFor(logging.DEBUG):
             elapsed = time.perf_counter() - timer_start
             _LOGGER.debug(
                 'Extracted %d states in %fs', sum(map(len, result)), elapsed)
 
-        # Optionally reorder the result to respect the ordering given
-        # by any entities explicitly included in the configuration.
+        return await hass.async_add_job(self.json, result)
 
-        if self.use_include_order:
-            sorted_result = []
-            for order_entity in self.filters.included_entities:
-                for state_list in result:
-                    if state_list[0].entity_id == order_entity:
-                        sorted_result.append(state_list)
-                        result.remove(state_list)
-                        break
-            sorted_result.extend(result)
-            result = sorted_result
+    def _ordered_values(self, result):
+        """Return the values of a result keyed by entity id.
 
-        return await hass.async_add_job(self.json, result)
+        Optionally reorder the result to respect the ordering given by any
+        entities explicitly included in the configuration.
+        """
+        if not self.use_include_order:
+            return list(result.values())
+
+        included = self.filters.included_entities
+        sorted_result = [result[entity_id] for entity_id in included
+                         if entity_id in result]
+        sorted_result.extend(values for entity_id, values in result.items()
+                             if entity_id not in included)
+        return sorted_result
+
+    async def _async_stream(self, request, chunks):
+        """Write the JSON text chunks to a streaming response.
+
+        The chunks are produced in the executor, at most STREAM_QUEUE_SIZE
+        chunks wait to be written. The entities are ordered by entity id,
+        use_include_order does not apply.
+        """
+        hass = request.app['hass']
+        chunk_queue = asyncio.Queue(STREAM_QUEUE_SIZE, loop=hass.loop)
+        stop = threading.Event()
+
+        def produce():
+            """Put the chunks in the queue until done or stopped."""
+            try:
+                for chunk in chunks:
+                    if stop.is_set():
+                        break
+                    run_coroutine_threadsafe(
+                        chunk_queue.put(chunk), hass.loop).result()
+            finally:
+                chunks.close()
+                if not stop.is_set():
+                    run_coroutine_threadsafe(
+                        chunk_queue.put(None), hass.loop).result()
+
+        response = web.StreamResponse()
+        response.content_type = CONTENT_TYPE_JSON
+        producer = hass.async_add_job(produce)
+
+        try:
+            await response.prepare(request)
+
+            while True:
+                chunk = await chunk_queue.get()
+                if chunk is None:
+                    break
+                await response.write(chunk.encode('utf-8'))
+
+            await producer
+        finally:
+            # Unblock the producer when the client went away
+            stop.set()
+            while not chunk_queue.empty():
+                chunk_queue.get_nowait()
+
+        await response.write_eof()
+        return response
 
 
 class Filters:
@@ -363,7 +597,7 @@ class Filters:
         self.included_entities = []
         self.included_domains = []
 
-    def apply(self, query, entity_ids=None):
+    def apply(self, query, entity_ids=None, entity_id_column=None):
         """Apply the include/exclude filter on domains and entities on query.
 
         Following rules apply:
@@ -373,43 +607,62 @@ class Filters:
           entities and domains from all the entities in the system.
         * if include and exclude is defined - select the entities specified in
           the include and filter out the ones from the exclude list.
+
+        Queries on the states table filter on its domain column. Queries on
+        other tables pass their entity_id_column, the domains are matched on
+        its prefix.
         """
+        from sqlalchemy import or_
         from homeassistant.components.recorder.models import States
 
+        if entity_id_column is None:
+            entity_id_column = States.entity_id
+
+            def domain_in(domains):
+                """Return a clause matching entities in domains."""
+                return States.domain.in_(domains)
+        else:
+            def domain_in(domains):
+                """Return a clause matching entities in domains."""
+                return or_(*(
+                    entity_id_column.startswith(domain + '.', autoescape=True)
+                    for domain in domains))
+
         # specific entities requested - do not in/exclude anything
         if entity_ids is not None:
-            return query.filter(States.entity_id.in_(entity_ids))
-        query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
+            return query.filter(entity_id_column.in_(entity_ids))
+        query = query.filter(~domain_in(IGNORE_DOMAINS))
 
         filter_query = None
         # filter if only excluded domain is configured
         if self.excluded_domains and not self.included_domains:
-            filter_query = ~States.domain.in_(self.excluded_domains)
+            filter_query = ~domain_in(self.excluded_domains)
             if self.included_entities:
-                filter_query &= States.entity_id.in_(self.included_entities)
+                filter_query &= entity_id_column.in_(self.included_entities)
         # filter if only included domain is configured
         elif not self.excluded_domains and self.included_domains:
-            filter_query = States.domain.in_(self.included_domains)
+            filter_query = domain_in(self.included_domains)
             if self.included_entities:
-                filter_query |= States.entity_id.in_(self.included_entities)
+                filter_query |= entity_id_column.in_(self.included_entities)
         # filter if included and excluded domain is configured
         elif self.excluded_domains and self.included_domains:
-            filter_query = ~States.domain.in_(self.excluded_domains)
+            filter_query = ~domain_in(self.excluded_domains)
             if self.included_entities:
-                filter_query &= (States.domain.in_(self.included_domains) |
-                                 States.entity_id.in_(self.included_entities))
+                filter_query &= (domain_in(self.included_domains) |
+                                 entity_id_column.in_(self.included_entities))
             else:
-                filter_query &= (States.domain.in_(self.included_domains) & ~
-                                 States.domain.in_(self.excluded_domains))
+                filter_query &= (domain_in(self.included_domains) & ~
+                                 domain_in(self.excluded_domains))
         # no domain filter just included entities
         elif not self.excluded_domains and not self.included_domains and \
                 self.included_entities:
-            filter_query = States.entity_id.in_(self.included_entities)
+            filter_query = entity_id_column.in_(self.included_entities)
         if filter_query is not None:
             query = query.filter(filter_query)
         # finally apply excluded entities filter if configured
         if self.excluded_entities:
-            query = query.filter(~States.entity_id.in_(self.excluded_entities))
+            query = query.filter(
+                ~entity_id_column.in_(self.excluded_entities))
         return query
 
 
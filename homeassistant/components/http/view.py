@@ -5,7 +5,6 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/http/
 """
 import asyncio
-import json
 import logging
 
 from aiohttp import web
@@ -14,7 +13,7 @@ from aiohttp.web_exceptions import HTTPUnauthorized, HTTPInternalServerError
 from homeassistant.components.http.ban import process_success_login
 from homeassistant.core import Context, is_callback
 from homeassistant.const import CONTENT_TYPE_JSON
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.util.json import json_dumps
 
 from .const import KEY_AUTHENTICATED, KEY_REAL_IP
 
@@ -43,11 +42,14 @@ class HomeAssistantView:
     def json(self, result, status_code=200, headers=None):
         """Return a JSON response."""
         try:
-            msg = json.dumps(
-                result, sort_keys=True, cls=JSONEncoder).encode('UTF-8')
+            msg = json_dumps(result, sort_keys=True).encode('UTF-8')
         except TypeError as err:
             _LOGGER.error('Unable to serialize to JSON: %s\n%s', err, result)
             raise HTTPInternalServerError
+        return self.json_encoded(msg, status_code, headers)
+
+    def json_encoded(self, msg, status_code=200, headers=None):
+        """Return a response with a JSON encoded body."""
         response = web.Response(
             body=msg, content_type=CONTENT_TYPE_JSON, status=status_code,
             headers=headers)
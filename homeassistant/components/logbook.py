@@ -4,6 +4,7 @@ Event parser and human readable log generator.
 For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/logbook/
 """
+from collections import OrderedDict
 from datetime import timedelta
 from itertools import groupby
 import logging
@@ -12,6 +13,8 @@ import voluptuous as vol
 
 from homeassistant.components import sun
 from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.recorder.const import (
+    DATA_INSTANCE, SIGNAL_PURGED)
 from homeassistant.const import (
     ATTR_DOMAIN, ATTR_ENTITY_ID, ATTR_HIDDEN, ATTR_NAME, CONF_EXCLUDE,
     CONF_INCLUDE, EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP,
@@ -20,6 +23,7 @@ from homeassistant.const import (
 from homeassistant.core import DOMAIN as HA_DOMAIN
 from homeassistant.core import State, callback, split_entity_id
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 import homeassistant.util.dt as dt_util
 
 _LOGGER = logging.getLogger(__name__)
@@ -36,6 +40,11 @@ DOMAIN = 'logbook'
 
 GROUP_BY_MINUTES = 15
 
+# Number of past days of which the entries are kept in memory
+CACHE_DAYS = 7
+
+DATA_JSON_EXTRACT = 'logbook_json_extract'
+
 CONFIG_SCHEMA = vol.Schema({
     DOMAIN: vol.Schema({
         CONF_EXCLUDE: vol.Schema({
@@ -97,7 +106,9 @@ async def async_setup(hass, config):
         message = message.async_render()
         async_log_entry(hass, name, message, domain, entity_id)
 
-    hass.http.register_view(LogbookView(config.get(DOMAIN, {})))
+    view = LogbookView(config.get(DOMAIN, {}))
+    hass.http.register_view(view)
+    async_dispatcher_connect(hass, SIGNAL_PURGED, view.async_clear_cache)
 
     await hass.components.frontend.async_register_built_in_panel(
         'logbook', 'logbook', 'hass:format-list-bulleted-type')
@@ -117,6 +128,17 @@ class LogbookView(HomeAssistantView):
     def __init__(self, config):
         """Initialize the logbook view."""
         self.config = config
+        # Entries of past days by the start of the day
+        self._cache = OrderedDict()
+        # Increased when the cache is cleared, so that entries fetched
+        # before are not cached
+        self._cache_generation = 0
+
+    @callback
+    def async_clear_cache(self):
+        """Forget the cached entries, the recorder purged events."""
+        self._cache.clear()
+        self._cache_generation += 1
 
     async def get(self, request, datetime=None):
         """Retrieve logbook entries."""
@@ -132,12 +154,28 @@ class LogbookView(HomeAssistantView):
         end_day = start_day + timedelta(days=1)
         hass = request.app['hass']
 
-        def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(list(
-                _get_events(hass, self.config, start_day, end_day)))
+        entries = self._cache.get(start_day)
+        if entries is not None:
+            self._cache.move_to_end(start_day)
+            return await hass.async_add_job(self.json, entries)
+
+        # The day is complete once the recorder committed a later event
+        committed_until = hass.data[DATA_INSTANCE].committed_until
+        cacheable = committed_until is not None and committed_until >= end_day
+        generation = self._cache_generation
 
-        return await hass.async_add_job(json_events)
+        def get_entries():
+            """Fetch events and generate the entries."""
+            return list(_get_events(hass, self.config, start_day, end_day))
+
+        entries = await hass.async_add_job(get_entries)
+
+        if cacheable and generation == self._cache_generation:
+            self._cache[start_day] = entries
+            while len(self._cache) > CACHE_DAYS:
+                self._cache.popitem(last=False)
+
+        return await hass.async_add_job(self.json, entries)
 
 
 class Entry:
@@ -266,24 +304,109 @@ def humanify(events):
 
 def _get_events(hass, config, start_day, end_day):
     """Get events for a period of time."""
-    from homeassistant.components.recorder.models import Events, States
+    from homeassistant.components.recorder.models import (
+        Events, StateAttributes, States)
     from homeassistant.components.recorder.util import (
         execute, session_scope)
 
     with session_scope(hass=hass) as session:
+        json_extract = _json_extract_supported(hass, session)
         query = session.query(Events).order_by(Events.time_fired) \
             .outerjoin(States, (Events.event_id == States.event_id))  \
+            .outerjoin(StateAttributes,
+                       (States.attributes_id ==
+                        StateAttributes.attributes_id)) \
             .filter(Events.event_type.in_(ALL_EVENT_TYPES)) \
             .filter((Events.time_fired > start_day)
                     & (Events.time_fired < end_day)) \
-            .filter((States.last_updated == States.last_changed)
-                    | (States.state_id.is_(None)))
+            .filter((States.state_id.is_(None)) |
+                    ((States.last_updated == States.last_changed) &
+                     _states_filter(config, json_extract)))
         events = execute(query)
     return humanify(_exclude_events(events, config))
 
 
-def _exclude_events(events, config):
-    """Get list of filtered events."""
+def _json_extract_supported(hass, session):
+    """Return if the database can extract values from the attributes JSON.
+
+    Only SQLite is supported, if it is built with the JSON1 extension.
+    """
+    supported = hass.data.get(DATA_JSON_EXTRACT)
+
+    if supported is None:
+        from sqlalchemy.exc import OperationalError
+
+        supported = False
+        if session.bind.dialect.name == 'sqlite':
+            try:
+                session.execute("SELECT json_extract('{}', '$')")
+                supported = True
+            except OperationalError:
+                pass
+        hass.data[DATA_JSON_EXTRACT] = supported
+
+    return supported
+
+
+def _states_filter(config, json_extract=False):
+    """Return a SQL filter for the state changes that are shown.
+
+    Applies the include and exclude config like _exclude_events does. If the
+    database can extract JSON values, state changes of continuous sensors
+    with a unit are excluded too. Otherwise they are returned and humanify
+    skips them. The remaining checks need the decoded event and are done by
+    _exclude_events.
+    """
+    from homeassistant.components.recorder.models import (
+        StateAttributes, States)
+    from sqlalchemy import case, func, true
+
+    states_filter = true()
+
+    if json_extract:
+        # Attributes as stored by the recorder, invalid JSON is returned
+        attributes = func.coalesce(
+            StateAttributes.shared_attrs, States.attributes, '{}')
+        unit = case([(func.json_valid(attributes), func.json_extract(
+            attributes, '$.unit_of_measurement'))])
+        # Like humanify, only a unit that is set hides a state change
+        has_unit = unit.isnot(None) & unit.notin_(['', 0])
+        states_filter &= ~(States.domain.in_(CONTINUOUS_DOMAINS) & has_unit)
+
+    excluded_entities, excluded_domains, included_entities, \
+        included_domains = _filter_config(config)
+
+    in_excluded_domains = _in(States.domain, excluded_domains)
+    in_included_domains = _in(States.domain, included_domains)
+    in_included_entities = _in(States.entity_id, included_entities)
+
+    if excluded_domains and not included_domains:
+        states_filter &= ~in_excluded_domains | in_included_entities
+    elif not excluded_domains and included_domains:
+        states_filter &= in_included_domains | in_included_entities
+    elif excluded_domains and included_domains:
+        states_filter &= ~in_excluded_domains & \
+            (in_included_domains | in_included_entities)
+    elif included_entities:
+        states_filter &= in_included_entities
+
+    if excluded_entities:
+        states_filter &= ~States.entity_id.in_(excluded_entities)
+
+    return states_filter
+
+
+def _in(column, values):
+    """Return a SQL expression testing if column is one of values."""
+    from sqlalchemy import false
+
+    if not values:
+        return false()
+    return column.in_(values)
+
+
+def _filter_config(config):
+    """Return the excluded and included entities and domains."""
     excluded_entities = []
     excluded_domains = []
     included_entities = []
@@ -297,6 +420,15 @@ def _exclude_events(events, config):
         included_entities = include[CONF_ENTITIES]
         included_domains = include[CONF_DOMAINS]
 
+    return (excluded_entities, excluded_domains, included_entities,
+            included_domains)
+
+
+def _exclude_events(events, config):
+    """Get list of filtered events."""
+    excluded_entities, excluded_domains, included_entities, \
+        included_domains = _filter_config(config)
+
     filtered_events = []
     for event in events:
         domain, entity_id = None, None
@@ -5,13 +5,17 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/mqtt/
 """
 import asyncio
-from itertools import groupby
-from typing import Optional, Any, Union, Callable, List, cast  # noqa: F401
-from operator import attrgetter
+from collections import deque
+from itertools import count, groupby
+from typing import (  # noqa: F401
+    Optional, Any, Union, Callable, Dict, List, Tuple, cast)
+from operator import attrgetter, itemgetter
 import logging
 import os
 import socket
+import threading
 import time
+from timeit import default_timer as timer
 import ssl
 import requests.certs
 import attr
@@ -22,6 +26,7 @@ from homeassistant.helpers.typing import HomeAssistantType, ConfigType, \
     ServiceDataType
 from homeassistant.core import callback, Event, ServiceCall
 from homeassistant.setup import async_prepare_setup_platform
+from homeassistant.components import websocket_api
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import bind_hass
 from homeassistant.helpers import template, config_validation as cv
@@ -55,6 +60,7 @@ CONF_CLIENT_KEY = 'client_key'
 CONF_CLIENT_CERT = 'client_cert'
 CONF_TLS_INSECURE = 'tls_insecure'
 CONF_TLS_VERSION = 'tls_version'
+CONF_MESSAGE_FLUSH_LATENCY = 'message_flush_latency'
 
 CONF_BIRTH_MESSAGE = 'birth_message'
 CONF_WILL_MESSAGE = 'will_message'
@@ -80,6 +86,7 @@ DEFAULT_DISCOVERY_PREFIX = 'homeassistant'
 DEFAULT_TLS_PROTOCOL = 'auto'
 DEFAULT_PAYLOAD_AVAILABLE = 'online'
 DEFAULT_PAYLOAD_NOT_AVAILABLE = 'offline'
+DEFAULT_MESSAGE_FLUSH_LATENCY = 0
 
 ATTR_TOPIC = 'topic'
 ATTR_PAYLOAD = 'payload'
@@ -177,6 +184,9 @@ CONFIG_SCHEMA = vol.Schema({
         # state topic is specified, it will be created with the given prefix.
         vol.Optional(CONF_DISCOVERY_PREFIX,
                      default=DEFAULT_DISCOVERY_PREFIX): valid_publish_topic,
+        vol.Optional(CONF_MESSAGE_FLUSH_LATENCY,
+                     default=DEFAULT_MESSAGE_FLUSH_LATENCY):
+            vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
     }),
 }, extra=vol.ALLOW_EXTRA)
 
@@ -217,6 +227,11 @@ MQTT_PUBLISH_SCHEMA = vol.Schema({
     vol.Optional(ATTR_RETAIN, default=DEFAULT_RETAIN): cv.boolean,
 }, required=True)
 
+WS_TYPE_METRICS = 'mqtt/metrics'
+SCHEMA_WS_METRICS = websocket_api.BASE_COMMAND_MESSAGE_SCHEMA.extend({
+    vol.Required('type'): WS_TYPE_METRICS,
+})
+
 
 # pylint: disable=invalid-name
 PublishPayloadType = Union[str, bytes, int, float, None]
@@ -425,7 +440,8 @@ async def async_setup(hass: HomeAssistantType, config: ConfigType) -> bool:
         hass.data[DATA_MQTT] = MQTT(
             hass, broker, port, client_id, keepalive, username, password,
             certificate, client_key, client_cert, tls_insecure, protocol,
-            will_message, birth_message, tls_version)
+            will_message, birth_message, tls_version,
+            conf[CONF_MESSAGE_FLUSH_LATENCY])
     except socket.error:
         _LOGGER.exception("Can't connect to the broker. "
                           "Please check your settings and the broker itself")
@@ -466,12 +482,25 @@ async def async_setup(hass: HomeAssistantType, config: ConfigType) -> bool:
         DOMAIN, SERVICE_PUBLISH, async_publish_service,
         schema=MQTT_PUBLISH_SCHEMA)
 
+    hass.components.websocket_api.async_register_command(
+        WS_TYPE_METRICS, websocket_handle_metrics, SCHEMA_WS_METRICS)
+
     if conf.get(CONF_DISCOVERY):
         await _async_setup_discovery(hass, config)
 
     return True
 
 
+@callback
+def websocket_handle_metrics(hass, connection, msg):
+    """Handle get MQTT metrics command.
+
+    Async friendly.
+    """
+    connection.to_write.put_nowait(websocket_api.result_message(
+        msg['id'], hass.data[DATA_MQTT].metrics.as_dict()))
+
+
 @attr.s(slots=True, frozen=True)
 class Subscription:
     """Class to hold data about an active subscription."""
@@ -492,6 +521,128 @@ class Message:
     retain = attr.ib(type=bool, default=False)
 
 
+class MessageMetrics:
+    """Counters describing the batches of received messages."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.batches = 0
+        self.messages = 0
+        self.batch_size_last = 0
+        self.batch_size_max = 0
+        self.handler_time_last = 0.0
+        self.handler_time_max = 0.0
+        self.handler_time_total = 0.0
+
+    def record_batch(self, size: int, handler_time: float) -> None:
+        """Record a batch of size messages that was handled."""
+        self.batches += 1
+        self.messages += size
+        self.batch_size_last = size
+        self.batch_size_max = max(self.batch_size_max, size)
+        self.handler_time_last = handler_time
+        self.handler_time_max = max(self.handler_time_max, handler_time)
+        self.handler_time_total += handler_time
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a dictionary."""
+        return {
+            'batches': self.batches,
+            'messages': self.messages,
+            'batch_size_last': self.batch_size_last,
+            'batch_size_max': self.batch_size_max,
+            'handler_time_last': self.handler_time_last,
+            'handler_time_max': self.handler_time_max,
+            'handler_time_total': self.handler_time_total,
+        }
+
+
+class SubscriptionTrie:
+    """Index of subscriptions by the levels of their topic filter.
+
+    Matching a topic walks the levels of the topic and the + and # wildcard
+    levels, the cost depends on the topic depth and not on the number of
+    subscriptions. Topics starting with $ do not match wildcards on the
+    first level, the same as in paho.mqtt.matcher.MQTTMatcher.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the subscription trie."""
+        self._root = _TrieNode()
+        self._sequence = count()
+
+    def add(self, subscription: Subscription) -> None:
+        """Add a subscription."""
+        node = self._root
+        for level in subscription.topic.split('/'):
+            node = node.children.setdefault(level, _TrieNode())
+        node.subscriptions.append((next(self._sequence), subscription))
+
+    def remove(self, subscription: Subscription) -> None:
+        """Remove a subscription."""
+        path = [self._root]
+        levels = subscription.topic.split('/')
+        for level in levels:
+            node = path[-1].children.get(level)
+            if node is None:
+                return
+            path.append(node)
+
+        node.subscriptions = [
+            item for item in node.subscriptions if item[1] is not subscription]
+
+        # Remove the nodes that are no longer needed
+        for level, parent, child in zip(
+                reversed(levels), reversed(path[:-1]), reversed(path[1:])):
+            if child.children or child.subscriptions:
+                break
+            del parent.children[level]
+
+    def match(self, topic: str) -> List[Subscription]:
+        """Return the subscriptions matching topic in subscription order."""
+        levels = topic.split('/')
+        normal = not topic.startswith('$')
+        matches = []  # type: List[Tuple[int, Subscription]]
+        nodes = [self._root]
+
+        for index, level in enumerate(levels):
+            wildcards = normal or index > 0
+            next_nodes = []
+
+            for node in nodes:
+                children = node.children
+                if wildcards and '#' in children:
+                    matches.extend(children['#'].subscriptions)
+                if level in children:
+                    next_nodes.append(children[level])
+                if wildcards and '+' in children:
+                    next_nodes.append(children['+'])
+
+            nodes = next_nodes
+            if not nodes:
+                break
+
+        for node in nodes:
+            matches.extend(node.subscriptions)
+            # A # level also matches its parent level
+            if '#' in node.children:
+                matches.extend(node.children['#'].subscriptions)
+
+        matches.sort(key=itemgetter(0))
+        return [subscription for _, subscription in matches]
+
+
+class _TrieNode:
+    """Level of a topic filter in the subscription trie."""
+
+    __slots__ = ['children', 'subscriptions']
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children = {}  # type: Dict[str, _TrieNode]
+        self.subscriptions = []  # type: List[Tuple[int, Subscription]]
+
+
 class MQTT:
     """Home Assistant MQTT client."""
 
@@ -501,7 +652,8 @@ class MQTT:
                  certificate: Optional[str], client_key: Optional[str],
                  client_cert: Optional[str], tls_insecure: Optional[bool],
                  protocol: Optional[str], will_message: Optional[Message],
-                 birth_message: Optional[Message], tls_version) -> None:
+                 birth_message: Optional[Message], tls_version,
+                 flush_latency: float = DEFAULT_MESSAGE_FLUSH_LATENCY) -> None:
         """Initialize Home Assistant MQTT client."""
         import paho.mqtt.client as mqtt
 
@@ -510,9 +662,16 @@ class MQTT:
         self.port = port
         self.keepalive = keepalive
         self.subscriptions = []  # type: List[Subscription]
+        self._subscription_trie = SubscriptionTrie()
         self.birth_message = birth_message
         self._mqttc = None  # type: mqtt.Client
         self._paho_lock = asyncio.Lock(loop=hass.loop)
+        self.flush_latency = flush_latency
+        self.metrics = MessageMetrics()
+        # Messages received by the paho thread, waiting for the event loop
+        self._pending_messages = deque()  # type: deque
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
 
         if protocol == PROTOCOL_31:
             proto = mqtt.MQTTv31  # type: int
@@ -599,6 +758,7 @@ class MQTT:
 
         subscription = Subscription(topic, msg_callback, qos, encoding)
         self.subscriptions.append(subscription)
+        self._subscription_trie.add(subscription)
 
         await self._async_perform_subscription(topic, qos)
 
@@ -608,6 +768,7 @@ class MQTT:
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
+            self._subscription_trie.remove(subscription)
 
             if any(other.topic == topic for other in self.subscriptions):
                 # Other subscriptions on topic remaining - don't unsubscribe.
@@ -665,27 +826,69 @@ class MQTT:
                 self.async_publish(*attr.astuple(self.birth_message)))
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
+
+        Messages are buffered and handled in batches, the event loop is only
+        woken up for the first message of a batch.
+        """
+        with self._pending_lock:
+            self._pending_messages.append(msg)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+
+        if self.flush_latency:
+            self.hass.add_job(self._async_flush_messages_later)
+        else:
+            self.hass.add_job(self._mqtt_flush_messages)
+
+    async def _async_flush_messages_later(self) -> None:
+        """Handle the buffered messages after the flush latency."""
+        await asyncio.sleep(self.flush_latency, loop=self.hass.loop)
+        self._mqtt_flush_messages()
+
+    @callback
+    def _mqtt_flush_messages(self) -> None:
+        """Handle all buffered messages."""
+        with self._pending_lock:
+            messages = self._pending_messages
+            self._pending_messages = deque()
+            self._flush_scheduled = False
+
+        start = timer()
+        try:
+            for msg in messages:
+                # A failing subscriber must not cost the rest of the batch
+                try:
+                    self._mqtt_handle_message(msg)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Error handling message on %s",
+                                      msg.topic)
+        finally:
+            self.metrics.record_batch(len(messages), timer() - start)
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
         _LOGGER.debug("Received message on %s: %s", msg.topic, msg.payload)
 
-        for subscription in self.subscriptions:
-            if not _match_topic(subscription.topic, msg.topic):
-                continue
+        # Payloads by encoding, None if the payload can't be decoded
+        payloads = {None: msg.payload}  # type: Dict[Optional[str], Any]
 
-            payload = msg.payload  # type: SubscribePayloadType
-            if subscription.encoding is not None:
+        for subscription in self._subscription_trie.match(msg.topic):
+            if subscription.encoding not in payloads:
                 try:
-                    payload = msg.payload.decode(subscription.encoding)
+                    payloads[subscription.encoding] = msg.payload.decode(
+                        subscription.encoding)
                 except (AttributeError, UnicodeDecodeError):
                     _LOGGER.warning("Can't decode payload %s on %s "
                                     "with encoding %s",
                                     msg.payload, msg.topic,
                                     subscription.encoding)
-                    continue
+                    payloads[subscription.encoding] = None
+
+            payload = payloads[subscription.encoding]
+            if payload is None:
+                continue
 
             self.hass.async_run_job(subscription.callback,
                                     msg.topic, payload, msg.qos)
@@ -724,18 +927,6 @@ def _raise_on_error(result_code: int) -> None:
             'Error talking to MQTT: {}'.format(mqtt.error_string(result_code)))
 
 
-def _match_topic(subscription: str, topic: str) -> bool:
-    """Test if topic matches subscription."""
-    from paho.mqtt.matcher import MQTTMatcher
-    matcher = MQTTMatcher()
-    matcher[subscription] = True
-    try:
-        next(matcher.iter_match(topic))
-        return True
-    except StopIteration:
-        return False
-
-
 class MqttAvailability(Entity):
     """Mixin used for platforms that report availability."""
 
@@ -8,13 +8,14 @@ For more details about this component, please refer to the documentation at
 https://home-assistant.io/components/recorder/
 """
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
 from datetime import datetime, timedelta
 import logging
 import queue
 import threading
 import time
+from timeit import default_timer as timer
 
 from typing import Any, Dict, Optional  # noqa: F401
 
@@ -24,15 +25,21 @@ from homeassistant.const import (
     ATTR_ENTITY_ID, CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE,
     EVENT_HOMEASSISTANT_START, EVENT_HOMEASSISTANT_STOP, EVENT_STATE_CHANGED,
     EVENT_TIME_CHANGED, MATCH_ALL)
-from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.core import CoreState, Event, HomeAssistant, callback
+from homeassistant.components import websocket_api
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import dispatcher_send
 from homeassistant.helpers.entityfilter import generate_filter
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 from homeassistant.loader import bind_hass
 
-from . import migration, purge
-from .const import DATA_INSTANCE
+from . import migration, purge, rollup, snapshot
+from .const import DATA_INSTANCE, SIGNAL_PURGED
+from .event_queue import (
+    POLICY_DROP_OLDEST, QUEUE_POLICIES, RecorderMetrics, RecorderQueue)
+from .rollup import ROLLUP_PERIOD, RollupTask
+from .snapshot import SnapshotTask
 from .util import session_scope
 
 REQUIREMENTS = ['sqlalchemy==1.2.11']
@@ -58,6 +65,12 @@ CONF_DB_URL = 'db_url'
 CONF_PURGE_KEEP_DAYS = 'purge_keep_days'
 CONF_PURGE_INTERVAL = 'purge_interval'
 CONF_EVENT_TYPES = 'event_types'
+CONF_COMMIT_BATCH_SIZE = 'commit_batch_size'
+CONF_COMMIT_MAX_AGE = 'commit_max_age'
+CONF_QUEUE_MAX_EVENTS = 'queue_max_events'
+CONF_QUEUE_POLICY = 'queue_policy'
+CONF_SNAPSHOT_INTERVAL = 'snapshot_interval'
+CONF_ROLLUP = 'rollup'
 
 CONNECT_RETRY_WAIT = 3
 
@@ -80,9 +93,25 @@ CONFIG_SCHEMA = vol.Schema({
         vol.Optional(CONF_PURGE_INTERVAL, default=1):
             vol.All(vol.Coerce(int), vol.Range(min=0)),
         vol.Optional(CONF_DB_URL): cv.string,
+        vol.Optional(CONF_COMMIT_BATCH_SIZE, default=1):
+            vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(CONF_COMMIT_MAX_AGE, default=1):
+            vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(CONF_QUEUE_MAX_EVENTS, default=0):
+            vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(CONF_QUEUE_POLICY, default=POLICY_DROP_OLDEST):
+            vol.In(QUEUE_POLICIES),
+        vol.Optional(CONF_SNAPSHOT_INTERVAL, default=60):
+            vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(CONF_ROLLUP, default=True): cv.boolean,
     })
 }, extra=vol.ALLOW_EXTRA)
 
+WS_TYPE_METRICS = 'recorder/metrics'
+SCHEMA_WS_METRICS = websocket_api.BASE_COMMAND_MESSAGE_SCHEMA.extend({
+    vol.Required('type'): WS_TYPE_METRICS,
+})
+
 
 @bind_hass
 async def wait_connection_ready(hass):
@@ -113,9 +142,20 @@ def run_information(hass, point_in_time: Optional[datetime] = None):
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the recorder."""
-    conf = config.get(DOMAIN, {})
+    conf = config.get(DOMAIN)
+
+    if conf is None:
+        # Set up as a dependency, nothing is purged automatically
+        conf = CONFIG_SCHEMA({DOMAIN: {CONF_PURGE_INTERVAL: 0}})[DOMAIN]
+
     keep_days = conf.get(CONF_PURGE_KEEP_DAYS)
     purge_interval = conf.get(CONF_PURGE_INTERVAL)
+    commit_batch_size = conf.get(CONF_COMMIT_BATCH_SIZE, 1)
+    commit_max_age = conf.get(CONF_COMMIT_MAX_AGE, 1)
+    queue_max_events = conf[CONF_QUEUE_MAX_EVENTS]
+    queue_policy = conf[CONF_QUEUE_POLICY]
+    snapshot_interval = conf.get(CONF_SNAPSHOT_INTERVAL, 60)
+    create_rollups = conf.get(CONF_ROLLUP, True)
 
     db_url = conf.get(CONF_DB_URL, None)
     if not db_url:
@@ -126,7 +166,10 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     exclude = conf.get(CONF_EXCLUDE, {})
     instance = hass.data[DATA_INSTANCE] = Recorder(
         hass=hass, keep_days=keep_days, purge_interval=purge_interval,
-        uri=db_url, include=include, exclude=exclude)
+        uri=db_url, include=include, exclude=exclude,
+        commit_batch_size=commit_batch_size, commit_max_age=commit_max_age,
+        queue_max_events=queue_max_events, queue_policy=queue_policy,
+        snapshot_interval=snapshot_interval, rollup=create_rollups)
     instance.async_initialize()
     instance.start()
 
@@ -138,9 +181,26 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         DOMAIN, SERVICE_PURGE, async_handle_purge_service,
         schema=SERVICE_PURGE_SCHEMA)
 
+    hass.components.websocket_api.async_register_command(
+        WS_TYPE_METRICS, websocket_handle_metrics, SCHEMA_WS_METRICS)
+
     return await instance.async_db_ready
 
 
+@callback
+def websocket_handle_metrics(hass, connection, msg):
+    """Handle get recorder metrics command.
+
+    Async friendly.
+    """
+    instance = hass.data[DATA_INSTANCE]
+    connection.to_write.put_nowait(websocket_api.result_message(
+        msg['id'], instance.queue.metrics_dict()))
+
+
+# Number of attribute ids kept in memory to avoid database lookups
+ATTRIBUTES_CACHE_SIZE = 2048
+
 PurgeTask = namedtuple('PurgeTask', ['keep_days', 'repack'])
 
 
@@ -149,14 +209,31 @@ class Recorder(threading.Thread):
 
     def __init__(self, hass: HomeAssistant, keep_days: int,
                  purge_interval: int, uri: str,
-                 include: Dict, exclude: Dict) -> None:
+                 include: Dict, exclude: Dict, commit_batch_size: int = 1,
+                 commit_max_age: float = 1, queue_max_events: int = 0,
+                 queue_policy: str = POLICY_DROP_OLDEST,
+                 snapshot_interval: int = 0, rollup: bool = False) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name='Recorder')
 
         self.hass = hass
         self.keep_days = keep_days
         self.purge_interval = purge_interval
-        self.queue = queue.Queue()  # type: Any
+        self.commit_batch_size = commit_batch_size
+        self.commit_max_age = commit_max_age
+        self.queue_max_events = queue_max_events
+        self.snapshot_interval = snapshot_interval
+        self.rollup = rollup
+        self.rollups_end = None  # type: Optional[datetime]
+        # All recorded events fired up to this time are committed
+        self.committed_until = None  # type: Optional[datetime]
+        # Purge requested while purging, runs when the purge finished
+        self._queued_purge = None  # type: Optional[PurgeTask]
+        self.metrics = RecorderMetrics()
+        # Unbounded until the recorder processes events, no events are
+        # dropped while we wait for Home Assistant to start.
+        self.queue = RecorderQueue(
+            policy=queue_policy, metrics=self.metrics)  # type: Any
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
         self.async_db_ready = asyncio.Future(loop=hass.loop)
@@ -169,6 +246,9 @@ class Recorder(threading.Thread):
         self.exclude_t = exclude.get(CONF_EVENT_TYPES, [])
 
         self.get_session = None
+        # Attributes JSON to attributes_id of the rows in state_attributes,
+        # only accessed from the recorder thread.
+        self.state_attributes_ids = OrderedDict()  # type: OrderedDict
 
     @callback
     def async_initialize(self):
@@ -184,9 +264,8 @@ class Recorder(threading.Thread):
 
     def run(self):
         """Start processing events to save."""
-        from .models import States, Events
+        from .models import Events
         from homeassistant.components import persistent_notification
-        from sqlalchemy import exc
 
         tries = 1
         connected = False
@@ -276,64 +355,303 @@ class Recorder(threading.Thread):
 
             self.hass.helpers.event.track_point_in_time(async_purge, run)
 
+        # Start periodic snapshots of the recorded states
+        if self.snapshot_interval:
+            @callback
+            def async_snapshot(now):
+                """Trigger a snapshot of the states recorded before now."""
+                self.queue.put(SnapshotTask(now))
+
+            self.hass.helpers.event.track_time_interval(
+                async_snapshot, timedelta(minutes=self.snapshot_interval))
+
+        # Start periodic rollups of the numeric states
+        if self.rollup:
+            @callback
+            def async_rollup(now):
+                """Trigger the rollups of the states recorded before now."""
+                self.queue.put(RollupTask(now))
+
+            self.hass.helpers.event.track_time_interval(
+                async_rollup, ROLLUP_PERIOD)
+
+        self.queue.max_events = self.queue_max_events
+
         while True:
             event = self.queue.get()
 
-            if event is None:
-                self._close_run()
-                self._close_connection()
-                self.queue.task_done()
-                return
-            if isinstance(event, PurgeTask):
-                purge.purge_old_data(self, event.keep_days, event.repack)
-                self.queue.task_done()
+            if not isinstance(event, Event):
+                if not self._process_task(event):
+                    return
                 continue
-            elif event.event_type == EVENT_TIME_CHANGED:
+
+            if not self._should_record(event):
                 self.queue.task_done()
                 continue
-            elif event.event_type in self.exclude_t:
+
+            events, tasks = self._collect_batch(event)
+            self._save_events(events)
+
+            for task in tasks:
+                if not self._process_task(task):
+                    return
+
+    def _process_task(self, task):
+        """Process a task from the queue.
+
+        Returns False if the recorder should stop.
+        """
+        if task is None:
+            self._close_run()
+            self._close_connection()
+            self.queue.task_done()
+            return False
+
+        if isinstance(task, SnapshotTask):
+            from sqlalchemy.exc import SQLAlchemyError
+
+            try:
+                snapshot.create_snapshot(self, task.point_in_time)
+            except SQLAlchemyError:
+                _LOGGER.exception("Error creating state snapshot")
+            finally:
                 self.queue.task_done()
-                continue
+            return True
+
+        if isinstance(task, RollupTask):
+            from sqlalchemy.exc import SQLAlchemyError
+
+            # On errors rollups_end is kept, the next task retries the window
+            try:
+                self.rollups_end = rollup.create_rollups(
+                    self, task.point_in_time, self.rollups_end)
+            except SQLAlchemyError:
+                _LOGGER.exception("Error creating state rollups")
+            finally:
+                self.queue.task_done()
+            return True
+
+        running = True
+        purge_task = task
+        while purge_task is not None and running:
+            for _ in purge.purge_old_data_batches(
+                    self, purge_task.keep_days, purge_task.repack):
+                # Save the events that came in during the last batch
+                running = self._save_queued_events()
+                if not running:
+                    break
+
+            purge_task, self._queued_purge = self._queued_purge, None
+
+        dispatcher_send(self.hass, SIGNAL_PURGED)
+        self.queue.task_done()
+
+        if not running:
+            # The purge continues where it stopped on the next run
+            return self._process_task(None)
+
+        return True
 
-            entity_id = event.data.get(ATTR_ENTITY_ID)
-            if entity_id is not None:
-                if not self.entity_filter(entity_id):
-                    self.queue.task_done()
-                    continue
-
-            tries = 1
-            updated = False
-            while not updated and tries <= 10:
-                if tries != 1:
-                    time.sleep(CONNECT_RETRY_WAIT)
-                try:
-                    with session_scope(session=self.get_session()) as session:
-                        dbevent = Events.from_event(event)
-                        session.add(dbevent)
-                        session.flush()
-
-                        if event.event_type == EVENT_STATE_CHANGED:
-                            dbstate = States.from_event(event)
-                            dbstate.event_id = dbevent.event_id
-                            session.add(dbstate)
-                    updated = True
-
-                except exc.OperationalError as err:
-                    _LOGGER.error("Error in database connectivity: %s. "
-                                  "(retrying in %s seconds)", err,
-                                  CONNECT_RETRY_WAIT)
-                    tries += 1
-
-            if not updated:
-                _LOGGER.error("Error in database update. Could not save "
-                              "after %d tries. Giving up", tries)
+    def _save_queued_events(self):
+        """Save the events that are in the queue without waiting.
 
+        Returns False if the recorder should stop.
+        """
+        events = []
+        running = True
+
+        while running:
+            try:
+                event = self.queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if event is None:
+                running = False
+            elif isinstance(event, PurgeTask):
+                self._queue_purge(event)
+                self.queue.task_done()
+            elif isinstance(event, (SnapshotTask, RollupTask)):
+                # The task needs the events that came before it
+                self._save_events_in_batches(events)
+                events = []
+                self._process_task(event)
+            elif self._should_record(event):
+                events.append(event)
+            else:
+                self.queue.task_done()
+
+        self._save_events_in_batches(events)
+        return running
+
+    def _queue_purge(self, task):
+        """Run a purge requested while purging after the running one.
+
+        Purges requested in the meantime are merged, the shortest keep_days
+        is kept and a repack is done if any of them asked for it.
+        """
+        queued = self._queued_purge
+
+        if queued is not None:
+            task = PurgeTask(min(queued.keep_days, task.keep_days),
+                             queued.repack or task.repack)
+
+        _LOGGER.debug("Purge requested while purging, keeping %s days "
+                      "after the running purge", task.keep_days)
+        self._queued_purge = task
+
+    def _save_events_in_batches(self, events):
+        """Save events in batches of commit_batch_size."""
+        for idx in range(0, len(events), self.commit_batch_size):
+            self._save_events(events[idx:idx + self.commit_batch_size])
+
+    def _should_record(self, event):
+        """Return if an event should be saved to the database."""
+        if event.event_type == EVENT_TIME_CHANGED:
+            return False
+        if event.event_type in self.exclude_t:
+            return False
+
+        entity_id = event.data.get(ATTR_ENTITY_ID)
+        return entity_id is None or self.entity_filter(entity_id)
+
+    def _collect_batch(self, event):
+        """Collect the events that are committed together with event.
+
+        A batch is complete when it holds commit_batch_size events, when
+        commit_max_age seconds passed or when a task interrupts it. Returns
+        the events and a list with the interrupting task.
+        """
+        events = [event]
+        deadline = time.monotonic() + self.commit_max_age
+
+        while len(events) < self.commit_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+
+            try:
+                event = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+            if not isinstance(event, Event):
+                return events, [event]
+
+            if self._should_record(event):
+                events.append(event)
+            else:
+                self.queue.task_done()
+
+        return events, []
+
+    def _save_events(self, events):
+        """Save events and their states in a single transaction."""
+        from .models import States, Events
+        from sqlalchemy import exc
+
+        start = timer()
+        tries = 1
+        updated = False
+        while not updated and tries <= 10:
+            if tries != 1:
+                time.sleep(CONNECT_RETRY_WAIT)
+            try:
+                with session_scope(session=self.get_session()) as session:
+                    dbevents = [Events.from_event(event) for event in events]
+                    session.add_all(dbevents)
+                    # Flush all events at once to link their ids to states
+                    session.flush()
+
+                    dbstates = [
+                        (States.from_event(event), dbevent)
+                        for event, dbevent in zip(events, dbevents)
+                        if event.event_type == EVENT_STATE_CHANGED]
+                    attributes_ids = self._get_attributes_ids(
+                        session, [dbstate for dbstate, _ in dbstates])
+
+                    for dbstate, dbevent in dbstates:
+                        dbstate.event_id = dbevent.event_id
+                        dbstate.attributes_id = attributes_ids[
+                            dbstate.state_attributes.shared_attrs]
+
+                    # States are not referenced, insert them in bulk
+                    session.bulk_save_objects(
+                        [dbstate for dbstate, _ in dbstates])
+                updated = True
+                self._cache_attributes_ids(attributes_ids)
+
+            except exc.OperationalError as err:
+                _LOGGER.error("Error in database connectivity: %s. "
+                              "(retrying in %s seconds)", err,
+                              CONNECT_RETRY_WAIT)
+                tries += 1
+
+        if not updated:
+            _LOGGER.error("Error in database update. Could not save "
+                          "after %d tries. Giving up", tries)
+        else:
+            self.metrics.record_commit(len(events), timer() - start)
+            if events:
+                self.committed_until = events[-1].time_fired
+
+        for _ in events:
             self.queue.task_done()
 
+    def _get_attributes_ids(self, session, dbstates):
+        """Return the attributes_id for the attributes of the states.
+
+        Attributes are looked up in the cache, then in the database. Missing
+        attributes are inserted. Returns a dict of attributes JSON to id.
+        """
+        from .models import StateAttributes
+
+        attributes_ids = {}
+        missing = {}
+        for dbstate in dbstates:
+            shared_attrs = dbstate.state_attributes.shared_attrs
+            attributes_id = self.state_attributes_ids.get(shared_attrs)
+            if attributes_id is not None:
+                attributes_ids[shared_attrs] = attributes_id
+            else:
+                missing.setdefault(shared_attrs, dbstate.state_attributes)
+
+        if missing:
+            hashes = set(attrs.hash for attrs in missing.values())
+            for row in session.query(
+                    StateAttributes.attributes_id,
+                    StateAttributes.shared_attrs).filter(
+                        StateAttributes.hash.in_(hashes)):
+                if row.shared_attrs in missing:
+                    attributes_ids[row.shared_attrs] = row.attributes_id
+                    del missing[row.shared_attrs]
+
+        if missing:
+            new_attributes = [
+                StateAttributes(hash=attrs.hash,
+                                shared_attrs=attrs.shared_attrs)
+                for attrs in missing.values()]
+            session.add_all(new_attributes)
+            session.flush()
+            for attrs in new_attributes:
+                attributes_ids[attrs.shared_attrs] = attrs.attributes_id
+
+        return attributes_ids
+
+    def _cache_attributes_ids(self, attributes_ids):
+        """Remember committed attribute ids, evicting the least used."""
+        cache = self.state_attributes_ids
+        for shared_attrs, attributes_id in attributes_ids.items():
+            cache[shared_attrs] = attributes_id
+            cache.move_to_end(shared_attrs)
+
+        while len(cache) > ATTRIBUTES_CACHE_SIZE:
+            cache.popitem(last=False)
+
     @callback
     def event_listener(self, event):
         """Listen for new events and put them in the process queue."""
-        self.queue.put(event)
+        self.queue.put_event(event)
 
     def block_till_done(self):
         """Block till all events processed."""
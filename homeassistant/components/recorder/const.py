@@ -1,3 +1,5 @@
 """Recorder constants."""
 
 DATA_INSTANCE = 'recorder_instance'
+# Sent after the recorder purged old data
+SIGNAL_PURGED = 'recorder_purged'
@@ -0,0 +1,218 @@
+"""Bounded event queue for the recorder."""
+import logging
+import queue
+import threading
+from timeit import default_timer as timer
+
+from homeassistant.const import ATTR_ENTITY_ID, EVENT_STATE_CHANGED
+from homeassistant.core import Event
+
+_LOGGER = logging.getLogger(__name__)
+
+POLICY_DROP_OLDEST = 'drop_oldest'
+POLICY_COALESCE = 'coalesce'
+
+QUEUE_POLICIES = (POLICY_DROP_OLDEST, POLICY_COALESCE)
+
+
+class RecorderMetrics:
+    """Counters describing the recorder queue and database commits."""
+
+    def __init__(self):
+        """Initialize the metrics."""
+        self._lock = threading.Lock()
+        self.queue_depth_max = 0
+        self.events_enqueued = 0
+        self.events_dropped = 0
+        self.events_coalesced = 0
+        self.events_committed = 0
+        self.commits = 0
+        self.enqueue_latency_last = 0.0
+        self.enqueue_latency_max = 0.0
+        self.commit_latency_last = 0.0
+        self.commit_latency_max = 0.0
+
+    def record_enqueue(self, latency, depth):
+        """Record an event that was put in the queue."""
+        with self._lock:
+            self.events_enqueued += 1
+            self.queue_depth_max = max(self.queue_depth_max, depth)
+            self.enqueue_latency_last = latency
+            self.enqueue_latency_max = max(self.enqueue_latency_max, latency)
+
+    def record_drop(self, coalesced=False):
+        """Record an event that will not be saved."""
+        with self._lock:
+            self.events_dropped += 1
+            if coalesced:
+                self.events_coalesced += 1
+
+    def record_commit(self, count, latency):
+        """Record a database commit of count events."""
+        with self._lock:
+            self.commits += 1
+            self.events_committed += count
+            self.commit_latency_last = latency
+            self.commit_latency_max = max(self.commit_latency_max, latency)
+
+    def as_dict(self):
+        """Return the metrics as a dictionary."""
+        with self._lock:
+            return {
+                'queue_depth_max': self.queue_depth_max,
+                'events_enqueued': self.events_enqueued,
+                'events_dropped': self.events_dropped,
+                'events_coalesced': self.events_coalesced,
+                'events_committed': self.events_committed,
+                'commits': self.commits,
+                'enqueue_latency_last': self.enqueue_latency_last,
+                'enqueue_latency_max': self.enqueue_latency_max,
+                'commit_latency_last': self.commit_latency_last,
+                'commit_latency_max': self.commit_latency_max,
+            }
+
+
+class RecorderQueue(queue.Queue):
+    """Queue feeding the recorder thread.
+
+    Only events count towards max_events. Tasks like purges and the shutdown
+    marker are always accepted. Events are put by the event loop, which
+    must never wait for the recorder. When the queue holds max_events
+    events the policy decides which event is discarded:
+
+    - drop_oldest: discard the oldest queued event.
+    - coalesce: replace the queued state change of the same entity, or
+      discard the oldest queued event if there is none.
+    """
+
+    def __init__(self, max_events=0, policy=POLICY_DROP_OLDEST,
+                 metrics=None):
+        """Initialize the queue."""
+        super().__init__()
+        self.max_events = max_events
+        self.policy = policy
+        self.metrics = metrics or RecorderMetrics()
+        self._dropping = False
+
+    # pylint: disable=arguments-differ, attribute-defined-outside-init
+    def _init(self, maxsize):
+        """Initialize the queue representation."""
+        super()._init(maxsize)
+        self._event_count = 0
+        # Queued state changes by entity id, used to coalesce them
+        self._state_slots = {}
+
+    def _put(self, item):
+        """Put a new item in the queue."""
+        if isinstance(item, Event):
+            self._event_count += 1
+            item = [item]
+
+            if item[0].event_type == EVENT_STATE_CHANGED:
+                entity_id = item[0].data.get(ATTR_ENTITY_ID)
+                self._state_slots[entity_id] = item
+
+        super()._put(item)
+
+    def _get(self):
+        """Get the next item from the queue."""
+        item = super()._get()
+
+        if not isinstance(item, list):
+            return item
+
+        self._event_count -= 1
+        event = item[0]
+
+        if event.event_type == EVENT_STATE_CHANGED:
+            entity_id = event.data.get(ATTR_ENTITY_ID)
+            if self._state_slots.get(entity_id) is item:
+                del self._state_slots[entity_id]
+
+        return event
+
+    def put_event(self, event):
+        """Put an event in the queue, applying the full queue policy.
+
+        Never blocks, it is called from the event loop.
+        """
+        start = timer()
+
+        with self.not_full:
+            if self._is_full():
+                if self._coalesce(event):
+                    return
+                self._drop_oldest()
+
+            elif self._dropping:
+                self._dropping = False
+
+            self._put(event)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+            depth = self._event_count
+
+        self.metrics.record_enqueue(timer() - start, depth)
+
+    def metrics_dict(self):
+        """Return the metrics including the current queue depth."""
+        metrics = self.metrics.as_dict()
+        metrics['queue_depth'] = self.events_queued()
+        return metrics
+
+    def events_queued(self):
+        """Return the number of queued events."""
+        with self.mutex:
+            return self._event_count
+
+    def _is_full(self):
+        """Return if the maximum number of events is queued."""
+        return 0 < self.max_events <= self._event_count
+
+    def _coalesce(self, event):
+        """Replace the queued state change of the same entity.
+
+        Returns if the event was coalesced.
+        """
+        if self.policy != POLICY_COALESCE or \
+                event.event_type != EVENT_STATE_CHANGED:
+            return False
+
+        slot = self._state_slots.get(event.data.get(ATTR_ENTITY_ID))
+
+        if slot is None:
+            return False
+
+        slot[0] = event
+        self._warn_dropping()
+        self.metrics.record_drop(coalesced=True)
+        return True
+
+    def _drop_oldest(self):
+        """Remove the oldest event from the queue."""
+        for index, item in enumerate(self.queue):
+            if isinstance(item, list):
+                break
+
+        del self.queue[index]
+        self._event_count -= 1
+        event = item[0]
+
+        if event.event_type == EVENT_STATE_CHANGED:
+            entity_id = event.data.get(ATTR_ENTITY_ID)
+            if self._state_slots.get(entity_id) is item:
+                del self._state_slots[entity_id]
+
+        # The dropped event will never be processed
+        self.unfinished_tasks -= 1
+        self._warn_dropping()
+        self.metrics.record_drop()
+
+    def _warn_dropping(self):
+        """Warn once when the queue starts to drop events."""
+        if self._dropping:
+            return
+
+        self._dropping = True
+        _LOGGER.warning("The recorder queue holds %d events, dropping events "
+                        "until the database catches up", self._event_count)
@@ -218,6 +218,19 @@ def _apply_update(engine, new_version, old_version):
         ])
         _create_index(engine, "states", "ix_states_context_id")
         _create_index(engine, "states", "ix_states_context_user_id")
+    elif new_version == 7:
+        # The state snapshot tables are new and created by create_all.
+        pass
+    elif new_version == 8:
+        # The state_attributes table is created by create_all. Existing
+        # states keep their attributes in the attributes column.
+        _add_columns(engine, "states", [
+            'attributes_id INTEGER',
+        ])
+        _create_index(engine, "states", "ix_states_attributes_id")
+    elif new_version == 9:
+        # The state_rollups table is new and created by create_all.
+        pass
     else:
         raise ValueError("No schema migration defined for version {}"
                          .format(new_version))
@@ -1,12 +1,14 @@
 """Models for SQLAlchemy."""
 import json
 from datetime import datetime
+import hashlib
 import logging
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text,
-    distinct)
+    Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String,
+    Text, distinct)
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 import homeassistant.util.dt as dt_util
 from homeassistant.core import (
@@ -17,7 +19,7 @@ from homeassistant.helpers.json import JSONEncoder
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 6
+SCHEMA_VERSION = 9
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -73,7 +75,12 @@ class States(Base):   # type: ignore
     domain = Column(String(64))
     entity_id = Column(String(255))
     state = Column(String(255))
+    # Attributes of states recorded before schema version 8, newer states
+    # refer to a row in the state_attributes table.
     attributes = Column(Text)
+    attributes_id = Column(Integer,
+                           ForeignKey('state_attributes.attributes_id'),
+                           index=True)
     event_id = Column(Integer, ForeignKey('events.event_id'), index=True)
     last_changed = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_updated = Column(DateTime(timezone=True), default=datetime.utcnow,
@@ -88,6 +95,10 @@ class States(Base):   # type: ignore
         Index(
             'ix_states_entity_id_last_updated', 'entity_id', 'last_updated'),)
 
+    # Loaded with the state, rows shared by states are loaded only once
+    # per session.
+    state_attributes = relationship('StateAttributes', lazy='joined')
+
     @staticmethod
     def from_event(event):
         """Create object from a state_changed event."""
@@ -104,17 +115,16 @@ class States(Base):   # type: ignore
         if state is None:
             dbstate.state = ''
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = '{}'
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes),
-                                            cls=JSONEncoder)
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
+        dbstate.state_attributes = StateAttributes.from_event(event)
+
         return dbstate
 
     def to_native(self):
@@ -124,9 +134,14 @@ class States(Base):   # type: ignore
             user_id=self.context_user_id
         )
         try:
+            if self.state_attributes is not None:
+                attributes = self.state_attributes.to_native()
+            else:
+                attributes = json.loads(self.attributes)
+
             return State(
                 self.entity_id, self.state,
-                json.loads(self.attributes),
+                attributes,
                 _process_timestamp(self.last_changed),
                 _process_timestamp(self.last_updated),
                 context=context,
@@ -137,6 +152,49 @@ class States(Base):   # type: ignore
             return None
 
 
+class StateAttributes(Base):   # type: ignore
+    """State attributes shared by all states that have the same attributes.
+
+    Rows are looked up by the hash of the attributes JSON, the JSON itself
+    has to be compared to rule out hash collisions.
+    """
+
+    __tablename__ = 'state_attributes'
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(String(40), index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def from_event(event):
+        """Create an attributes object from a state_changed event."""
+        state = event.data.get('new_state')
+
+        if state is None:
+            shared_attrs = '{}'
+        else:
+            shared_attrs = json.dumps(dict(state.attributes), cls=JSONEncoder)
+
+        return StateAttributes(
+            hash=hash_shared_attrs(shared_attrs), shared_attrs=shared_attrs)
+
+    def to_native(self):
+        """Return the decoded attributes.
+
+        The attributes are decoded once, all states that share this object
+        share the decoded attributes. They are read-only for HA states.
+        """
+        # pylint: disable=attribute-defined-outside-init
+        native = getattr(self, '_native', None)
+        if native is None:
+            native = self._native = json.loads(self.shared_attrs)
+        return native
+
+
+def hash_shared_attrs(shared_attrs):
+    """Return the hash identifying an attributes JSON string."""
+    return hashlib.sha1(shared_attrs.encode('utf-8')).hexdigest()
+
+
 class RecorderRuns(Base):   # type: ignore
     """Representation of recorder run."""
 
@@ -176,6 +234,50 @@ class RecorderRuns(Base):   # type: ignore
         return self
 
 
+class StateSnapshots(Base):   # type: ignore
+    """Snapshot of the most recent state of all entities at a point in time.
+
+    Used as a starting point to find the states at a specific time, only the
+    state changes after the snapshot need to be searched.
+    """
+
+    __tablename__ = 'state_snapshots'
+    snapshot_id = Column(Integer, primary_key=True)
+    point_in_time = Column(DateTime(timezone=True), index=True)
+    created = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+class SnapshotStates(Base):   # type: ignore
+    """The states that are part of a snapshot."""
+
+    __tablename__ = 'snapshot_states'
+    snapshot_id = Column(Integer, ForeignKey('state_snapshots.snapshot_id'),
+                         primary_key=True)
+    state_id = Column(Integer, ForeignKey('states.state_id'),
+                      primary_key=True, index=True)
+
+
+class StateRollups(Base):   # type: ignore
+    """Aggregated numeric states of an entity during a bucket of time.
+
+    The buckets are ROLLUP_PERIOD long, mean is the mean of the count states
+    recorded in the bucket.
+    """
+
+    __tablename__ = 'state_rollups'
+    rollup_id = Column(Integer, primary_key=True)
+    entity_id = Column(String(255))
+    start = Column(DateTime(timezone=True), index=True)
+    min = Column(Float)
+    max = Column(Float)
+    mean = Column(Float)
+    last = Column(Float)
+    count = Column(Integer)
+
+    __table_args__ = (
+        Index('ix_state_rollups_entity_id_start', 'entity_id', 'start'),)
+
+
 class SchemaChanges(Base):   # type: ignore
     """Representation of schema version changes."""
 
@@ -1,6 +1,8 @@
 """Purge old data helper."""
+from collections import namedtuple
 from datetime import timedelta
 import logging
+from timeit import default_timer as timer
 
 import homeassistant.util.dt as dt_util
 
@@ -8,55 +10,189 @@ from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+PURGE_BATCH_SIZE = 1000
 
-def purge_old_data(instance, purge_days, repack):
+PurgeProgress = namedtuple(
+    'PurgeProgress', ['states_deleted', 'events_deleted', 'elapsed'])
+
+
+def purge_old_data(instance, purge_days, repack,
+                   batch_size=PURGE_BATCH_SIZE):
     """Purge events and states older than purge_days ago."""
-    from .models import States, Events
-    from sqlalchemy import func
+    for _ in purge_old_data_batches(instance, purge_days, repack, batch_size):
+        pass
+
+
+def purge_old_data_batches(instance, purge_days, repack,
+                           batch_size=PURGE_BATCH_SIZE):
+    """Purge events and states older than purge_days ago in batches.
+
+    Every batch deletes at most batch_size rows in its own transaction,
+    walking the table by primary key. A PurgeProgress is yielded after each
+    batch so the caller can write new events before the next batch.
+    """
+    from .models import (
+        Events, SnapshotStates, StateAttributes, StateRollups, States,
+        StateSnapshots)
+    from sqlalchemy import and_, exists, func
+    from sqlalchemy.orm import aliased
 
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
     _LOGGER.debug("Purging events before %s", purge_before)
 
+    start = timer()
+    states_deleted = events_deleted = 0
+
+    # The most recent snapshot before purge_before is kept, it is the
+    # starting point to find the states at the start of the kept period.
+    with session_scope(session=instance.get_session()) as session:
+        keep_snapshot = session.query(func.max(StateSnapshots.point_in_time)) \
+            .filter(StateSnapshots.point_in_time < purge_before).scalar()
+
+        snapshot_ids = []
+        if keep_snapshot is not None:
+            snapshot_ids = [row[0] for row in session.query(
+                StateSnapshots.snapshot_id).filter(
+                    StateSnapshots.point_in_time < keep_snapshot)]
+
+    for snapshot_id in snapshot_ids:
+        with session_scope(session=instance.get_session()) as session:
+            session.query(SnapshotStates) \
+                .filter(SnapshotStates.snapshot_id == snapshot_id) \
+                .delete(synchronize_session=False)
+            session.query(StateSnapshots) \
+                .filter(StateSnapshots.snapshot_id == snapshot_id) \
+                .delete(synchronize_session=False)
+
+        yield _progress(states_deleted, events_deleted, start)
+
+    _LOGGER.debug("Deleted %s snapshots", len(snapshot_ids))
+
+    # For each entity, the most recent state is protected from deletion
+    # s.t. we can properly restore state even if the entity has not been
+    # updated in a long time. A state can go if a newer one exists and no
+    # snapshot refers to it.
+    newer_states = aliased(States)
+    has_newer_state = exists().where(and_(
+        newer_states.entity_id == States.entity_id,
+        newer_states.state_id > States.state_id))
+    in_snapshot = exists().where(SnapshotStates.state_id == States.state_id)
+
     with session_scope(session=instance.get_session()) as session:
-        delete_states = session.query(States) \
-                            .filter((States.last_updated < purge_before))
+        max_state_id = session.query(func.max(States.state_id)) \
+            .filter(States.last_updated < purge_before).scalar()
+
+    last_state_id = 0
+    while max_state_id is not None:
+        with session_scope(session=instance.get_session()) as session:
+            state_ids = [row[0] for row in session.query(States.state_id)
+                         .filter(States.state_id > last_state_id)
+                         .filter(States.state_id <= max_state_id)
+                         .filter(States.last_updated < purge_before)
+                         .filter(has_newer_state)
+                         .filter(~in_snapshot)
+                         .order_by(States.state_id)
+                         .limit(batch_size)]
+
+            if not state_ids:
+                break
+
+            states_deleted += session.query(States) \
+                .filter(States.state_id.in_(state_ids)) \
+                .delete(synchronize_session=False)
+
+        last_state_id = state_ids[-1]
+        yield _progress(states_deleted, events_deleted, start)
+
+    _LOGGER.debug("Deleted %s states", states_deleted)
+
+    # Attributes are shared between states, they can go when no state
+    # refers to them anymore.
+    has_attributes_state = exists().where(
+        States.attributes_id == StateAttributes.attributes_id)
+    attributes_deleted = 0
+    last_attributes_id = 0
+    while states_deleted:
+        with session_scope(session=instance.get_session()) as session:
+            attributes_ids = [
+                row[0] for row in session.query(StateAttributes.attributes_id)
+                .filter(StateAttributes.attributes_id > last_attributes_id)
+                .filter(~has_attributes_state)
+                .order_by(StateAttributes.attributes_id)
+                .limit(batch_size)]
+
+            if not attributes_ids:
+                break
+
+            attributes_deleted += session.query(StateAttributes) \
+                .filter(StateAttributes.attributes_id.in_(attributes_ids)) \
+                .delete(synchronize_session=False)
+
+        # The recorder must not refer to the deleted rows when it saves
+        # new states between the batches.
+        instance.state_attributes_ids.clear()
+        last_attributes_id = attributes_ids[-1]
+        yield _progress(states_deleted, events_deleted, start)
+
+    _LOGGER.debug("Deleted %s state attributes", attributes_deleted)
+
+    # We also need to protect the events belonging to the remaining states.
+    # Otherwise, if the SQL server has "ON DELETE CASCADE" as default, it
+    # will delete the protected state when deleting its associated
+    # event. Also, we would be producing NULLed foreign keys otherwise.
+    has_state = exists().where(States.event_id == Events.event_id)
 
-        # For each entity, the most recent state is protected from deletion
-        # s.t. we can properly restore state even if the entity has not been
-        # updated in a long time
-        protected_states = session.query(func.max(States.state_id)) \
-            .group_by(States.entity_id).all()
+    with session_scope(session=instance.get_session()) as session:
+        max_event_id = session.query(func.max(Events.event_id)) \
+            .filter(Events.time_fired < purge_before).scalar()
+
+    last_event_id = 0
+    while max_event_id is not None:
+        with session_scope(session=instance.get_session()) as session:
+            event_ids = [row[0] for row in session.query(Events.event_id)
+                         .filter(Events.event_id > last_event_id)
+                         .filter(Events.event_id <= max_event_id)
+                         .filter(Events.time_fired < purge_before)
+                         .filter(~has_state)
+                         .order_by(Events.event_id)
+                         .limit(batch_size)]
+
+            if not event_ids:
+                break
+
+            events_deleted += session.query(Events) \
+                .filter(Events.event_id.in_(event_ids)) \
+                .delete(synchronize_session=False)
 
-        protected_state_ids = tuple(state[0] for state in protected_states)
+        last_event_id = event_ids[-1]
+        yield _progress(states_deleted, events_deleted, start)
 
-        if protected_state_ids:
-            delete_states = delete_states \
-                .filter(~States.state_id.in_(protected_state_ids))
+    _LOGGER.debug("Deleted %s events", events_deleted)
 
-        deleted_rows = delete_states.delete(synchronize_session=False)
-        _LOGGER.debug("Deleted %s states", deleted_rows)
+    rollups_deleted = 0
+    while True:
+        with session_scope(session=instance.get_session()) as session:
+            rollup_ids = [
+                row[0] for row in session.query(StateRollups.rollup_id)
+                .filter(StateRollups.start < purge_before)
+                .order_by(StateRollups.rollup_id)
+                .limit(batch_size)]
 
-        delete_events = session.query(Events) \
-            .filter((Events.time_fired < purge_before))
+            if not rollup_ids:
+                break
 
-        # We also need to protect the events belonging to the protected states.
-        # Otherwise, if the SQL server has "ON DELETE CASCADE" as default, it
-        # will delete the protected state when deleting its associated
-        # event. Also, we would be producing NULLed foreign keys otherwise.
-        if protected_state_ids:
-            protected_events = session.query(States.event_id) \
-                .filter(States.state_id.in_(protected_state_ids)) \
-                .filter(States.event_id.isnot(None)) \
-                .all()
+            rollups_deleted += session.query(StateRollups) \
+                .filter(StateRollups.rollup_id.in_(rollup_ids)) \
+                .delete(synchronize_session=False)
 
-            protected_event_ids = tuple(state[0] for state in protected_events)
+        yield _progress(states_deleted, events_deleted, start)
 
-            if protected_event_ids:
-                delete_events = delete_events \
-                    .filter(~Events.event_id.in_(protected_event_ids))
+    _LOGGER.debug("Deleted %s state rollups", rollups_deleted)
 
-        deleted_rows = delete_events.delete(synchronize_session=False)
-        _LOGGER.debug("Deleted %s events", deleted_rows)
+    progress = _progress(states_deleted, events_deleted, start)
+    _LOGGER.info("Purged %d states and %d events in %.2fs (%.0f rows/s)",
+                 progress.states_deleted, progress.events_deleted,
+                 progress.elapsed, _rows_per_second(progress))
 
     # Execute sqlite vacuum command to free up space on disk
     _LOGGER.debug("DB engine driver: %s", instance.engine.driver)
@@ -68,3 +204,20 @@ def purge_old_data(instance, purge_days, repack):
             instance.engine.execute("VACUUM")
         except exc.OperationalError as err:
             _LOGGER.error("Error vacuuming SQLite: %s.", err)
+
+
+def _progress(states_deleted, events_deleted, start):
+    """Return the progress of a purge and log it."""
+    progress = PurgeProgress(states_deleted, events_deleted, timer() - start)
+    _LOGGER.debug("Purge progress: %d states and %d events deleted "
+                  "(%.0f rows/s)", states_deleted, events_deleted,
+                  _rows_per_second(progress))
+    return progress
+
+
+def _rows_per_second(progress):
+    """Return the number of rows deleted per second."""
+    if not progress.elapsed:
+        return 0
+    return (progress.states_deleted + progress.events_deleted) / \
+        progress.elapsed
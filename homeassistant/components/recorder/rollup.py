@@ -0,0 +1,130 @@
+"""Rollups of numeric states for long-range history."""
+from collections import namedtuple
+from datetime import timedelta
+import json
+import logging
+import math
+
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
+import homeassistant.util.dt as dt_util
+
+from .util import session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+# Length of the buckets stored in the state_rollups table, longer buckets
+# are combined from these.
+ROLLUP_PERIOD = timedelta(minutes=5)
+
+# Rows fetched from the database at once when creating rollups
+ROLLUP_BATCH_SIZE = 1000
+
+RollupTask = namedtuple('RollupTask', ['point_in_time'])
+
+
+def bucket_start(point_in_time, period=ROLLUP_PERIOD):
+    """Return the start of the bucket of length period at point_in_time."""
+    timestamp = dt_util.as_timestamp(point_in_time)
+    return dt_util.utc_from_timestamp(
+        timestamp - timestamp % period.total_seconds())
+
+
+def create_rollups(instance, point_in_time, start=None):
+    """Save the rollups of all buckets between start and point_in_time.
+
+    Rollups are created for states that are numeric and have a unit of
+    measurement. Without start, buckets continue after the last rollup in
+    the database, or start at the start of the current recorder run.
+    Returns the end of the last bucket, the start of the next call.
+    """
+    from .models import (
+        StateAttributes, StateRollups, States, _process_timestamp)
+    from sqlalchemy import func
+
+    end = bucket_start(point_in_time)
+
+    with session_scope(session=instance.get_session()) as session:
+        if start is None:
+            last_start = session.query(func.max(StateRollups.start)).scalar()
+            if last_start is None:
+                start = bucket_start(instance.run_info.start)
+            else:
+                start = _process_timestamp(last_start) + ROLLUP_PERIOD
+
+        if start >= end:
+            return start
+
+        query = session.query(
+            States.entity_id, States.state, States.last_updated,
+            States.attributes, States.attributes_id,
+            StateAttributes.shared_attrs
+        ).outerjoin(
+            StateAttributes,
+            States.attributes_id == StateAttributes.attributes_id
+        ).filter(
+            (States.last_updated >= start) &
+            (States.last_updated < end)
+        ).order_by(States.last_updated).yield_per(ROLLUP_BATCH_SIZE)
+
+        buckets = {}
+        has_unit = {}
+
+        for row in query:
+            try:
+                value = float(row.state)
+            except ValueError:
+                continue
+
+            # nan and inf parse as floats but have no place in a rollup
+            if not math.isfinite(value):
+                continue
+
+            if not _has_unit(row, has_unit):
+                continue
+
+            key = (row.entity_id,
+                   bucket_start(_process_timestamp(row.last_updated)))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [value, value, value, 1, value]
+            else:
+                bucket[0] = min(bucket[0], value)
+                bucket[1] = max(bucket[1], value)
+                bucket[2] += value
+                bucket[3] += 1
+                bucket[4] = value
+
+        session.bulk_insert_mappings(StateRollups, [
+            {'entity_id': entity_id, 'start': bucket_time,
+             'min': bucket[0], 'max': bucket[1],
+             'mean': bucket[2] / bucket[3], 'count': bucket[3],
+             'last': bucket[4]}
+            for (entity_id, bucket_time), bucket in buckets.items()])
+
+    _LOGGER.debug("Created %d state rollups between %s and %s",
+                  len(buckets), start, end)
+    return end
+
+
+def _has_unit(row, has_unit):
+    """Return if the attributes of a state row have a unit of measurement.
+
+    Shared attributes are decoded once, has_unit caches the result by
+    attributes_id.
+    """
+    if row.attributes_id is not None:
+        result = has_unit.get(row.attributes_id)
+        if result is None:
+            result = has_unit[row.attributes_id] = \
+                _decode_has_unit(row.shared_attrs)
+        return result
+
+    return _decode_has_unit(row.attributes)
+
+
+def _decode_has_unit(attributes):
+    """Return if the attributes JSON has a unit of measurement."""
+    try:
+        return ATTR_UNIT_OF_MEASUREMENT in json.loads(attributes or '{}')
+    except ValueError:
+        return False
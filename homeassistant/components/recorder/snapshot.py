@@ -0,0 +1,88 @@
+"""Snapshots of the most recent recorded states."""
+from collections import namedtuple
+import logging
+
+from .util import session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+SnapshotTask = namedtuple('SnapshotTask', ['point_in_time'])
+
+
+def create_snapshot(instance, point_in_time):
+    """Save the most recent state of all entities at point_in_time."""
+    from .models import SnapshotStates, StateSnapshots
+
+    with session_scope(session=instance.get_session()) as session:
+        state_ids = most_recent_state_ids(
+            session, point_in_time, instance.run_info.start)
+
+        snapshot = StateSnapshots(point_in_time=point_in_time)
+        session.add(snapshot)
+        session.flush()
+
+        session.bulk_insert_mappings(SnapshotStates, [
+            {'snapshot_id': snapshot.snapshot_id, 'state_id': row[0]}
+            for row in state_ids])
+
+    _LOGGER.debug("Created state snapshot at %s", point_in_time)
+
+
+def most_recent_state_ids(session, point_in_time, run_start):
+    """Return a query for the most recent state id of each entity.
+
+    Only states recorded between run_start and point_in_time are searched.
+    When a snapshot was taken in that period only the states that changed
+    after the most recent snapshot have to be searched. The state ids are
+    labeled max_state_id.
+    """
+    from .models import SnapshotStates, States, StateSnapshots
+
+    snapshot = session.query(StateSnapshots).filter(
+        (StateSnapshots.point_in_time >= run_start) &
+        (StateSnapshots.point_in_time <= point_in_time)
+    ).order_by(StateSnapshots.point_in_time.desc()).first()
+
+    if snapshot is None:
+        return _most_recent_changed_state_ids(
+            session, run_start, point_in_time)
+
+    changed_state_ids = _most_recent_changed_state_ids(
+        session, snapshot.point_in_time, point_in_time)
+
+    changed_entity_ids = session.query(States.entity_id).filter(
+        (States.last_updated >= snapshot.point_in_time) &
+        (States.last_updated < point_in_time))
+
+    snapshot_state_ids = session.query(
+        SnapshotStates.state_id.label('max_state_id')
+    ).join(
+        States, States.state_id == SnapshotStates.state_id
+    ).filter(
+        (SnapshotStates.snapshot_id == snapshot.snapshot_id) &
+        (~States.entity_id.in_(changed_entity_ids.subquery()))
+    )
+
+    return snapshot_state_ids.union_all(changed_state_ids)
+
+
+def _most_recent_changed_state_ids(session, start_time, end_time):
+    """Return a query for the most recent state id of changed entities."""
+    from .models import States
+    from sqlalchemy import and_, func
+
+    most_recent_states_by_date = session.query(
+        States.entity_id.label('max_entity_id'),
+        func.max(States.last_updated).label('max_last_updated')
+    ).filter(
+        (States.last_updated >= start_time) &
+        (States.last_updated < end_time)
+    ).group_by(States.entity_id).subquery()
+
+    return session.query(
+        func.max(States.state_id).label('max_state_id')
+    ).join(most_recent_states_by_date, and_(
+        States.entity_id == most_recent_states_by_date.c.max_entity_id,
+        States.last_updated == most_recent_states_by_date.c.
+        max_last_updated
+    )).group_by(States.entity_id)
@@ -7,8 +7,7 @@ https://home-assistant.io/developers/websocket_api/
 import asyncio
 from concurrent import futures
 from contextlib import suppress
-from functools import partial, wraps
-import json
+from functools import wraps
 import logging
 
 from aiohttp import web
@@ -17,10 +16,12 @@ from voluptuous.humanize import humanize_error
 
 from homeassistant.const import (
     MATCH_ALL, EVENT_TIME_CHANGED, EVENT_HOMEASSISTANT_STOP,
-    __version__)
-from homeassistant.core import Context, callback, HomeAssistant
+    EVENT_STATE_CHANGED, __version__)
+from homeassistant.core import (
+    Context, callback, HomeAssistant, split_entity_id)
 from homeassistant.loader import bind_hass
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import event_to_json
+from homeassistant.util.json import json_dumps
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.components.http import HomeAssistantView
@@ -36,6 +37,8 @@ DEPENDENCIES = ('http',)
 
 MAX_PENDING_MSG = 512
 
+DATA_STATE_PAYLOADS = 'websocket_api_state_payloads'
+
 ERR_ID_REUSE = 1
 ERR_INVALID_FORMAT = 2
 ERR_NOT_FOUND = 3
@@ -54,11 +57,17 @@ TYPE_PING = 'ping'
 TYPE_PONG = 'pong'
 TYPE_RESULT = 'result'
 TYPE_SUBSCRIBE_EVENTS = 'subscribe_events'
+TYPE_SUBSCRIBE_STATES = 'subscribe_states'
 TYPE_UNSUBSCRIBE_EVENTS = 'unsubscribe_events'
 
 _LOGGER = logging.getLogger(__name__)
 
-JSON_DUMP = partial(json.dumps, cls=JSONEncoder)
+JSON_DUMP = json_dumps
+
+# Messages around an encoded event or result, shared by connections
+EVENT_MESSAGE = '{{"id": {}, "type": "event", "event": {}}}'
+RESULT_MESSAGE = '{{"id": {}, "type": "result", "success": true, ' \
+    '"result": {}}}'
 
 AUTH_MESSAGE_SCHEMA = vol.Schema({
     vol.Required('type'): TYPE_AUTH,
@@ -83,6 +92,13 @@ SCHEMA_SUBSCRIBE_EVENTS = BASE_COMMAND_MESSAGE_SCHEMA.extend({
 })
 
 
+SCHEMA_SUBSCRIBE_STATES = BASE_COMMAND_MESSAGE_SCHEMA.extend({
+    vol.Required('type'): TYPE_SUBSCRIBE_STATES,
+    vol.Optional('entity_ids'): cv.entity_ids,
+    vol.Optional('domains'): vol.All(cv.ensure_list, [cv.string]),
+})
+
+
 SCHEMA_UNSUBSCRIBE_EVENTS = BASE_COMMAND_MESSAGE_SCHEMA.extend({
     vol.Required('type'): TYPE_UNSUBSCRIBE_EVENTS,
     vol.Required('subscription'): cv.positive_int,
@@ -148,12 +164,8 @@ def auth_invalid_message(message):
 
 
 def event_message(iden, event):
-    """Return an event message."""
-    return {
-        'id': iden,
-        'type': TYPE_EVENT,
-        'event': event.as_dict(),
-    }
+    """Return an encoded event message."""
+    return EVENT_MESSAGE.format(iden, event_to_json(event))
 
 
 def error_message(iden, code, message):
@@ -220,6 +232,8 @@ async def async_setup(hass, config):
 
     async_register_command(hass, TYPE_SUBSCRIBE_EVENTS,
                            handle_subscribe_events, SCHEMA_SUBSCRIBE_EVENTS)
+    async_register_command(hass, TYPE_SUBSCRIBE_STATES,
+                           handle_subscribe_states, SCHEMA_SUBSCRIBE_STATES)
     async_register_command(hass, TYPE_UNSUBSCRIBE_EVENTS,
                            handle_unsubscribe_events,
                            SCHEMA_UNSUBSCRIBE_EVENTS)
@@ -291,6 +305,10 @@ class ActiveConnection:
                 if message is None:
                     break
                 self.debug("Sending", message)
+                # Messages shared by connections are encoded already
+                if isinstance(message, str):
+                    await self.wsock.send_str(message)
+                    continue
                 try:
                     await self.wsock.send_json(message, dumps=JSON_DUMP)
                 except TypeError as err:
@@ -498,6 +516,115 @@ def handle_subscribe_events(hass, connection, msg):
     connection.to_write.put_nowait(result_message(msg['id']))
 
 
+@callback
+def handle_subscribe_states(hass, connection, msg):
+    """Handle subscribe states command.
+
+    Only changes of the given entities and domains are sent, or all changes
+    without filter. The first change of an entity contains the full new
+    state, the following changes the differences to the last state sent
+    over this connection. Unsubscribe with the unsubscribe events command.
+
+    Async friendly.
+    """
+    entity_ids = set(msg.get('entity_ids', []))
+    domains = set(msg.get('domains', []))
+    payloads = hass.data.get(DATA_STATE_PAYLOADS)
+    if payloads is None:
+        payloads = hass.data[DATA_STATE_PAYLOADS] = StateChangePayloads()
+    # Last state sent by entity id
+    sent_states = {}
+
+    @callback
+    def forward_state_changes(event):
+        """Forward state changes to websocket."""
+        entity_id = event.data['entity_id']
+
+        if (entity_ids or domains) and entity_id not in entity_ids and \
+                split_entity_id(entity_id)[0] not in domains:
+            return
+
+        new_state = event.data.get('new_state')
+        old_state = sent_states.pop(entity_id, None)
+        if new_state is not None:
+            sent_states[entity_id] = new_state
+
+        connection.send_message_outside(EVENT_MESSAGE.format(
+            msg['id'], payloads.get(entity_id, old_state, new_state)))
+
+    connection.event_listeners[msg['id']] = hass.bus.async_listen(
+        EVENT_STATE_CHANGED, forward_state_changes)
+
+    connection.to_write.put_nowait(result_message(msg['id']))
+
+
+class StateChangePayloads:
+    """Encoded state changes shared by all subscribed connections.
+
+    Connections that sent the same last state to their client send the same
+    change, it is encoded once. Only the changes to the most recent new
+    state are kept.
+    """
+
+    def __init__(self):
+        """Initialize the payloads."""
+        self._entity_id = None
+        self._new_state = None
+        self._payloads = {}
+
+    @callback
+    def get(self, entity_id, old_state, new_state):
+        """Return the encoded change from old_state to new_state."""
+        if entity_id != self._entity_id or new_state is not self._new_state:
+            self._entity_id = entity_id
+            self._new_state = new_state
+            self._payloads = {}
+
+        cached = self._payloads.get(id(old_state))
+        if cached is not None and cached[0] is old_state:
+            return cached[1]
+
+        if old_state is None or new_state is None:
+            payload = '{{"entity_id": {}, "new_state": {}}}'.format(
+                JSON_DUMP(entity_id),
+                'null' if new_state is None else new_state.as_json())
+        else:
+            payload = JSON_DUMP({
+                'entity_id': entity_id,
+                'diff': state_diff(old_state, new_state),
+            })
+
+        self._payloads[id(old_state)] = (old_state, payload)
+        return payload
+
+
+def state_diff(old_state, new_state):
+    """Return the changed values and attributes of new_state."""
+    diff = {}
+    if new_state.state != old_state.state:
+        diff['state'] = new_state.state
+    if new_state.last_changed != old_state.last_changed:
+        diff['last_changed'] = new_state.last_changed
+    if new_state.last_updated != old_state.last_updated:
+        diff['last_updated'] = new_state.last_updated
+    if new_state.context.id != old_state.context.id:
+        diff['context'] = new_state.context
+
+    old_attributes = old_state.attributes
+    attributes = {
+        key: value for key, value in new_state.attributes.items()
+        if key not in old_attributes or old_attributes[key] != value}
+    if attributes:
+        diff['attributes'] = attributes
+
+    removed = [key for key in old_attributes
+               if key not in new_state.attributes]
+    if removed:
+        diff['attributes_removed'] = removed
+
+    return diff
+
+
 @callback
 def handle_unsubscribe_events(hass, connection, msg):
     """Handle unsubscribe events command.
@@ -540,8 +667,9 @@ def handle_get_states(hass, connection, msg):
 
     Async friendly.
     """
-    connection.to_write.put_nowait(result_message(
-        msg['id'], hass.states.async_all()))
+    connection.to_write.put_nowait(RESULT_MESSAGE.format(
+        msg['id'], '[{}]'.format(', '.join(
+            state.as_json() for state in hass.states.async_all()))))
 
 
 @callback
@@ -1,6 +1,8 @@
 """Component entity and functionality."""
+import math
 
 from homeassistant.const import ATTR_HIDDEN, ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 from homeassistant.loader import bind_hass
 from homeassistant.util.async_ import run_callback_threadsafe
@@ -13,6 +15,18 @@ ATTR_RADIUS = 'radius'
 
 STATE = 'zoning'
 
+DATA_ZONE_INDEX = 'zone_index'
+
+# Size of the cells of the zone index in degrees
+INDEX_CELL_SIZE = 0.01
+
+# Zones and lookups that cover more cells are not looked up in the grid
+INDEX_MAX_CELLS = 256
+
+# Less than the length of a degree of latitude anywhere on earth, bounding
+# boxes computed with it contain the whole circle
+METERS_PER_DEGREE = 110000
+
 
 @bind_hass
 def active_zone(hass, latitude, longitude, radius=0):
@@ -28,17 +42,15 @@ def async_active_zone(hass, latitude, longitude, radius=0):
 
     This method must be run in the event loop.
     """
-    # Sort entity IDs so that we are deterministic if equal distance to 2 zones
-    zones = (hass.states.get(entity_id) for entity_id
-             in sorted(hass.states.async_entity_ids(DOMAIN)))
+    index = hass.data.get(DATA_ZONE_INDEX)
+
+    if index is None:
+        index = hass.data[DATA_ZONE_INDEX] = ZoneIndex(hass)
 
     min_dist = None
     closest = None
 
-    for zone in zones:
-        if zone.attributes.get(ATTR_PASSIVE):
-            continue
-
+    for zone in index.async_candidates(latitude, longitude, radius):
         zone_dist = distance(
             latitude, longitude,
             zone.attributes[ATTR_LATITUDE], zone.attributes[ATTR_LONGITUDE])
@@ -68,6 +80,109 @@ def in_zone(zone, latitude, longitude, radius=0):
     return zone_dist - radius < zone.attributes[ATTR_RADIUS]
 
 
+class ZoneIndex:
+    """Grid of the active zones to find the zones near a location.
+
+    Every zone is put in the grid cells its circle may overlap. Zones that
+    are too large to put in the grid are candidates for every lookup. Every
+    lookup compares the zone states with the ones the grid was built from
+    and rebuilds it when a zone was added, changed or removed, so lookups
+    right after a change see it.
+    """
+
+    def __init__(self, hass):
+        """Initialize the zone index."""
+        self.hass = hass
+        # The zone states the grid was built from, in state machine order
+        self._states = None
+        # The active zones, sorted by entity id
+        self._zones = []
+        # Indexes in self._zones by cell
+        self._cells = {}
+        self._large_zones = []
+
+    @callback
+    def _async_build(self, states):
+        """Put the active zones in the grid cells."""
+        self._states = states
+        self._zones = []
+        self._cells = {}
+        self._large_zones = []
+
+        # Sort entity IDs so that we are deterministic if equal distance to
+        # 2 zones
+        for zone in sorted(states, key=lambda state: state.entity_id):
+            if zone.attributes.get(ATTR_PASSIVE):
+                continue
+
+            cells = _cells_in_range(
+                zone.attributes[ATTR_LATITUDE],
+                zone.attributes[ATTR_LONGITUDE], zone.attributes[ATTR_RADIUS])
+
+            if cells is None:
+                self._large_zones.append(len(self._zones))
+            else:
+                for cell in cells:
+                    self._cells.setdefault(cell, []).append(len(self._zones))
+
+            self._zones.append(zone)
+
+    @callback
+    def async_candidates(self, latitude, longitude, radius=0):
+        """Return the active zones that may contain the location.
+
+        The zones are sorted by entity id.
+        """
+        # States are replaced when they change, comparing them is cheaper
+        # than computing the distance to every zone.
+        states = [self.hass.states.get(entity_id) for entity_id
+                  in self.hass.states.async_entity_ids(DOMAIN)]
+
+        if self._states is None or len(states) != len(self._states) or \
+                any(new is not old for new, old in zip(states, self._states)):
+            self._async_build(states)
+
+        cells = _cells_in_range(latitude, longitude, radius)
+
+        if cells is None:
+            return self._zones
+
+        found = set(self._large_zones)
+
+        for cell in cells:
+            found.update(self._cells.get(cell, ()))
+
+        return [self._zones[index] for index in sorted(found)]
+
+
+def _cells_in_range(latitude, longitude, radius):
+    """Return the grid cells a circle may overlap.
+
+    Returns None if there are more than INDEX_MAX_CELLS cells or if the
+    circle is close to a pole or the antimeridian.
+    """
+    lat_delta = max(radius, 0) / METERS_PER_DEGREE
+    max_lat = abs(latitude) + lat_delta
+
+    if max_lat >= 89:
+        return None
+
+    lon_delta = lat_delta / math.cos(math.radians(max_lat))
+
+    if abs(longitude) + lon_delta >= 180:
+        return None
+
+    rows = range(math.floor((latitude - lat_delta) / INDEX_CELL_SIZE),
+                 math.floor((latitude + lat_delta) / INDEX_CELL_SIZE) + 1)
+    cols = range(math.floor((longitude - lon_delta) / INDEX_CELL_SIZE),
+                 math.floor((longitude + lon_delta) / INDEX_CELL_SIZE) + 1)
+
+    if len(rows) * len(cols) > INDEX_MAX_CELLS:
+        return None
+
+    return [(row, col) for row in rows for col in cols]
+
+
 class Zone(Entity):
     """Representation of a Zone."""
 
@@ -23,7 +23,8 @@ from homeassistant.const import (
     CONF_UNIT_SYSTEM_IMPERIAL, CONF_TEMPERATURE_UNIT, TEMP_CELSIUS,
     __version__, CONF_CUSTOMIZE, CONF_CUSTOMIZE_DOMAIN, CONF_CUSTOMIZE_GLOB,
     CONF_WHITELIST_EXTERNAL_DIRS, CONF_AUTH_PROVIDERS, CONF_AUTH_MFA_MODULES,
-    CONF_TYPE, CONF_ID)
+    CONF_TYPE, CONF_ID, CONF_PRELOAD_COMPONENTS, CONF_SETUP_CONCURRENCY,
+    CONF_PROFILE_STARTUP)
 from homeassistant.core import callback, DOMAIN as CONF_CORE, HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.loader import get_component, get_platform
@@ -202,6 +203,9 @@ CORE_CONFIG_SCHEMA = CUSTOMIZE_CONFIG_SCHEMA.extend({
         # pylint: disable=no-value-for-parameter
         vol.All(cv.ensure_list, [vol.IsDir()]),
     vol.Optional(CONF_PACKAGES, default={}): PACKAGES_CONFIG_SCHEMA,
+    vol.Optional(CONF_PRELOAD_COMPONENTS, default=False): cv.boolean,
+    vol.Optional(CONF_SETUP_CONCURRENCY, default=0): cv.positive_int,
+    vol.Optional(CONF_PROFILE_STARTUP, default=False): cv.boolean,
     vol.Optional(CONF_AUTH_PROVIDERS):
         vol.All(cv.ensure_list,
                 [auth_providers.AUTH_PROVIDER_SCHEMA.extend({
@@ -514,6 +518,10 @@ async def async_process_ha_core_config(
         hac.whitelist_external_dirs.update(
             set(config[CONF_WHITELIST_EXTERNAL_DIRS]))
 
+    hac.preload_components = config[CONF_PRELOAD_COMPONENTS]
+    hac.setup_concurrency = config[CONF_SETUP_CONCURRENCY]
+    hac.profile_startup = config[CONF_PROFILE_STARTUP]
+
     # Customize
     cust_exact = dict(config[CONF_CUSTOMIZE])
     cust_domain = dict(config[CONF_CUSTOMIZE_DOMAIN])
@@ -111,7 +111,9 @@ CONF_PIN = 'pin'
 CONF_PLATFORM = 'platform'
 CONF_PORT = 'port'
 CONF_PREFIX = 'prefix'
+CONF_PRELOAD_COMPONENTS = 'preload_components'
 CONF_PROFILE_NAME = 'profile_name'
+CONF_PROFILE_STARTUP = 'profile_startup'
 CONF_PROTOCOL = 'protocol'
 CONF_PROXY_SSL = 'proxy_ssl'
 CONF_QUOTE = 'quote'
@@ -126,6 +128,7 @@ CONF_SCAN_INTERVAL = 'scan_interval'
 CONF_SENDER = 'sender'
 CONF_SENSOR_TYPE = 'sensor_type'
 CONF_SENSORS = 'sensors'
+CONF_SETUP_CONCURRENCY = 'setup_concurrency'
 CONF_SHOW_ON_MAP = 'show_on_map'
 CONF_SLAVE = 'slave'
 CONF_SSL = 'ssl'
@@ -398,6 +401,7 @@ URL_API_COMPONENTS = '/api/components'
 URL_API_ERROR_LOG = '/api/error_log'
 URL_API_LOG_OUT = '/api/log_out'
 URL_API_TEMPLATE = '/api/template'
+URL_API_STARTUP_PROFILE = '/api/startup_profile'
 
 HTTP_OK = 200
 HTTP_CREATED = 201
@@ -44,6 +44,7 @@ from homeassistant.util.async_ import (
 from homeassistant import util
 import homeassistant.util.dt as dt_util
 from homeassistant.util import location
+from homeassistant.util.json import json_dumps
 from homeassistant.util.unit_system import UnitSystem, METRIC_SYSTEM  # NOQA
 
 # Typing imports that create a circular dependency
@@ -602,7 +603,8 @@ class State:
     """
 
     __slots__ = ['entity_id', 'state', 'attributes',
-                 'last_changed', 'last_updated', 'context']
+                 'last_changed', 'last_updated', 'context', '_as_json',
+                 '_cache_json']
 
     def __init__(self, entity_id: str, state: Any,
                  attributes: Optional[Dict] = None,
@@ -628,6 +630,9 @@ class State:
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
+        self._as_json = None  # type: Optional[str]
+        # Set by the state machine, which never changes its states
+        self._cache_json = False
 
     @property
     def domain(self) -> str:
@@ -661,6 +666,23 @@ class State:
                 'last_updated': self.last_updated,
                 'context': self.context.as_dict()}
 
+    def as_json(self) -> str:
+        """Return the JSON representation of the State.
+
+        Async friendly.
+
+        The encoding of the states in the state machine is cached, their
+        fields must not be changed. Other states may be changed, for example
+        by history, and are encoded on every call.
+        """
+        if self._as_json is not None:
+            return self._as_json
+
+        as_json = json_dumps(self.as_dict())
+        if self._cache_json:
+            self._as_json = as_json
+        return as_json
+
     @classmethod
     def from_dict(cls, json_dict: Dict) -> Any:
         """Initialize a state from a dict.
@@ -736,10 +758,10 @@ class StateMachine:
         if domain_filter is None:
             return list(self._states.keys())
 
-        domain_filter = domain_filter.lower()
+        prefix = domain_filter.lower() + '.'
 
-        return [state.entity_id for state in self._states.values()
-                if state.domain == domain_filter]
+        return [entity_id for entity_id in self._states
+                if entity_id.startswith(prefix)]
 
     def all(self)-> List[State]:
         """Create a list of all states."""
@@ -851,6 +873,7 @@ class StateMachine:
 
         state = State(entity_id, new_state, attributes, last_changed, None,
                       context)
+        state._cache_json = True  # pylint: disable=protected-access
         self._states[entity_id] = state
         self._bus.async_fire(EVENT_STATE_CHANGED, {
             'entity_id': entity_id,
@@ -1154,6 +1177,16 @@ class Config:
         # List of allowed external dirs to access
         self.whitelist_external_dirs = set()  # type: Set[str]
 
+        # Import the configured components in the executor during startup
+        self.preload_components = False  # type: bool
+
+        # Maximum number of components set up at once during startup,
+        # 0 for no limit
+        self.setup_concurrency = 0  # type: int
+
+        # Record the durations of the component setups during startup
+        self.profile_startup = False  # type: bool
+
     def distance(self, lat: float, lon: float) -> Optional[float]:
         """Calculate distance from Home Assistant.
 
@@ -42,15 +42,21 @@ class DeviceRegistry:
         """Initialize the device registry."""
         self.hass = hass
         self.devices = None
+        # Device ids by identifier, connection and config entry id
+        self._identifier_devices = {}
+        self._connection_devices = {}
+        self._config_entry_devices = {}
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
 
     @callback
     def async_get_device(self, identifiers: set, connections: set):
         """Check if device is registered."""
-        for device in self.devices.values():
-            if any(iden in device.identifiers for iden in identifiers) or \
-                    any(conn in device.connections for conn in connections):
-                return device
+        for index, keys in ((self._identifier_devices, identifiers),
+                            (self._connection_devices, connections)):
+            for key in keys:
+                device_id = index.get(key)
+                if device_id is not None:
+                    return self.devices[device_id]
         return None
 
     @callback
@@ -65,6 +71,8 @@ class DeviceRegistry:
         if device is not None:
             if config_entry not in device.config_entries:
                 device.config_entries.add(config_entry)
+                self._config_entry_devices.setdefault(
+                    config_entry, set()).add(device.id)
                 self.async_schedule_save()
             return device
 
@@ -78,6 +86,7 @@ class DeviceRegistry:
             sw_version=sw_version
         )
         self.devices[device.id] = device
+        self._async_index_device(device)
 
         self.async_schedule_save()
 
@@ -102,6 +111,31 @@ class DeviceRegistry:
             id=device['id'],
         ) for device in devices['devices']}
 
+        self.async_rebuild_index()
+
+    @callback
+    def async_rebuild_index(self):
+        """Index all devices, needed after self.devices was replaced."""
+        self._identifier_devices = {}
+        self._connection_devices = {}
+        self._config_entry_devices = {}
+
+        for device in self.devices.values():
+            self._async_index_device(device)
+
+    @callback
+    def _async_index_device(self, device):
+        """Add a device to the indexes."""
+        for iden in device.identifiers:
+            self._identifier_devices.setdefault(iden, device.id)
+
+        for conn in device.connections:
+            self._connection_devices.setdefault(conn, device.id)
+
+        for config_entry in device.config_entries:
+            self._config_entry_devices.setdefault(
+                config_entry, set()).add(device.id)
+
     @callback
     def async_schedule_save(self):
         """Schedule saving the device registry."""
@@ -130,10 +164,13 @@ class DeviceRegistry:
     @callback
     def async_clear_config_entry(self, config_entry):
         """Clear config entry from registry entries."""
-        for device in self.devices.values():
-            if config_entry in device.config_entries:
-                device.config_entries.remove(config_entry)
-                self.async_schedule_save()
+        device_ids = self._config_entry_devices.pop(config_entry, ())
+
+        for device_id in device_ids:
+            self.devices[device_id].config_entries.remove(config_entry)
+
+        if device_ids:
+            self.async_schedule_save()
 
 
 @bind_hass
@@ -4,6 +4,8 @@ import asyncio
 from homeassistant.const import DEVICE_DEFAULT_NAME
 from homeassistant.core import callback, valid_entity_id, split_entity_id
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
+from homeassistant.profiler import (
+    CATEGORY_FIRST_ENTITIES, CATEGORY_PLATFORM, profile)
 from homeassistant.util.async_ import (
     run_callback_threadsafe, run_coroutine_threadsafe)
 
@@ -121,20 +123,22 @@ class EntityPlatform:
             self.platform_name, SLOW_SETUP_WARNING)
 
         try:
-            task = async_create_setup_task()
+            with profile(hass, CATEGORY_PLATFORM, full_name):
+                task = async_create_setup_task()
 
-            await asyncio.wait_for(
-                asyncio.shield(task, loop=hass.loop),
-                SLOW_SETUP_MAX_WAIT, loop=hass.loop)
+                await asyncio.wait_for(
+                    asyncio.shield(task, loop=hass.loop),
+                    SLOW_SETUP_MAX_WAIT, loop=hass.loop)
 
-            # Block till all entities are done
-            if self._tasks:
-                pending = [task for task in self._tasks if not task.done()]
-                self._tasks.clear()
+                # Block till all entities are done
+                if self._tasks:
+                    pending = [task for task in self._tasks
+                               if not task.done()]
+                    self._tasks.clear()
 
-                if pending:
-                    await asyncio.wait(
-                        pending, loop=self.hass.loop)
+                    if pending:
+                        await asyncio.wait(
+                            pending, loop=self.hass.loop)
 
             hass.config.components.add(full_name)
             return True
@@ -222,7 +226,12 @@ class EntityPlatform:
         if not tasks:
             return
 
-        await asyncio.wait(tasks, loop=self.hass.loop)
+        if self.entities:
+            await asyncio.wait(tasks, loop=self.hass.loop)
+        else:
+            with profile(hass, CATEGORY_FIRST_ENTITIES,
+                         '{}.{}'.format(self.domain, self.platform_name)):
+                await asyncio.wait(tasks, loop=self.hass.loop)
         self.async_entities_added_callback()
 
         if self._async_unsub_polling is not None or \
@@ -78,6 +78,10 @@ class EntityRegistry:
         """Initialize the registry."""
         self.hass = hass
         self.entities = None
+        # Entity ids by (domain, platform, unique_id)
+        self._entity_ids = {}
+        # Entity ids by config entry id
+        self._config_entry_entity_ids = {}
         self._store = hass.helpers.storage.Store(STORAGE_VERSION, STORAGE_KEY)
 
     @callback
@@ -88,11 +92,7 @@ class EntityRegistry:
     @callback
     def async_get_entity_id(self, domain: str, platform: str, unique_id: str):
         """Check if an entity_id is currently registered."""
-        for entity in self.entities.values():
-            if entity.domain == domain and entity.platform == platform and \
-               entity.unique_id == unique_id:
-                return entity.entity_id
-        return None
+        return self._entity_ids.get((domain, platform, unique_id))
 
     @callback
     def async_generate_entity_id(self, domain, suggested_object_id):
@@ -133,6 +133,7 @@ class EntityRegistry:
             platform=platform,
         )
         self.entities[entity_id] = entity
+        self._async_index_entry(entity)
         _LOGGER.info('Registered new %s.%s entity: %s',
                      domain, platform, entity_id)
         self.async_schedule_save()
@@ -184,7 +185,9 @@ class EntityRegistry:
         if not changes:
             return old
 
+        self._async_unindex_entry(old)
         new = self.entities[entity_id] = attr.evolve(old, **changes)
+        self._async_index_entry(new)
 
         to_remove = []
         for listener_ref in new.update_listeners:
@@ -226,6 +229,39 @@ class EntityRegistry:
                 )
 
         self.entities = entities
+        self.async_rebuild_index()
+
+    @callback
+    def async_rebuild_index(self):
+        """Index all entities, needed after self.entities was replaced."""
+        self._entity_ids = {}
+        self._config_entry_entity_ids = {}
+
+        for entry in self.entities.values():
+            self._async_index_entry(entry)
+
+    @callback
+    def _async_index_entry(self, entry):
+        """Add an entry to the indexes."""
+        self._entity_ids.setdefault(
+            (entry.domain, entry.platform, entry.unique_id), entry.entity_id)
+
+        if entry.config_entry_id is not None:
+            self._config_entry_entity_ids.setdefault(
+                entry.config_entry_id, set()).add(entry.entity_id)
+
+    @callback
+    def _async_unindex_entry(self, entry):
+        """Remove an entry from the indexes."""
+        key = (entry.domain, entry.platform, entry.unique_id)
+        if self._entity_ids.get(key) == entry.entity_id:
+            del self._entity_ids[key]
+
+        entity_ids = self._config_entry_entity_ids.get(entry.config_entry_id)
+        if entity_ids is not None:
+            entity_ids.discard(entry.entity_id)
+            if not entity_ids:
+                del self._config_entry_entity_ids[entry.config_entry_id]
 
     @callback
     def async_schedule_save(self):
@@ -253,10 +289,13 @@ class EntityRegistry:
     @callback
     def async_clear_config_entry(self, config_entry):
         """Clear config entry from registry entries."""
-        for entry in self.entities.values():
-            if config_entry == entry.config_entry_id:
-                entry.config_entry_id = None
-                self.async_schedule_save()
+        entity_ids = self._config_entry_entity_ids.pop(config_entry, ())
+
+        for entity_id in entity_ids:
+            self.entities[entity_id].config_entry_id = None
+
+        if entity_ids:
+            self.async_schedule_save()
 
 
 @bind_hass
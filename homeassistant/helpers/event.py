@@ -1,6 +1,9 @@
 """Helpers for listening to events."""
 from datetime import timedelta
 import functools as ft
+import heapq
+import itertools
+import logging
 
 from homeassistant.loader import bind_hass
 from homeassistant.helpers.sun import get_astral_event_next
@@ -10,6 +13,11 @@ from ..const import (
 from ..util import dt as dt_util
 from ..util.async_ import run_callback_threadsafe
 
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STATE_CHANGE_LISTENERS = 'track_state_change_listeners'
+DATA_TIME_LISTENERS = 'track_time_listeners'
+
 # PyLint does not like the use of threaded_listener_factory
 # pylint: disable=invalid-name
 
@@ -63,10 +71,6 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
     @callback
     def state_change_listener(event):
         """Handle specific state changes."""
-        if entity_ids != MATCH_ALL and \
-           event.data.get('entity_id') not in entity_ids:
-            return
-
         old_state = event.data.get('old_state')
         if old_state is not None:
             old_state = old_state.state
@@ -80,12 +84,76 @@ def async_track_state_change(hass, entity_ids, action, from_state=None,
                                event.data.get('old_state'),
                                event.data.get('new_state'))
 
-    return hass.bus.async_listen(EVENT_STATE_CHANGED, state_change_listener)
+    if entity_ids == MATCH_ALL:
+        return hass.bus.async_listen(
+            EVENT_STATE_CHANGED, state_change_listener)
+
+    return _async_add_entity_listener(
+        hass, entity_ids, state_change_listener)
 
 
 track_state_change = threaded_listener_factory(async_track_state_change)
 
 
+@callback
+def _async_add_entity_listener(hass, entity_ids, listener):
+    """Register a state changed listener for specific entity ids.
+
+    All listeners share a single EVENT_STATE_CHANGED bus listener that
+    looks up the entity id of the event in an index. This keeps the cost
+    of a state change independent of the number of tracked entities.
+    """
+    entity_listeners = hass.data.get(DATA_STATE_CHANGE_LISTENERS)
+
+    if entity_listeners is None:
+        entity_listeners = hass.data[DATA_STATE_CHANGE_LISTENERS] = {}
+
+        @callback
+        def _async_state_change_dispatcher(event):
+            """Dispatch state changes to the listeners of the entity."""
+            entity_id = event.data.get('entity_id')
+            listeners = entity_listeners.get(entity_id)
+
+            if not listeners:
+                return
+
+            # Copy, listeners are allowed to remove themselves
+            for target in list(listeners):
+                try:
+                    target(event)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "Error while dispatching state change of %s",
+                        entity_id)
+
+        hass.bus.async_listen(
+            EVENT_STATE_CHANGED, _async_state_change_dispatcher)
+
+    # Ignore duplicates so the listener only runs once per state change
+    entity_ids = set(entity_ids)
+
+    for entity_id in entity_ids:
+        entity_listeners.setdefault(entity_id, []).append(listener)
+
+    @callback
+    def remove_listener():
+        """Remove the listener from the index."""
+        for entity_id in entity_ids:
+            listeners = entity_listeners.get(entity_id)
+
+            if listeners is None or listener not in listeners:
+                continue
+
+            listeners.remove(listener)
+
+            if not listeners:
+                entity_listeners.pop(entity_id)
+
+        entity_ids.clear()
+
+    return remove_listener
+
+
 @callback
 @bind_hass
 def async_track_template(hass, template, action, variables=None):
@@ -192,27 +260,12 @@ def async_track_point_in_utc_time(hass, action, point_in_time):
     point_in_time = dt_util.as_utc(point_in_time)
 
     @callback
-    def point_in_time_listener(event):
-        """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
-        if now < point_in_time or hasattr(point_in_time_listener, 'run'):
-            return
-
-        # Set variable so that we will never run twice.
-        # Because the event bus might have to wait till a thread comes
-        # available to execute this listener it might occur that the
-        # listener gets lined up twice to be executed. This will make
-        # sure the second time it does nothing.
-        point_in_time_listener.run = True
-        async_unsub()
-
+    def point_in_time_listener(now):
+        """Run the action once point_in_time passed."""
         hass.async_run_job(action, now)
 
-    async_unsub = hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                        point_in_time_listener)
-
-    return async_unsub
+    return _async_get_time_listeners(hass).async_add_point_in_time(
+        point_in_time, point_in_time_listener)
 
 
 track_point_in_utc_time = threaded_listener_factory(
@@ -324,34 +377,38 @@ def async_track_utc_time_change(hass, action, year=None, month=None, day=None,
     """Add a listener that will fire if time matches a pattern."""
     # We do not have to wrap the function with time pattern matching logic
     # if no pattern given
+    time_listeners = _async_get_time_listeners(hass)
+
     if all(val is None for val in (year, month, day, hour, minute, second)):
         @callback
-        def time_change_listener(event):
+        def time_change_listener(now):
             """Fire every time event that comes in."""
-            hass.async_run_job(action, event.data[ATTR_NOW])
+            hass.async_run_job(action, now)
 
-        return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
+        return time_listeners.async_add_time_pattern(
+            range(60), time_change_listener)
 
     pmp = _process_time_match
     year, month, day = pmp(year), pmp(month), pmp(day)
     hour, minute, second = pmp(hour), pmp(minute), pmp(second)
 
     @callback
-    def pattern_time_change_listener(event):
+    def pattern_time_change_listener(now):
         """Listen for matching time_changed events."""
-        now = event.data[ATTR_NOW]
-
         if local:
             now = dt_util.as_local(now)
 
         # pylint: disable=too-many-boolean-expressions
-        if second(now.second) and minute(now.minute) and hour(now.hour) and \
-           day(now.day) and month(now.month) and year(now.year):
+        if minute(now.minute) and hour(now.hour) and day(now.day) and \
+           month(now.month) and year(now.year):
 
             hass.async_run_job(action, now)
 
-    return hass.bus.async_listen(EVENT_TIME_CHANGED,
-                                 pattern_time_change_listener)
+    # The second is the same in UTC and local time, the listener is only
+    # called on the seconds that match.
+    return time_listeners.async_add_time_pattern(
+        [value for value in range(60) if second(value)],
+        pattern_time_change_listener)
 
 
 track_utc_time_change = threaded_listener_factory(async_track_utc_time_change)
@@ -395,3 +452,113 @@ def _process_time_match(parameter):
 
     parameter = tuple(parameter)
     return lambda time: time in parameter
+
+
+@callback
+def _async_get_time_listeners(hass):
+    """Return the time listeners of hass."""
+    time_listeners = hass.data.get(DATA_TIME_LISTENERS)
+
+    if time_listeners is None:
+        time_listeners = hass.data[DATA_TIME_LISTENERS] = \
+            _TimeListeners(hass)
+
+    return time_listeners
+
+
+class _TimeListeners:
+    """Dispatch time changes to the time listeners.
+
+    All listeners share a single EVENT_TIME_CHANGED bus listener. Point in
+    time listeners are kept in a heap, a time change only looks at the ones
+    that are due. Time pattern listeners are kept in a slot for each second
+    they match, a time change only checks the patterns of its second.
+    """
+
+    def __init__(self, hass):
+        """Initialize the time listeners."""
+        # Entries are [point_in_time, sequence, listener], the listener is
+        # set to None when the entry is removed or ran.
+        self._points_in_time = []
+        self._removed_points = 0
+        self._sequence = itertools.count()
+        self._second_slots = [[] for _ in range(60)]
+
+        hass.bus.async_listen(EVENT_TIME_CHANGED, self._async_time_changed)
+
+    @callback
+    def async_add_point_in_time(self, point_in_time, listener):
+        """Call listener once with the first time at or after point_in_time.
+
+        Returns a function to remove the listener.
+        """
+        entry = [point_in_time, next(self._sequence), listener]
+        heapq.heappush(self._points_in_time, entry)
+
+        @callback
+        def remove_listener():
+            """Remove the listener if it did not run yet."""
+            if entry[2] is None:
+                return
+
+            entry[2] = None
+            self._removed_points += 1
+
+            # Removed entries stay in the heap until they are due, compact
+            # the heap when they make up most of it.
+            if self._removed_points > len(self._points_in_time) // 2:
+                self._points_in_time = [
+                    item for item in self._points_in_time
+                    if item[2] is not None]
+                heapq.heapify(self._points_in_time)
+                self._removed_points = 0
+
+        return remove_listener
+
+    @callback
+    def async_add_time_pattern(self, seconds, listener):
+        """Call listener with every time that has one of the seconds.
+
+        Returns a function to remove the listener.
+        """
+        slots = [self._second_slots[second] for second in seconds]
+
+        for slot in slots:
+            slot.append(listener)
+
+        @callback
+        def remove_listener():
+            """Remove the listener from its slots."""
+            for slot in slots:
+                if listener in slot:
+                    slot.remove(listener)
+
+            slots.clear()
+
+        return remove_listener
+
+    @callback
+    def _async_time_changed(self, event):
+        """Call the listeners that are due at the time of event."""
+        now = event.data[ATTR_NOW]
+        points_in_time = self._points_in_time
+        due = []
+
+        while points_in_time and points_in_time[0][0] <= now:
+            entry = heapq.heappop(points_in_time)
+
+            if entry[2] is None:
+                self._removed_points -= 1
+                continue
+
+            due.append(entry[2])
+            entry[2] = None
+
+        # Copy, listeners are allowed to remove themselves
+        due.extend(self._second_slots[now.second])
+
+        for listener in due:
+            try:
+                listener(now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error while dispatching time change")
@@ -1,10 +1,11 @@
 """Helpers to help with encoding Home Assistant objects in JSON."""
-from datetime import datetime
 import json
 import logging
 
 from typing import Any
 
+from homeassistant.util.json import json_default, json_dumps
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -17,11 +18,32 @@ class JSONEncoder(json.JSONEncoder):
 
         Hand other objects to the original method.
         """
-        if isinstance(o, datetime):
-            return o.isoformat()
-        if isinstance(o, set):
-            return list(o)
-        if hasattr(o, 'as_dict'):
-            return o.as_dict()
-
-        return json.JSONEncoder.default(self, o)
+        try:
+            return json_default(o)
+        except TypeError:
+            return json.JSONEncoder.default(self, o)
+
+
+def event_to_json(event: Any) -> str:
+    """Return the JSON representation of an event.
+
+    States in the event data are inserted with their cached encoding.
+    """
+    from homeassistant.core import State
+
+    event_dict = event.as_dict()
+    data = event_dict.pop('data')
+
+    if not any(isinstance(value, State) for value in data.values()):
+        event_dict['data'] = data
+        return json_dumps(event_dict)
+
+    data_json = ','.join(
+        '{}:{}'.format(
+            json_dumps(key),
+            value.as_json() if isinstance(value, State)
+            else json_dumps(value))
+        for key, value in data.items())
+
+    return '{},"data":{{{}}}}}'.format(
+        json_dumps(event_dict)[:-1], data_json)
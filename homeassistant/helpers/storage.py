@@ -46,10 +46,15 @@ async def async_migrator(hass, old_path, store, *,
 class Store:
     """Class to help storing data."""
 
-    def __init__(self, hass, version: int, key: str):
-        """Initialize storage class."""
+    def __init__(self, hass, version: int, key: str, compact: bool = False):
+        """Initialize storage class.
+
+        Compact stores are written without indentation, which is faster
+        for large data.
+        """
         self.version = version
         self.key = key
+        self.compact = compact
         self.hass = hass
         self._data = None
         self._unsub_delay_listener = None
@@ -186,7 +191,7 @@ class Store:
             os.makedirs(os.path.dirname(path))
 
         _LOGGER.debug('Writing data for %s', self.key)
-        json.save_json(path, data)
+        json.save_json(path, data, self.compact)
 
     async def _async_migrate_func(self, old_version, old_data):
         """Migrate to the new version."""
@@ -10,17 +10,25 @@ call get_component(hass, 'switch.your_platform'). In both cases the config
 directory is checked to see if it contains a user provided version. If not
 available it will check the built-in components and platforms.
 """
+import asyncio
 import functools as ft
 import importlib
+import importlib.machinery
 import logging
+import os
 import sys
 from types import ModuleType
 
 # pylint: disable=unused-import
-from typing import Optional, Set, TYPE_CHECKING, Callable, Any, TypeVar  # NOQA
+from typing import (  # NOQA
+    Optional, Set, TYPE_CHECKING, Callable, Any, TypeVar, Dict, Iterable,
+    List)
 
 from homeassistant.const import PLATFORM_FORMAT
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.profiler import CATEGORY_IMPORT, profile
 from homeassistant.util import OrderedSet
+from homeassistant.util.json import load_json, save_json
 
 # Typing imports that create a circular dependency
 # pylint: disable=using-constant-test,unused-import
@@ -37,9 +45,14 @@ _LOGGER = logging.getLogger(__name__)
 
 
 DATA_KEY = 'components'
+DATA_INDEX = 'component_index'
 PATH_CUSTOM_COMPONENTS = 'custom_components'
 PACKAGE_COMPONENTS = 'homeassistant.components'
 
+# File in the config dir caching which components and platforms exist
+COMPONENT_INDEX_FILE = '.component_index.json'
+COMPONENT_INDEX_VERSION = 2
+
 
 def set_component(hass,  # type: HomeAssistant
                   comp_name: str, component: Optional[ModuleType]) -> None:
@@ -75,23 +88,93 @@ def get_component(hass,  # type: HomeAssistant
     except KeyError:
         pass
 
-    cache = hass.data.get(DATA_KEY)
-    if cache is None:
-        if hass.config.config_dir is None:
+    if not _prepare_cache(hass):
+        return None
+
+    module = _import_component(hass, comp_or_platform, True)
+
+    if module is None:
+        _LOGGER.error("Unable to find component %s", comp_or_platform)
+
+    return module
+
+
+async def async_preload_components(hass,  # type: HomeAssistant
+                                   comp_or_platforms: Iterable[str]) -> None:
+    """Import components and platforms concurrently in the executor.
+
+    The modules are put in the cache, get_component returns them without
+    importing them in the event loop. Import errors are logged by
+    get_component when the component is needed, other errors are logged
+    here.
+    """
+    if not _prepare_cache(hass):
+        return
+
+    cache = hass.data[DATA_KEY]
+    tasks = {comp_or_platform: hass.async_add_executor_job(
+        _import_component, hass, comp_or_platform, False)
+             for comp_or_platform in set(comp_or_platforms)
+             if comp_or_platform not in cache}
+
+    if not tasks:
+        return
+
+    await asyncio.wait(tasks.values(), loop=hass.loop)
+
+    for comp_or_platform, task in tasks.items():
+        err = task.exception()
+        if err is not None:
+            _LOGGER.error("Error preloading %s", comp_or_platform,
+                          exc_info=err)
+
+
+def _prepare_cache(hass) -> bool:  # type: ignore
+    """Set up the component cache and index.
+
+    Returns False if components can't be loaded.
+    """
+    if DATA_INDEX in hass.data:
+        return True
+
+    config_dir = hass.config.config_dir
+
+    # The cache exists already when components were set (happens in tests)
+    if DATA_KEY not in hass.data:
+        if config_dir is None:
             _LOGGER.error("Can't load components - config dir is not set")
-            return None
+            return False
         # Only insert if it's not there (happens during tests)
-        if sys.path[0] != hass.config.config_dir:
-            sys.path.insert(0, hass.config.config_dir)
-        cache = hass.data[DATA_KEY] = {}
+        if sys.path[0] != config_dir:
+            sys.path.insert(0, config_dir)
+        hass.data[DATA_KEY] = {}
+
+    hass.data[DATA_INDEX] = None if config_dir is None else \
+        _load_component_index(config_dir)
+    return True
+
+
+def _import_component(hass,  # type: HomeAssistant
+                      comp_or_platform: str,
+                      log_errors: bool) -> Optional[ModuleType]:
+    """Import a component or platform and put it in the cache."""
+    cache = hass.data[DATA_KEY]
+    component_index = hass.data[DATA_INDEX]
 
     # First check custom, then built-in
     potential_paths = ['custom_components.{}'.format(comp_or_platform),
                        'homeassistant.components.{}'.format(comp_or_platform)]
 
     for index, path in enumerate(potential_paths):
+        # The index only knows components and platforms, not their modules
+        if component_index is not None and \
+                comp_or_platform.count('.') < 2 and \
+                comp_or_platform not in component_index[index]:
+            continue
+
         try:
-            module = importlib.import_module(path)
+            with profile(hass, CATEGORY_IMPORT, comp_or_platform):
+                module = importlib.import_module(path)
 
             # In Python 3 you can import files from directories that do not
             # contain the file __init__.py. A directory is a valid module if
@@ -131,16 +214,112 @@ def get_component(hass,  # type: HomeAssistant
                 white_listed_errors.append(
                     "No module named '{}'".format('.'.join(parts)))
 
-            if str(err) not in white_listed_errors:
+            if log_errors and str(err) not in white_listed_errors:
                 _LOGGER.exception(
                     ("Error loading %s. Make sure all "
                      "dependencies are installed"), path)
 
-    _LOGGER.error("Unable to find component %s", comp_or_platform)
-
     return None
 
 
+def _load_component_index(config_dir: str) -> Optional[List[Set[str]]]:
+    """Return the names of the custom and the built-in components.
+
+    Platforms are included as <component>.<platform>. The index is cached
+    in the config dir and rebuilt when a modification time of the scanned
+    directories changed. Returns None if the index is not available.
+    """
+    roots = [os.path.join(config_dir, PATH_CUSTOM_COMPONENTS),
+             os.path.join(os.path.dirname(__file__), 'components')]
+    index_path = os.path.join(config_dir, COMPONENT_INDEX_FILE)
+
+    try:
+        cached = load_json(index_path)
+    except HomeAssistantError:
+        cached = {}
+
+    if cached.get('version') == COMPONENT_INDEX_VERSION and \
+            cached.get('roots') == roots and \
+            all(_mtime(path) == mtime
+                for path, mtime in cached['directories'].items()):
+        return [set(names) for names in cached['modules']]
+
+    directories = {}  # type: Dict[str, Optional[float]]
+    modules = []
+    try:
+        for root in roots:
+            modules.append(sorted(_scan_components(root, directories)))
+    except OSError as err:
+        _LOGGER.warning("Unable to index components: %s", err)
+        return None
+
+    try:
+        save_json(index_path, {
+            'version': COMPONENT_INDEX_VERSION,
+            'roots': roots,
+            'directories': directories,
+            'modules': modules,
+        }, compact=True)
+    except HomeAssistantError:
+        pass
+
+    return [set(names) for names in modules]
+
+
+def _scan_components(root: str,
+                     directories: Dict[str, Optional[float]]) -> Set[str]:
+    """Return the components and platforms in root.
+
+    The scanned directories and their modification times are added to
+    directories. A missing root is recorded without modification time.
+    """
+    directories[root] = _mtime(root)
+    if directories[root] is None:
+        return set()
+
+    names = set(_scan_modules(root))
+
+    # Directories without __init__.py can still hold platforms
+    for entry in os.scandir(root):
+        if entry.name.startswith('__') or not entry.name.isidentifier() or \
+                not entry.is_dir():
+            continue
+
+        directories[entry.path] = _mtime(entry.path)
+        names.update('{}.{}'.format(entry.name, platform)
+                     for platform in _scan_modules(entry.path))
+
+    return names
+
+
+def _scan_modules(path: str) -> Iterable[str]:
+    """Yield the names of the modules and packages in path.
+
+    Modules are files with any suffix the import system loads, like .pyc
+    and extension modules. Packages are directories with an __init__ module.
+    """
+    suffixes = importlib.machinery.all_suffixes()
+    for entry in os.scandir(path):
+        if entry.is_dir():
+            name = entry.name
+            if not any(os.path.isfile(os.path.join(
+                    entry.path, '__init__' + suffix)) for suffix in suffixes):
+                continue
+        else:
+            name = next((entry.name[:-len(suffix)] for suffix in suffixes
+                         if entry.name.endswith(suffix)), '')
+        if not name.startswith('__') and name.isidentifier():
+            yield name
+
+
+def _mtime(path: str) -> Optional[float]:
+    """Return the modification time of path or None if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
 class ModuleWrapper:
     """Class to wrap a Python module and auto fill in hass argument."""
 
@@ -0,0 +1,120 @@
+"""Measure where the time goes while Home Assistant starts."""
+from contextlib import contextmanager
+import threading
+from timeit import default_timer as timer
+
+# pylint: disable=unused-import
+from typing import (  # NOQA
+    Any, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING)
+
+# Typing imports that create a circular dependency
+# pylint: disable=using-constant-test,unused-import
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant  # NOQA
+
+# hass.data key of the StartupProfiler, only set when startup is profiled
+DATA_PROFILER = 'startup_profiler'
+
+# File in the config dir the startup profile is written to
+PROFILE_FILE = '.startup_profile.json'
+
+CATEGORY_IMPORT = 'import'
+CATEGORY_REQUIREMENTS = 'requirements'
+CATEGORY_CONFIG = 'config'
+CATEGORY_SETUP = 'setup'
+CATEGORY_PLATFORM = 'platform'
+CATEGORY_FIRST_ENTITIES = 'first_entities'
+
+
+class StartupProfiler:
+    """Collect the durations of the steps that set up components.
+
+    Every span is the category of the step, the component or platform it
+    belongs to, its start and end time and the thread it ran in.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the profiler."""
+        self.start = timer()
+        self.end = None  # type: Optional[float]
+        self.spans = []  # type: List[Tuple[str, str, float, float, int]]
+
+    @property
+    def active(self) -> bool:
+        """Return if spans are recorded."""
+        return self.end is None
+
+    def record(self, category: str, name: str, start: float,
+               end: float) -> None:
+        """Record a span. Can be called from any thread."""
+        if self.end is None:
+            self.spans.append(
+                (category, name, start, end, threading.get_ident()))
+
+    def finish(self) -> None:
+        """Stop recording spans."""
+        if self.end is None:
+            self.end = timer()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the total durations by component or platform."""
+        durations = {}  # type: Dict[str, Dict[str, float]]
+
+        for category, name, start, end, _ in self.spans:
+            steps = durations.setdefault(name, {})
+            steps[category] = steps.get(category, 0) + end - start
+
+        return {
+            'total': (self.end or timer()) - self.start,
+            'finished': self.end is not None,
+            'durations': durations,
+        }
+
+    def as_trace(self) -> Dict[str, Any]:
+        """Return the spans in the trace event format.
+
+        Every component and platform gets its own track, Chrome and Perfetto
+        can open the result.
+        """
+        tids = {}  # type: Dict[str, int]
+        events = []  # type: List[Dict[str, Any]]
+
+        for category, name, start, end, thread in self.spans:
+            tid = tids.get(name)
+
+            if tid is None:
+                tid = tids[name] = len(tids) + 1
+                events.append({
+                    'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid,
+                    'args': {'name': name},
+                })
+
+            events.append({
+                'name': category,
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - self.start) * 1000000),
+                'dur': round((end - start) * 1000000),
+                'pid': 1,
+                'tid': tid,
+                'args': {'name': name, 'thread': thread},
+            })
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+@contextmanager
+def profile(hass,  # type: HomeAssistant
+            category: str, name: str) -> Iterator[None]:
+    """Record how long the block takes when startup is profiled."""
+    profiler = hass.data.get(DATA_PROFILER)
+
+    if profiler is None or not profiler.active:
+        yield
+        return
+
+    start = timer()
+    try:
+        yield
+    finally:
+        profiler.record(category, name, start, timer())
@@ -11,10 +11,14 @@ import pkg_resources
 
 import homeassistant.util.package as pkg_util
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.json import load_json, save_json
 
 DATA_PIP_LOCK = 'pip_lock'
 DATA_PKG_CACHE = 'pkg_cache'
 CONSTRAINT_FILE = 'package_constraints.txt'
+# File in the config dir caching the installed distributions
+REQUIREMENTS_INDEX_FILE = '.requirements_index.json'
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -41,6 +45,7 @@ async def async_process_requirements(hass: HomeAssistant, name: str,
                 continue
 
             ret = await hass.async_add_executor_job(pip_install, req)
+            pkg_cache.invalidate()
 
             if not ret:
                 _LOGGER.error("Not initializing %s because could not install "
@@ -61,21 +66,31 @@ def pip_kwargs(config_dir: Optional[str]) -> Dict[str, Any]:
 
 
 class PackageLoadable:
-    """Class to check if a package is loadable, with built-in cache."""
+    """Class to check if a package is loadable, with built-in cache.
+
+    The versions of the installed distributions are cached in the config
+    dir, together with sys.path and the distribution metadata directories
+    found in its entries. Installing, upgrading or removing a package adds,
+    renames or touches such a directory, which rebuilds the cache. Other
+    files, like the ones written to the config dir, don't affect it.
+    """
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize the PackageLoadable class."""
-        self.dist_cache = {}  # type: Dict[str, pkg_resources.Distribution]
+        # Version of the distribution that is imported, by project name
+        self.versions = None  # type: Optional[Dict[str, str]]
         self.hass = hass
 
+    def invalidate(self) -> None:
+        """Forget the cached versions, packages have been installed."""
+        self.versions = None
+
     async def loadable(self, package: str) -> bool:
         """Check if a package is what will be loaded when we import it.
 
         Returns True when the requirement is met.
         Returns False when the package is not installed or doesn't meet req.
         """
-        dist_cache = self.dist_cache
-
         try:
             req = pkg_resources.Requirement.parse(package)
         except ValueError:
@@ -83,25 +98,73 @@ class PackageLoadable:
             # leaving it in for custom components.
             req = pkg_resources.Requirement.parse(urlparse(package).fragment)
 
-        req_proj_name = req.project_name.lower()
-        dist = dist_cache.get(req_proj_name)
+        if self.versions is None:
+            self.versions = await self.hass.async_add_executor_job(
+                self._load_versions)
 
-        if dist is not None:
-            return dist in req
+        version = self.versions.get(req.project_name.lower())
 
-        for path in sys.path:
-            # We read the whole mount point as we're already here
-            # Caching it on first call makes subsequent calls a lot faster.
-            await self.hass.async_add_executor_job(self._fill_cache, path)
+        return version is not None and version in req
 
-            dist = dist_cache.get(req_proj_name)
-            if dist is not None:
-                return dist in req
+    def _load_versions(self) -> Dict[str, str]:
+        """Return the versions of the distributions on sys.path.
 
-        return False
-
-    def _fill_cache(self, path: str) -> None:
-        """Add packages from a path to the cache."""
-        dist_cache = self.dist_cache
-        for dist in pkg_resources.find_distributions(path):
-            dist_cache.setdefault(dist.project_name.lower(), dist)
+        If a distribution is found more than once, the first one is the
+        one that will be imported.
+        """
+        paths = list(sys.path)
+        metadata = [_metadata_entries(path) for path in paths]
+
+        index_path = None
+        if self.hass.config.config_dir is not None:
+            index_path = self.hass.config.path(REQUIREMENTS_INDEX_FILE)
+
+        if index_path is not None:
+            try:
+                cached = load_json(index_path)
+            except HomeAssistantError:
+                cached = {}
+
+            if cached.get('paths') == paths and \
+                    cached.get('metadata') == metadata:
+                return cached['versions']  # type: ignore
+
+        versions = {}  # type: Dict[str, str]
+        for path in paths:
+            for dist in pkg_resources.find_distributions(path):
+                versions.setdefault(dist.project_name.lower(), dist.version)
+
+        if index_path is not None:
+            try:
+                save_json(index_path, {
+                    'paths': paths,
+                    'metadata': metadata,
+                    'versions': versions,
+                }, compact=True)
+            except HomeAssistantError:
+                pass
+
+        return versions
+
+
+def _metadata_entries(path: str) -> Optional[List[List[Any]]]:
+    """Return the distribution metadata directories in a sys.path entry.
+
+    Returns the name and modification time of every .dist-info and
+    .egg-info entry, or None if path is not a directory.
+    """
+    try:
+        names = sorted(os.listdir(path))
+    except OSError:
+        return None
+
+    entries = []  # type: List[List[Any]]
+    for name in names:
+        if not name.endswith(('.dist-info', '.egg-info')):
+            continue
+        try:
+            mtime = os.stat(os.path.join(path, name)).st_mtime
+        except OSError:
+            continue
+        entries.append([name, mtime])
+    return entries
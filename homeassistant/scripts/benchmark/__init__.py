@@ -141,6 +141,100 @@ async def async_million_state_changed_helper(hass):
     return timer() - start
 
 
+@benchmark
+async def async_state_changed_dispatch_scaling(hass):
+    """Fire state changes with a growing number of tracked entities."""
+    events_per_round = 10**5
+    entity_id = 'light.kitchen'
+    tracked = 0
+    total = 0
+    count = 0
+    event = None
+
+    @core.callback
+    def listener(*args):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+        if count == events_per_round:
+            event.set()
+
+    @core.callback
+    def other_listener(*args):
+        """Handle state changes of entities that never change."""
+
+    hass.helpers.event.async_track_state_change(entity_id, listener)
+    event_data = {
+        'entity_id': entity_id,
+        'old_state': core.State(entity_id, 'off'),
+        'new_state': core.State(entity_id, 'on'),
+    }
+
+    for listener_count in (1, 10, 100, 1000):
+        for idx in range(tracked, listener_count - 1):
+            hass.helpers.event.async_track_state_change(
+                'light.other_{}'.format(idx), other_listener)
+        tracked = listener_count - 1
+
+        count = 0
+        event = asyncio.Event(loop=hass.loop)
+
+        for _ in range(events_per_round):
+            hass.bus.async_fire(EVENT_STATE_CHANGED, event_data)
+
+        start = timer()
+
+        await event.wait()
+
+        runtime = timer() - start
+        total += runtime
+        print('{} listeners: {}s'.format(listener_count, runtime))
+
+    return total
+
+
+@benchmark
+async def async_time_changed_waiting_listeners(hass):
+    """Fire time changes while many time listeners wait for their time."""
+    events = 10**5
+    count = 0
+    event = asyncio.Event(loop=hass.loop)
+    now = datetime(2017, 10, 10, 15, 0, 30, tzinfo=dt_util.UTC)
+
+    @core.callback
+    def listener(_):
+        """Handle time change."""
+        nonlocal count
+        count += 1
+
+        if count == events:
+            event.set()
+
+    @core.callback
+    def waiting_listener(_):
+        """Handle a time that never comes."""
+
+    hass.helpers.event.async_track_utc_time_change(listener)
+
+    for idx in range(1000):
+        hass.helpers.event.async_track_point_in_utc_time(
+            waiting_listener, now.replace(year=2018 + idx))
+        hass.helpers.event.async_track_utc_time_change(
+            waiting_listener, minute=idx % 60, second=0)
+
+    event_data = {ATTR_NOW: now}
+
+    for _ in range(events):
+        hass.bus.async_fire(EVENT_TIME_CHANGED, event_data)
+
+    start = timer()
+
+    await event.wait()
+
+    return timer() - start
+
+
 @benchmark
 @asyncio.coroutine
 def logbook_filtering_state(hass):
@@ -189,3 +283,130 @@ def _logbook_filtering(hass, last_changed, last_updated):
     list(logbook.humanify(events))
 
     return timer() - start
+
+
+@benchmark
+@asyncio.coroutine
+def json_serialize_states_stdlib(hass):
+    """Serialize states with the json module."""
+    import json
+    from homeassistant.helpers.json import JSONEncoder
+
+    return _json_serialize_states(
+        hass, lambda states: json.dumps(states, cls=JSONEncoder))
+
+
+@benchmark
+@asyncio.coroutine
+def json_serialize_states(hass):
+    """Serialize states with the JSON backend."""
+    from homeassistant.util.json import JSON_BACKEND, json_dumps
+
+    print('Using JSON backend:', JSON_BACKEND)
+    return _json_serialize_states(hass, json_dumps)
+
+
+@benchmark
+@asyncio.coroutine
+def json_serialize_states_cached(hass):
+    """Serialize states using their cached encoding."""
+    return _json_serialize_states(hass, lambda states: '[{}]'.format(
+        ','.join(state.as_json() for state in states)))
+
+
+def _json_serialize_states(hass, dumps):
+    """Serialize 4000 states like a dashboard reload, 100 times."""
+    for index in range(1000):
+        hass.states.async_set('light.light_{}'.format(index), 'on', {
+            'friendly_name': 'Light {}'.format(index),
+            'brightness': 180,
+            'rgb_color': [255, 180, 100],
+            'xy_color': [0.521, 0.38],
+            'supported_features': 63,
+        })
+        hass.states.async_set('sensor.temperature_{}'.format(index), 21.5, {
+            'friendly_name': 'Temperature {}'.format(index),
+            'unit_of_measurement': '°C',
+            'device_class': 'temperature',
+        })
+        hass.states.async_set(
+            'binary_sensor.motion_{}'.format(index), 'off', {
+                'friendly_name': 'Motion {}'.format(index),
+                'device_class': 'motion',
+            })
+        hass.states.async_set('device_tracker.phone_{}'.format(index),
+                              'home', {
+                                  'friendly_name': 'Phone {}'.format(index),
+                                  'source_type': 'gps',
+                                  'latitude': 52.3731,
+                                  'longitude': 4.8922,
+                                  'gps_accuracy': 12,
+                                  'battery': 87,
+                              })
+
+    states = hass.states.async_all()
+
+    start = timer()
+
+    for _ in range(100):
+        dumps(states)
+
+    return timer() - start
+
+
+@benchmark
+@asyncio.coroutine
+def entity_registry_startup(hass):
+    """Look up 10k registered entities like platforms do at startup."""
+    from homeassistant.helpers import entity_registry
+
+    registry = entity_registry.EntityRegistry(hass)
+    registry.entities = {}
+
+    for index in range(10**4):
+        entity_id = 'light.bench_{}'.format(index)
+        registry.entities[entity_id] = entity_registry.RegistryEntry(
+            entity_id=entity_id, unique_id=str(index), platform='bench',
+            config_entry_id='entry_{}'.format(index % 10))
+
+    registry.async_rebuild_index()
+
+    start = timer()
+
+    for index in range(10**4):
+        registry.async_get_or_create(
+            'light', 'bench', str(index),
+            config_entry_id='entry_{}'.format(index % 10))
+
+    return timer() - start
+
+
+@benchmark
+@asyncio.coroutine
+def device_registry_startup(hass):
+    """Look up 10k registered devices like platforms do at startup."""
+    from homeassistant.helpers import device_registry
+
+    registry = device_registry.DeviceRegistry(hass)
+    registry.devices = {}
+
+    for index in range(10**4):
+        device = device_registry.DeviceEntry(
+            config_entries={'entry_{}'.format(index % 10)},
+            connections={('mac', '02:00:00:00:{:02x}:{:02x}'.format(
+                index // 256, index % 256))},
+            identifiers={('bench', str(index))},
+            manufacturer='Bench', model='Device')
+        registry.devices[device.id] = device
+
+    registry.async_rebuild_index()
+
+    start = timer()
+
+    for index in range(10**4):
+        registry.async_get_or_create(
+            config_entry='entry_{}'.format(index % 10),
+            connections=set(), identifiers={('bench', str(index))},
+            manufacturer='Bench', model='Device')
+
+    return timer() - start
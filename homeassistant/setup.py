@@ -10,6 +10,8 @@ from homeassistant import requirements, core, loader, config as conf_util
 from homeassistant.config import async_notify_setup_error
 from homeassistant.const import EVENT_COMPONENT_LOADED, PLATFORM_FORMAT
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.profiler import (
+    CATEGORY_CONFIG, CATEGORY_REQUIREMENTS, CATEGORY_SETUP, profile)
 from homeassistant.util.async_ import run_coroutine_threadsafe
 
 
@@ -114,8 +116,9 @@ async def _async_setup_component(hass: core.HomeAssistant,
         log_error("Unable to resolve component or dependencies.")
         return False
 
-    processed_config = \
-        conf_util.async_process_component_config(hass, config, domain)
+    with profile(hass, CATEGORY_CONFIG, domain):
+        processed_config = \
+            conf_util.async_process_component_config(hass, config, domain)
 
     if processed_config is None:
         log_error("Invalid config.")
@@ -140,12 +143,13 @@ async def _async_setup_component(hass: core.HomeAssistant,
             domain, SLOW_SETUP_WARNING)
 
     try:
-        if hasattr(component, 'async_setup'):
-            result = await component.async_setup(  # type: ignore
-                hass, processed_config)
-        else:
-            result = await hass.async_add_executor_job(
-                component.setup, hass, processed_config)  # type: ignore
+        with profile(hass, CATEGORY_SETUP, domain):
+            if hasattr(component, 'async_setup'):
+                result = await component.async_setup(  # type: ignore
+                    hass, processed_config)
+            else:
+                result = await hass.async_add_executor_job(
+                    component.setup, hass, processed_config)  # type: ignore
     except Exception:  # pylint: disable=broad-except
         _LOGGER.exception("Error during setup of component %s", domain)
         async_notify_setup_error(hass, domain, True)
@@ -241,8 +245,9 @@ async def async_process_deps_reqs(
             raise HomeAssistantError("Could not set up all dependencies.")
 
     if not hass.config.skip_pip and hasattr(module, 'REQUIREMENTS'):
-        req_success = await requirements.async_process_requirements(
-            hass, name, module.REQUIREMENTS)  # type: ignore
+        with profile(hass, CATEGORY_REQUIREMENTS, name):
+            req_success = await requirements.async_process_requirements(
+                hass, name, module.REQUIREMENTS)  # type: ignore
 
         if not req_success:
             raise HomeAssistantError("Could not install all requirements.")
@@ -1,13 +1,23 @@
 """JSON utility functions."""
+from datetime import datetime
 import logging
-from typing import Union, List, Dict
+import math
+from typing import Any, Union, List, Dict
 
 import json
 
 from homeassistant.exceptions import HomeAssistantError
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 _LOGGER = logging.getLogger(__name__)
 
+# Name of the library used by json_dumps and json_loads
+JSON_BACKEND = 'json' if orjson is None else 'orjson'
+
 
 class SerializationError(HomeAssistantError):
     """Error serializing the data to JSON."""
@@ -17,6 +27,76 @@ class WriteError(HomeAssistantError):
     """Error writing the data."""
 
 
+def json_default(obj: Any) -> Any:
+    """Convert Home Assistant objects that JSON does not support.
+
+    Raises TypeError for unsupported objects.
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, set):
+        return list(obj)
+    if hasattr(obj, 'as_dict'):
+        return obj.as_dict()
+
+    raise TypeError('Object of type {} is not JSON serializable'.format(
+        type(obj).__name__))
+
+
+def json_dumps(data: Any, sort_keys: bool = False) -> str:
+    """Return data encoded as compact JSON.
+
+    Datetimes, sets and objects with an as_dict method are supported. The
+    encoding is done by orjson when installed, otherwise by the json module.
+    Both encode floats that are not finite as null.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS  # pylint: disable=no-member
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS  # pylint: disable=no-member
+        return orjson.dumps(  # pylint: disable=no-member
+            data, default=json_default, option=option).decode('utf-8')
+
+    try:
+        return json.dumps(data, default=json_default, sort_keys=sort_keys,
+                          separators=(',', ':'), allow_nan=False)
+    except ValueError as err:
+        # Raised for circular references too
+        if not str(err).startswith('Out of range float values'):
+            raise
+
+    return json.dumps(
+        _replace_non_finite(data),
+        default=lambda obj: _replace_non_finite(json_default(obj)),
+        sort_keys=sort_keys, separators=(',', ':'))
+
+
+def _replace_non_finite(data: Any) -> Any:
+    """Return data with the floats that are not finite replaced by None."""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
+    if isinstance(data, dict):
+        return {key: _replace_non_finite(value)
+                for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_replace_non_finite(value) for value in data]
+    return data
+
+
+def json_loads(text: Union[str, bytes]) -> Any:
+    """Return the data decoded from JSON text.
+
+    orjson rejects NaN and Infinity, which the json module writes. Text
+    orjson can't decode falls back to the json module.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(text)  # pylint: disable=no-member
+        except ValueError:
+            pass
+    return json.loads(text)
+
+
 def load_json(filename: str, default: Union[List, Dict, None] = None) \
         -> Union[List, Dict]:
     """Load JSON data from a file and return as dict or list.
@@ -25,7 +105,7 @@ def load_json(filename: str, default: Union[List, Dict, None] = None) \
     """
     try:
         with open(filename, encoding='utf-8') as fdesc:
-            return json.loads(fdesc.read())  # type: ignore
+            return json_loads(fdesc.read())  # type: ignore
     except FileNotFoundError:
         # This is not a fatal error
         _LOGGER.debug('JSON file not found: %s', filename)
@@ -38,13 +118,19 @@ def load_json(filename: str, default: Union[List, Dict, None] = None) \
     return {} if default is None else default
 
 
-def save_json(filename: str, data: Union[List, Dict]) -> None:
+def save_json(filename: str, data: Union[List, Dict],
+              compact: bool = False) -> None:
     """Save JSON data to a file.
 
-    Returns True on success.
+    Compact files are encoded by json_dumps, otherwise the JSON is indented
+    to be readable.
     """
     try:
-        json_data = json.dumps(data, sort_keys=True, indent=4)
+        if compact:
+            json_data = json_dumps(data, sort_keys=True)
+        else:
+            json_data = json.dumps(data, sort_keys=True, indent=4,
+                                   default=json_default)
         with open(filename, 'w', encoding='utf-8') as fdesc:
             fdesc.write(json_data)
     except TypeError as error:
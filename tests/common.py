@@ -323,6 +323,7 @@ def mock_registry(hass, mock_entries=None):
     """Mock the Entity Registry."""
     registry = entity_registry.EntityRegistry(hass)
     registry.entities = mock_entries or {}
+    registry.async_rebuild_index()
 
     async def _get_reg():
         return registry
@@ -1,7 +1,7 @@
 """The tests for the camera component."""
 import asyncio
 import base64
-from unittest.mock import patch, mock_open
+from unittest.mock import Mock, patch, mock_open
 
 import pytest
 
@@ -16,6 +16,44 @@ from tests.common import (
     mock_coro)
 
 
+class MockStreamResponse:
+    """Record what is written to a stream response."""
+
+    def __init__(self):
+        """Initialize the response."""
+        self.content_type = None
+        self.written = []
+
+    async def prepare(self, request):
+        """Prepare the response."""
+
+    async def write(self, data):
+        """Write data to the response."""
+        self.written.append(data)
+
+
+class MockCamera(camera.Camera):
+    """Count the images fetched from a camera."""
+
+    def __init__(self, hass, image=b'Test'):
+        """Initialize the camera."""
+        super().__init__()
+        self.hass = hass
+        self.image = image
+        self.fetched = 0
+
+    @property
+    def image_cache_ttl(self):
+        """Return the seconds an image is reused for."""
+        return 5
+
+    async def async_camera_image(self):
+        """Return the image after giving concurrent calls a chance."""
+        self.fetched += 1
+        await asyncio.sleep(0, loop=self.hass.loop)
+        return self.image
+
+
 @pytest.fixture
 def mock_camera(hass):
     """Initialize a demo camera platform."""
@@ -154,3 +192,116 @@ async def test_webocket_camera_thumbnail(hass, hass_ws_client, mock_camera):
     assert msg['result']['content_type'] == 'image/jpeg'
     assert msg['result']['content'] == \
         base64.b64encode(b'Test').decode('utf-8')
+
+
+async def test_still_stream_shares_images(hass):
+    """Test clients of a still stream share the camera images."""
+    images = asyncio.Queue(loop=hass.loop)
+    fetched = []
+
+    async def image_cb():
+        """Return the next image."""
+        image = await images.get()
+        fetched.append(image)
+        return image
+
+    request = Mock(app={'hass': hass})
+
+    with patch('homeassistant.components.camera.web.StreamResponse',
+               side_effect=MockStreamResponse):
+        streams = [
+            hass.async_add_job(camera.async_get_still_stream(
+                request, image_cb, 'image/jpeg', 0))
+            for _ in range(2)]
+        await asyncio.sleep(0, loop=hass.loop)
+
+        await images.put(b'Test')
+        await images.put(b'Test')
+        await images.put(None)
+        responses = await asyncio.gather(*streams, loop=hass.loop)
+
+    assert fetched == [b'Test', b'Test', None]
+    for response in responses:
+        # The first frame is written twice, the unchanged image is skipped
+        assert response.written == [
+            b'--frameboundary\r\nContent-Type: image/jpeg\r\n'
+            b'Content-Length: 4\r\n\r\n', b'Test', b'\r\n'] * 2
+    assert camera.DATA_STILL_STREAMS not in hass.data or \
+        not hass.data[camera.DATA_STILL_STREAMS]
+
+
+async def test_still_stream_subscriber_drops_frames(hass):
+    """Test a slow client of a still stream only gets the newest frame."""
+    subscriber = camera.StillStreamSubscriber(hass.loop)
+
+    subscriber.async_put('frame 1')
+    subscriber.async_put('frame 2')
+    assert await subscriber.async_get() == 'frame 2'
+
+    subscriber.async_put('frame 3')
+    subscriber.async_close()
+    assert await subscriber.async_get() == 'frame 3'
+    assert await subscriber.async_get() is None
+    assert await subscriber.async_get() is None
+
+
+async def test_cached_image(hass):
+    """Test images are shared by concurrent calls and reused for a while."""
+    cam = MockCamera(hass)
+
+    images = await asyncio.gather(
+        cam.async_get_cached_image(), cam.async_get_cached_image(),
+        loop=hass.loop)
+    assert cam.fetched == 1
+    assert images[0] is images[1]
+    assert images[0].content == b'Test'
+    assert images[0].etag
+
+    assert await cam.async_get_cached_image() is images[0]
+    assert cam.fetched == 1
+
+    cam.image = b'Changed'
+    with patch.object(hass.loop, 'time',
+                      return_value=hass.loop.time() + cam.image_cache_ttl):
+        image = await cam.async_get_cached_image()
+
+    assert cam.fetched == 2
+    assert image.content == b'Changed'
+    assert image.etag != images[0].etag
+
+
+async def test_cached_image_disabled(hass):
+    """Test only concurrent calls share an image without a cache ttl."""
+    cam = MockCamera(hass)
+
+    with patch.object(MockCamera, 'image_cache_ttl', 0):
+        await asyncio.gather(
+            cam.async_get_cached_image(), cam.async_get_cached_image(),
+            loop=hass.loop)
+        assert cam.fetched == 1
+
+        await cam.async_get_cached_image()
+        assert cam.fetched == 2
+
+
+async def test_camera_image_view_not_modified(hass):
+    """Test the camera proxy answers unchanged images without a body."""
+    cam = MockCamera(hass)
+    view = camera.CameraImageView(None)
+
+    response = await view.handle(
+        Mock(app={'hass': hass}, headers={}), cam)
+    assert response.status == 200
+    assert response.body == b'Test'
+    etag = response.headers['ETag']
+
+    response = await view.handle(
+        Mock(app={'hass': hass}, headers={'If-None-Match': etag}), cam)
+    assert response.status == 304
+    assert response.body is None
+    assert response.headers['ETag'] == etag
+
+    response = await view.handle(
+        Mock(app={'hass': hass}, headers={'If-None-Match': '"other"'}), cam)
+    assert response.status == 200
+    assert cam.fetched == 1
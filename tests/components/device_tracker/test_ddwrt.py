@@ -161,6 +161,11 @@ class TestDdwrt(unittest.TestCase):
                 self.assertIn(devices[device]['mac'], status_lan)
                 self.assertIn(slugify(devices[device]['name']), status_lan)
 
+            # The names of all devices are fetched with one request
+            self.assertEqual(1, len([
+                request for request in mock_request.request_history
+                if 'Status_Lan' in request.url]))
+
     def test_device_name_no_data(self):
         """Test creating device info (MAC only) when no response."""
         with requests_mock.Mocker() as mock_request:
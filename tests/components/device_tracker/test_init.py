@@ -3,6 +3,8 @@
 import asyncio
 import json
 import logging
+import threading
+import time
 import unittest
 from unittest.mock import call, patch
 from datetime import datetime, timedelta
@@ -621,3 +623,137 @@ def test_see_schema_allowing_ios_calls():
         "gps_accuracy": 300,
         "hostname": 'beer',
     })
+
+
+async def test_scanner_platform_bulk_device_names(hass):
+    """Test the names of new devices are fetched at once when supported."""
+    hass.states.async_set(zone.ENTITY_ID_HOME, 'zoning', {
+        'latitude': 32.87336, 'longitude': -117.22743})
+    seen = []
+
+    class BulkScanner(device_tracker.DeviceScanner):
+        """Scanner that fetches all names with one request."""
+
+        requests = []
+
+        async def async_scan_devices(self):
+            """Return the connected devices."""
+            return ['AA', 'BB']
+
+        async def async_get_device_names(self, devices):
+            """Return the names of the devices."""
+            self.requests.append(devices)
+            return {'AA': 'phone'}
+
+        async def async_get_device_name(self, device):
+            """Fail, the names are fetched at once."""
+            raise AssertionError
+
+    async def mock_see(**kwargs):
+        """Record the seen device."""
+        seen.append(kwargs)
+
+    scanner = BulkScanner()
+    device_tracker.async_setup_scanner_platform(
+        hass, {}, scanner, mock_see, 'bulk')
+    await hass.async_block_till_done()
+
+    assert scanner.requests == [['AA', 'BB']]
+    assert [(kwargs['mac'], kwargs['host_name']) for kwargs in seen] == [
+        ('AA', 'phone'), ('BB', None)]
+    assert seen[0]['gps'] == [32.87336, -117.22743]
+    assert seen[0]['attributes'] == {'scanner': 'BulkScanner'}
+
+
+async def test_scanner_platform_concurrent_lookups(hass):
+    """Test the devices are looked up concurrently, but not all at once."""
+    macs = ['MAC_{}'.format(index) for index in range(25)]
+    seen = []
+    running = 0
+    max_running = 0
+
+    class SlowScanner(device_tracker.DeviceScanner):
+        """Scanner that needs a request per device."""
+
+        extra_attribute_calls = 0
+
+        async def async_scan_devices(self):
+            """Return the connected devices."""
+            return macs
+
+        async def async_get_device_name(self, device):
+            """Return the name of a device."""
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return device.lower()
+
+        def get_extra_attributes(self, device):
+            """Not implemented."""
+            self.extra_attribute_calls += 1
+            raise NotImplementedError()
+
+    async def mock_see(**kwargs):
+        """Record the seen device."""
+        seen.append(kwargs)
+
+    scanner = SlowScanner()
+    device_tracker.async_setup_scanner_platform(
+        hass, {}, scanner, mock_see, 'slow')
+    await hass.async_block_till_done()
+
+    assert [kwargs['host_name'] for kwargs in seen] == \
+        [mac.lower() for mac in macs]
+    assert 1 < max_running <= device_tracker.SCAN_LOOKUP_CONCURRENCY
+    assert scanner.extra_attribute_calls < len(macs)
+
+
+async def test_scanner_platform_sync_lookups_serialized(hass):
+    """Test the sync methods of a scanner are called one at a time."""
+    macs = ['MAC_{}'.format(index) for index in range(5)]
+    seen = []
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    class SyncScanner(device_tracker.DeviceScanner):
+        """Scanner that shares state between its lookups."""
+
+        def scan_devices(self):
+            """Return the connected devices."""
+            return macs
+
+        def _lookup(self, value):
+            """Record how many lookups run at once."""
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+            return value
+
+        def get_device_name(self, device):
+            """Return the name of a device."""
+            return self._lookup(device.lower())
+
+        def get_extra_attributes(self, device):
+            """Return the extra attributes of a device."""
+            return self._lookup({'device': device})
+
+    async def mock_see(**kwargs):
+        """Record the seen device."""
+        seen.append(kwargs)
+
+    device_tracker.async_setup_scanner_platform(
+        hass, {}, SyncScanner(), mock_see, 'sync')
+    await hass.async_block_till_done()
+
+    assert [kwargs['host_name'] for kwargs in seen] == \
+        [mac.lower() for mac in macs]
+    assert seen[0]['attributes'] == {
+        'scanner': 'SyncScanner', 'device': 'MAC_0'}
+    assert max_running == 1
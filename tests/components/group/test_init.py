@@ -3,13 +3,14 @@
 import asyncio
 from collections import OrderedDict
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, PropertyMock
 
 from homeassistant.setup import setup_component, async_setup_component
 from homeassistant.const import (
     STATE_ON, STATE_OFF, STATE_HOME, STATE_UNKNOWN, ATTR_ICON, ATTR_HIDDEN,
     ATTR_ASSUMED_STATE, STATE_NOT_HOME, ATTR_FRIENDLY_NAME)
 import homeassistant.components.group as group
+from homeassistant.helpers.event import DATA_STATE_CHANGE_LISTENERS
 
 from tests.common import get_test_home_assistant, assert_setup_component
 
@@ -356,7 +357,9 @@ class TestComponentsGroup(unittest.TestCase):
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.all_tests', 'group.empty_group', 'group.second_group',
              'group.test_group']
-        assert self.hass.bus.listeners['state_changed'] == 3
+        assert sorted(self.hass.data[DATA_STATE_CHANGE_LISTENERS]) == \
+            ['hello.world', 'light.bowl', 'sensor.happy', 'test.one',
+             'test.two']
 
         with patch('homeassistant.config.load_yaml_config_file', return_value={
             'group': {
@@ -372,7 +375,8 @@ class TestComponentsGroup(unittest.TestCase):
 
         assert sorted(self.hass.states.entity_ids()) == \
             ['group.all_tests', 'group.hello']
-        assert self.hass.bus.listeners['state_changed'] == 2
+        assert sorted(self.hass.data[DATA_STATE_CHANGE_LISTENERS]) == \
+            ['light.bowl', 'test.one', 'test.two']
 
     def test_changing_group_visibility(self):
         """Test that a group can be hidden and shown."""
@@ -483,3 +487,42 @@ def test_service_group_set_group_remove_group(hass):
 
     group_state = hass.states.get('group.user_test_group')
     assert group_state is None
+
+
+async def test_member_changes_do_not_rescan(hass):
+    """Test member state changes update the group from its counters."""
+    for index in range(3):
+        hass.states.async_set('light.bowl_{}'.format(index), STATE_OFF)
+    hass.states.async_set('light.lamp', STATE_OFF)
+    hass.states.async_set('light.bowl_0', STATE_OFF,
+                          {ATTR_ASSUMED_STATE: True})
+
+    grp = await group.Group.async_create_group(
+        hass, 'lights', ['light.bowl_0', 'light.bowl_1', 'light.bowl_2',
+                         'light.lamp'])
+    all_lights = await group.Group.async_create_group(
+        hass, 'all lights', ['group.lights'])
+
+    assert grp.state == STATE_OFF
+    assert grp.assumed_state
+
+    with patch.object(group.Group, '_tracking_states',
+                      PropertyMock(side_effect=AssertionError)):
+        hass.states.async_set('light.bowl_1', STATE_ON)
+        hass.states.async_set('light.lamp', STATE_ON)
+        await hass.async_block_till_done()
+        assert grp.state == STATE_ON
+        assert all_lights.state == STATE_ON
+        assert grp._on_count == 2
+
+        hass.states.async_set('light.bowl_1', STATE_OFF)
+        await hass.async_block_till_done()
+        assert grp.state == STATE_ON
+
+        hass.states.async_remove('light.lamp')
+        hass.states.async_set('light.bowl_0', STATE_OFF)
+        await hass.async_block_till_done()
+        assert grp.state == STATE_OFF
+        assert all_lights.state == STATE_OFF
+        assert grp._on_count == 0
+        assert not grp.assumed_state
@@ -40,6 +40,18 @@ def async_mock_mqtt_client(hass, config=None):
 mock_mqtt_client = threadsafe_coroutine_factory(async_mock_mqtt_client)
 
 
+def get_ws_metrics(hass):
+    """Return the message metrics through the websocket command."""
+    handler, schema = hass.data['websocket_api'][mqtt.WS_TYPE_METRICS]
+    connection = mock.Mock()
+    handler(hass, connection, schema({'id': 5, 'type': mqtt.WS_TYPE_METRICS}))
+
+    msg = connection.to_write.put_nowait.mock_calls[0][1][0]
+    assert msg['id'] == 5
+    assert msg['success']
+    return msg['result']
+
+
 # pylint: disable=invalid-name
 class TestMQTTComponent(unittest.TestCase):
     """Test the MQTT component."""
@@ -671,3 +683,159 @@ def test_mqtt_subscribes_topics_on_connect(hass):
     }
     calls = {call[1][1]: call[1][2] for call in hass.add_job.mock_calls}
     assert calls == expected
+
+
+def test_subscription_trie_matches_like_paho():
+    """Test the subscription trie matches the same topics as paho."""
+    from paho.mqtt.matcher import MQTTMatcher
+
+    filters = ['a/b/c', 'a/+/c', 'a/#', '#', '+/+', '+', 'a/b/+', 'a/b/#',
+               '$SYS/#', '$SYS/+/c', '+/b/c']
+    topics = ['a', 'a/b', 'a/b/c', 'a/b/c/d', 'b/b/c', 'a/c', '$SYS',
+              '$SYS/b/c', '$SYS/broker', '/', 'a//c']
+
+    trie = mqtt.SubscriptionTrie()
+    subscriptions = [mqtt.Subscription(topic, None) for topic in filters]
+    for subscription in subscriptions:
+        trie.add(subscription)
+
+    for topic in topics:
+        expected = []
+        for subscription in subscriptions:
+            matcher = MQTTMatcher()
+            matcher[subscription.topic] = True
+            if next(matcher.iter_match(topic), False):
+                expected.append(subscription)
+
+        assert trie.match(topic) == expected, topic
+
+
+def test_subscription_trie_remove():
+    """Test removing subscriptions from the trie."""
+    trie = mqtt.SubscriptionTrie()
+    first = mqtt.Subscription('home/+/temperature', None)
+    second = mqtt.Subscription('home/+/temperature', None)
+    trie.add(first)
+    trie.add(second)
+
+    trie.remove(first)
+    assert trie.match('home/kitchen/temperature') == [second]
+
+    trie.remove(second)
+    assert trie.match('home/kitchen/temperature') == []
+    # Nodes without subscriptions are pruned
+    assert trie._root.children == {}
+
+    # Removing an unknown subscription is a no-op
+    trie.remove(first)
+
+
+@asyncio.coroutine
+def test_payload_decoded_once_per_encoding(hass):
+    """Test the payload is decoded once for all subscriptions."""
+    yield from async_mock_mqtt_client(hass)
+    calls = []
+
+    @callback
+    def record_calls(*args):
+        """Record calls."""
+        calls.append(args)
+
+    for _ in range(3):
+        yield from mqtt.async_subscribe(hass, 'test/+', record_calls)
+    yield from mqtt.async_subscribe(hass, 'test/#', record_calls,
+                                    encoding=None)
+
+    payload = mock.MagicMock()
+    payload.decode.return_value = 'decoded'
+    hass.data['mqtt']._mqtt_handle_message(
+        mqtt.Message('test/topic', payload, 0, False))
+    yield from hass.async_block_till_done()
+
+    assert payload.decode.call_count == 1
+    assert [call[1] for call in calls] == \
+        ['decoded', 'decoded', 'decoded', payload]
+
+
+@asyncio.coroutine
+def test_messages_handled_in_batches(hass):
+    """Test received messages are handled in one batch per loop wakeup."""
+    yield from async_mock_mqtt_client(hass)
+    calls = []
+
+    @callback
+    def record_calls(*args):
+        """Record calls."""
+        calls.append(args)
+
+    yield from mqtt.async_subscribe(hass, 'test/+', record_calls)
+
+    for index in range(3):
+        hass.data['mqtt']._mqtt_on_message(None, None, mqtt.Message(
+            'test/{}'.format(index), b'payload', 0, False))
+    yield from hass.async_block_till_done()
+
+    assert [call[0] for call in calls] == ['test/0', 'test/1', 'test/2']
+    metrics = get_ws_metrics(hass)
+    assert metrics['batches'] == 1
+    assert metrics['messages'] == 3
+    assert metrics['batch_size_max'] == 3
+
+    async_fire_mqtt_message(hass, 'test/3', 'payload')
+    yield from hass.async_block_till_done()
+
+    assert len(calls) == 4
+    metrics = get_ws_metrics(hass)
+    assert metrics['batches'] == 2
+    assert metrics['batch_size_last'] == 1
+
+
+@asyncio.coroutine
+def test_failing_subscriber_keeps_batch(hass):
+    """Test a raising subscriber does not lose the rest of the batch."""
+    yield from async_mock_mqtt_client(hass)
+    calls = []
+
+    @callback
+    def record_calls(topic, payload, qos):
+        """Record calls, failing on the first message."""
+        calls.append(payload)
+        if payload == 'first':
+            raise ValueError('Broken template')
+
+    yield from mqtt.async_subscribe(hass, 'test/topic', record_calls)
+
+    for payload in (b'first', b'second'):
+        hass.data['mqtt']._mqtt_on_message(None, None, mqtt.Message(
+            'test/topic', payload, 0, False))
+    yield from hass.async_block_till_done()
+
+    assert calls == ['first', 'second']
+    assert get_ws_metrics(hass)['messages'] == 2
+
+
+@asyncio.coroutine
+def test_messages_flushed_after_latency(hass):
+    """Test received messages are handled after the flush latency."""
+    yield from async_mock_mqtt_client(hass, {
+        mqtt.CONF_BROKER: 'mock-broker',
+        mqtt.CONF_MESSAGE_FLUSH_LATENCY: 0.01,
+    })
+    calls = []
+
+    @callback
+    def record_calls(*args):
+        """Record calls."""
+        calls.append(args)
+
+    yield from mqtt.async_subscribe(hass, 'test/topic', record_calls)
+
+    async_fire_mqtt_message(hass, 'test/topic', 'first')
+    yield from asyncio.sleep(0, loop=hass.loop)
+    async_fire_mqtt_message(hass, 'test/topic', 'second')
+    assert calls == []
+
+    yield from hass.async_block_till_done()
+
+    assert [call[1] for call in calls] == ['first', 'second']
+    assert get_ws_metrics(hass)['batches'] == 1
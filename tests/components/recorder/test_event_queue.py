@@ -0,0 +1,88 @@
+"""The tests for the recorder event queue."""
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, State
+from homeassistant.components.recorder import PurgeTask
+from homeassistant.components.recorder.event_queue import (
+    POLICY_COALESCE, POLICY_DROP_OLDEST, RecorderQueue)
+
+
+def _state_event(entity_id, state):
+    """Return a state changed event."""
+    return Event(EVENT_STATE_CHANGED, {
+        'entity_id': entity_id,
+        'new_state': State(entity_id, state),
+    })
+
+
+def _drain(event_queue):
+    """Get all items from the queue."""
+    items = []
+    while not event_queue.empty():
+        items.append(event_queue.get())
+        event_queue.task_done()
+    return items
+
+
+def test_unbounded_queue():
+    """Test the queue does not drop events without a maximum."""
+    event_queue = RecorderQueue(policy=POLICY_DROP_OLDEST)
+
+    for idx in range(100):
+        event_queue.put_event(Event('test', {'idx': idx}))
+
+    assert [event.data['idx'] for event in _drain(event_queue)] == \
+        list(range(100))
+    assert event_queue.metrics.events_enqueued == 100
+    assert event_queue.metrics.events_dropped == 0
+    assert event_queue.metrics.queue_depth_max == 100
+
+
+def test_drop_oldest():
+    """Test the oldest events are dropped when the queue is full."""
+    event_queue = RecorderQueue(3, POLICY_DROP_OLDEST)
+    event_queue.put(PurgeTask(10, False))
+
+    for idx in range(5):
+        event_queue.put_event(Event('test', {'idx': idx}))
+
+    assert event_queue.events_queued() == 3
+    items = _drain(event_queue)
+    assert isinstance(items[0], PurgeTask)
+    assert [event.data['idx'] for event in items[1:]] == [2, 3, 4]
+    assert event_queue.metrics.events_dropped == 2
+    assert event_queue.unfinished_tasks == 0
+
+
+def test_coalesce_state_changes():
+    """Test state changes of the same entity are coalesced when full."""
+    event_queue = RecorderQueue(2, POLICY_COALESCE)
+
+    event_queue.put_event(_state_event('light.kitchen', 'on'))
+    event_queue.put_event(_state_event('light.bowl', 'on'))
+    event_queue.put_event(_state_event('light.kitchen', 'off'))
+    event_queue.put_event(_state_event('light.kitchen', 'on'))
+
+    assert event_queue.metrics.events_coalesced == 2
+
+    # No state change of the entity queued, drops the oldest event
+    event_queue.put_event(_state_event('light.ceiling', 'on'))
+
+    assert event_queue.metrics.events_coalesced == 2
+    assert event_queue.metrics.events_dropped == 3
+
+    items = _drain(event_queue)
+    assert [(event.data['entity_id'], event.data['new_state'].state)
+            for event in items] == [('light.bowl', 'on'),
+                                    ('light.ceiling', 'on')]
+    assert event_queue.unfinished_tasks == 0
+
+
+def test_full_queue_does_not_block():
+    """Test putting an event in a full queue returns right away."""
+    event_queue = RecorderQueue(1)
+
+    for idx in range(3):
+        event_queue.put_event(Event('test', {'idx': idx}))
+
+    assert [event.data['idx'] for event in _drain(event_queue)] == [2]
+    assert event_queue.metrics.events_dropped == 2
@@ -1,16 +1,25 @@
 """The tests for the Recorder component."""
 # pylint: disable=protected-access
+import asyncio
+import json
+import threading
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
 
-from homeassistant.core import callback
+from homeassistant.core import Event, callback
 from homeassistant.const import MATCH_ALL
-from homeassistant.components.recorder import Recorder
+from homeassistant.setup import setup_component
+from homeassistant.util.async_ import run_coroutine_threadsafe
+import homeassistant.util.dt as dt_util
+from homeassistant.components.recorder import (
+    PurgeTask, Recorder, RollupTask, SnapshotTask, websocket_handle_metrics)
 from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.event_queue import POLICY_DROP_OLDEST
 from homeassistant.components.recorder.util import session_scope
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.models import (
+    Events, StateAttributes, States)
 
 from tests.common import get_test_home_assistant, init_recorder_component
 
@@ -47,6 +56,39 @@ class TestRecorder(unittest.TestCase):
 
         assert state == self.hass.states.get(entity_id)
 
+    def test_saving_shared_attributes(self):
+        """Test states with the same attributes share one row."""
+        attributes = {'test_attr': 5, 'test_attr_10': 'nice'}
+
+        self.hass.states.set('test.recorder', 'on', attributes)
+        self.hass.states.set('test.recorder', 'off', attributes)
+        self.hass.states.set('test.recorder', 'off', {'test_attr': 6})
+        self.hass.states.set('test.recorder2', 'on', attributes)
+
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+        with session_scope(hass=self.hass) as session:
+            assert session.query(StateAttributes).count() == 2
+            db_states = list(session.query(States).order_by(States.state_id))
+            assert len(db_states) == 4
+            assert db_states[0].attributes_id == db_states[1].attributes_id
+            assert db_states[0].attributes_id == db_states[3].attributes_id
+            assert db_states[0].attributes_id != db_states[2].attributes_id
+
+            # Each distinct attribute row is loaded and decoded once
+            assert db_states[0].state_attributes is \
+                db_states[3].state_attributes
+            with patch('homeassistant.components.recorder.models.json.loads',
+                       side_effect=json.loads) as mock_loads:
+                states = [db_state.to_native() for db_state in db_states]
+            assert mock_loads.call_count == 2
+
+        assert states[0].attributes == attributes
+        assert states[1].attributes == attributes
+        assert states[2].attributes == {'test_attr': 6}
+        assert states[3].attributes == attributes
+
     def test_saving_event(self):
         """Test saving and restoring an event."""
         event_type = 'EVENT_TEST'
@@ -85,6 +127,9 @@ class TestRecorder(unittest.TestCase):
         assert event.time_fired.replace(microsecond=0) == \
             db_event.time_fired.replace(microsecond=0)
 
+        assert self.hass.data[DATA_INSTANCE].committed_until == \
+            event.time_fired
+
 
 @pytest.fixture
 def hass_recorder():
@@ -189,6 +234,173 @@ def test_saving_state_include_domain_exclude_entity(hass_recorder):
     assert hass.states.get('test.ok').state == 'state2'
 
 
+def test_saving_events_in_batches(hass_recorder):
+    """Test events are saved in batches and states link to their event."""
+    hass = hass_recorder({'commit_batch_size': 5, 'commit_max_age': 1})
+    instance = hass.data[DATA_INSTANCE]
+
+    with patch.object(instance, '_save_events',
+                      side_effect=instance._save_events) as save_events:
+        for idx in range(12):
+            hass.add_job(hass.states.async_set,
+                         'test.batch{}'.format(idx % 3), idx)
+        hass.block_till_done()
+        instance.block_till_done()
+
+    batches = [call[1][0] for call in save_events.mock_calls]
+    assert sum(len(batch) for batch in batches) == 12
+    assert 3 <= len(batches) < 12
+    assert all(len(batch) <= 5 for batch in batches)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        assert len(db_states) == 12
+
+        for db_state in db_states:
+            db_event = session.query(Events).get(db_state.event_id)
+            event = db_event.to_native()
+            assert event.data['entity_id'] == db_state.entity_id
+            assert event.data['new_state']['state'] == db_state.state
+
+
+def test_websocket_metrics(hass_recorder):
+    """Test the recorder metrics are available through the websocket."""
+    hass = hass_recorder({'queue_max_events': 100,
+                          'queue_policy': 'drop_oldest'})
+    _add_entities(hass, ['test.recorder', 'test2.recorder'])
+
+    connection = Mock()
+    websocket_handle_metrics(hass, connection, {'id': 5})
+
+    msg = connection.to_write.put_nowait.mock_calls[0][1][0]
+    assert msg['id'] == 5
+    assert msg['success']
+    assert msg['result']['events_dropped'] == 0
+    assert msg['result']['events_committed'] >= 2
+    assert msg['result']['events_enqueued'] >= \
+        msg['result']['events_committed']
+    assert msg['result']['queue_depth'] == 0
+
+
+def test_saving_events_during_purge(hass_recorder):
+    """Test events are saved between the batches of a purge."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    saved_during_purge = []
+
+    def mock_purge_batches(_instance, keep_days, repack):
+        """Queue an event and check it is saved before the next batch."""
+        instance.queue.put_event(Event('test_during_purge'))
+        yield
+        with session_scope(hass=hass) as session:
+            saved_during_purge.append(session.query(Events).filter_by(
+                event_type='test_during_purge').count())
+        yield
+
+    with patch('homeassistant.components.recorder.purge'
+               '.purge_old_data_batches', side_effect=mock_purge_batches):
+        instance.queue.put(PurgeTask(10, False))
+        instance.block_till_done()
+
+    assert saved_during_purge == [1]
+
+
+def test_purge_requested_during_purge(hass_recorder):
+    """Test purges requested while purging are merged and run after it."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    purges = []
+
+    def mock_purge_batches(_instance, keep_days, repack):
+        """Request more purges during the first one."""
+        purges.append((keep_days, repack))
+        if len(purges) == 1:
+            instance.queue.put(PurgeTask(5, False))
+            instance.queue.put(PurgeTask(7, True))
+        yield
+
+    with patch('homeassistant.components.recorder.purge'
+               '.purge_old_data_batches', side_effect=mock_purge_batches):
+        instance.queue.put(PurgeTask(10, False))
+        instance.block_till_done()
+
+    assert purges == [(10, False), (5, True)]
+
+
+def test_full_queue_does_not_block_loop(hass_recorder):
+    """Test the event loop keeps running while the recorder is busy."""
+    hass = hass_recorder({'queue_max_events': 2})
+    instance = hass.data[DATA_INSTANCE]
+    purging = threading.Event()
+    release = threading.Event()
+
+    def mock_purge_batches(_instance, keep_days, repack):
+        """Keep the recorder busy until the test releases it."""
+        purging.set()
+        release.wait(5)
+        yield
+
+    with patch('homeassistant.components.recorder.purge'
+               '.purge_old_data_batches', side_effect=mock_purge_batches):
+        instance.queue.put(PurgeTask(10, False))
+        assert purging.wait(5)
+
+        for _ in range(5):
+            hass.bus.fire('test_while_busy')
+        run_coroutine_threadsafe(
+            asyncio.sleep(0, loop=hass.loop), hass.loop).result(1)
+
+        release.set()
+        instance.block_till_done()
+
+    assert instance.queue.metrics.events_dropped == 3
+
+
+def test_snapshot_error_keeps_recording(hass_recorder):
+    """Test a failing snapshot does not stop the recorder."""
+    from sqlalchemy.exc import OperationalError
+
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+
+    with patch('homeassistant.components.recorder.snapshot.create_snapshot',
+               side_effect=OperationalError('statement', {}, 'error')):
+        instance.queue.put(SnapshotTask(dt_util.utcnow()))
+        instance.block_till_done()
+
+    hass.bus.fire('test_after_snapshot')
+    hass.block_till_done()
+    instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert session.query(Events).filter_by(
+            event_type='test_after_snapshot').count() == 1
+
+
+def test_rollup_error_keeps_recording(hass_recorder):
+    """Test failing rollups do not stop the recorder and are retried."""
+    from sqlalchemy.exc import OperationalError
+
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    rollups_end = instance.rollups_end = dt_util.utcnow()
+
+    with patch('homeassistant.components.recorder.rollup.create_rollups',
+               side_effect=OperationalError('statement', {}, 'error')):
+        instance.queue.put(RollupTask(dt_util.utcnow()))
+        instance.block_till_done()
+
+    assert instance.rollups_end == rollups_end
+
+    hass.bus.fire('test_after_rollup')
+    hass.block_till_done()
+    instance.block_till_done()
+
+    with session_scope(hass=hass) as session:
+        assert session.query(Events).filter_by(
+            event_type='test_after_rollup').count() == 1
+
+
 def test_recorder_setup_failure():
     """Test some exceptions."""
     hass = get_test_home_assistant()
@@ -202,3 +414,20 @@ def test_recorder_setup_failure():
         rec.join()
 
     hass.stop()
+
+
+def test_setup_without_config():
+    """Test the recorder uses the defaults when set up as a dependency."""
+    hass = get_test_home_assistant()
+
+    with patch('homeassistant.components.recorder.DEFAULT_URL', 'sqlite://'), \
+            patch('homeassistant.components.recorder.migration'
+                  '.migrate_schema'):
+        assert setup_component(hass, 'recorder', {})
+
+    instance = hass.data[DATA_INSTANCE]
+    assert instance.queue_max_events == 0
+    assert instance.queue.policy == POLICY_DROP_OLDEST
+    assert not instance.purge_interval
+
+    hass.stop()
@@ -2,13 +2,18 @@
 import json
 from datetime import datetime, timedelta
 import unittest
-from unittest.mock import patch
+from unittest.mock import call, patch
 
 from homeassistant.components import recorder
-from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.purge import purge_old_data
-from homeassistant.components.recorder.models import States, Events
+from homeassistant.components.recorder.const import (
+    DATA_INSTANCE, SIGNAL_PURGED)
+from homeassistant.components.recorder.purge import (
+    purge_old_data, purge_old_data_batches)
+from homeassistant.components.recorder.models import (
+    Events, SnapshotStates, StateAttributes, StateRollups, States,
+    StateSnapshots)
 from homeassistant.components.recorder.util import session_scope
+from homeassistant.helpers.dispatcher import dispatcher_connect
 from tests.common import get_test_home_assistant, init_recorder_component
 
 
@@ -20,6 +25,9 @@ class TestRecorderPurge(unittest.TestCase):
         self.hass = get_test_home_assistant()
         init_recorder_component(self.hass)
         self.hass.start()
+        # The tests purge from this thread, the recorder must be idle
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
 
     def tearDown(self):  # pylint: disable=invalid-name
         """Stop everything that was started."""
@@ -207,5 +215,121 @@ class TestRecorderPurge(unittest.TestCase):
                                         service_data=service_data)
                 self.hass.block_till_done()
                 self.hass.data[DATA_INSTANCE].block_till_done()
-                self.assertEqual(mock_logger.debug.mock_calls[4][1][0],
-                                 "Vacuuming SQLite to free space")
+                self.assertIn(call("Vacuuming SQLite to free space"),
+                              mock_logger.debug.mock_calls)
+
+    def test_purge_in_batches(self):
+        """Test purging deletes in batches and reports progress."""
+        self._add_test_events()
+        self._add_test_states()
+
+        progress = list(purge_old_data_batches(
+            self.hass.data[DATA_INSTANCE], 4, repack=False, batch_size=2))
+
+        # 4 states in 2 batches, then 4 events in 2 batches
+        assert [(step.states_deleted, step.events_deleted)
+                for step in progress] == [(2, 0), (4, 0), (4, 2), (4, 4)]
+
+        with session_scope(hass=self.hass) as session:
+            states = session.query(States)
+            self.assertEqual(states.count(), 3)
+            self.assertTrue('iamprotected' in (
+                state.state for state in states))
+
+            events = session.query(Events).filter(
+                Events.event_type.like("EVENT_TEST%"))
+            self.assertEqual(events.count(), 3)
+
+    def test_purge_keeps_snapshot_states(self):
+        """Test purging keeps the last old snapshot and its states."""
+        self._add_test_states()
+        now = datetime.now()
+
+        with session_scope(hass=self.hass) as session:
+            old_state_ids = [state.state_id for state in session.query(
+                States).filter_by(state='autopurgeme')]
+
+            for days in (9, 8):
+                snapshot = StateSnapshots(
+                    point_in_time=now - timedelta(days=days))
+                session.add(snapshot)
+                session.flush()
+                session.add(SnapshotStates(
+                    snapshot_id=snapshot.snapshot_id,
+                    state_id=old_state_ids[0]))
+            kept_snapshot_id = snapshot.snapshot_id
+
+        purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+
+        with session_scope(hass=self.hass) as session:
+            self.assertEqual(
+                [snapshot.snapshot_id for snapshot
+                 in session.query(StateSnapshots)], [kept_snapshot_id])
+            self.assertEqual(session.query(SnapshotStates).count(), 1)
+
+            # The snapshot state is kept in addition to the 3 other states
+            states = session.query(States)
+            self.assertEqual(states.count(), 4)
+            self.assertIn(old_state_ids[0],
+                          [state.state_id for state in states])
+
+    def test_purge_unused_attributes(self):
+        """Test purging deletes attributes no state refers to."""
+        now = datetime.now()
+        instance = self.hass.data[DATA_INSTANCE]
+
+        with session_scope(hass=self.hass) as session:
+            for days, shared_attrs in ((10, '{"old": 1}'), (1, '{"new": 1}')):
+                attributes = StateAttributes(
+                    hash=str(days), shared_attrs=shared_attrs)
+                session.add(attributes)
+                session.flush()
+                for _ in range(2):
+                    timestamp = now - timedelta(days=days)
+                    session.add(States(
+                        entity_id='test.recorder2',
+                        domain='sensor',
+                        state='purgeme',
+                        attributes_id=attributes.attributes_id,
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                        created=timestamp,
+                    ))
+
+        instance.state_attributes_ids['{"old": 1}'] = 1
+        purge_old_data(instance, 4, repack=False)
+
+        with session_scope(hass=self.hass) as session:
+            self.assertEqual(
+                [attributes.shared_attrs for attributes
+                 in session.query(StateAttributes)], ['{"new": 1}'])
+            self.assertEqual(session.query(States).count(), 2)
+
+        self.assertEqual(instance.state_attributes_ids, {})
+
+    def test_purge_old_rollups(self):
+        """Test deleting old rollups."""
+        now = datetime.now()
+
+        with session_scope(hass=self.hass) as session:
+            for days in (10, 1):
+                session.add(StateRollups(
+                    entity_id='sensor.power', start=now - timedelta(days=days),
+                    min=1, max=1, mean=1, last=1, count=1))
+
+        purge_old_data(self.hass.data[DATA_INSTANCE], 4, repack=False)
+
+        with session_scope(hass=self.hass) as session:
+            self.assertEqual(session.query(StateRollups).count(), 1)
+
+    def test_purge_sends_signal(self):
+        """Test the recorder tells when it purged old data."""
+        purged = []
+        dispatcher_connect(self.hass, SIGNAL_PURGED, lambda: purged.append(1))
+
+        self.hass.services.call('recorder', 'purge', {'keep_days': 4})
+        self.hass.block_till_done()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+        self.hass.block_till_done()
+
+        self.assertEqual(purged, [1])
@@ -0,0 +1,116 @@
+"""Test the rollups of numeric states."""
+from datetime import datetime, timedelta
+import json
+import unittest
+
+import homeassistant.util.dt as dt_util
+from homeassistant.components.recorder import rollup
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import (
+    StateAttributes, StateRollups, States)
+from homeassistant.components.recorder.util import session_scope
+from tests.common import get_test_home_assistant, init_recorder_component
+
+
+def test_bucket_start():
+    """Test finding the start of a bucket."""
+    assert rollup.bucket_start(
+        datetime(2018, 9, 1, 12, 34, 56, tzinfo=dt_util.UTC)) == \
+        datetime(2018, 9, 1, 12, 30, tzinfo=dt_util.UTC)
+    assert rollup.bucket_start(
+        datetime(2018, 9, 1, 12, 34, 56, tzinfo=dt_util.UTC),
+        timedelta(hours=1)) == \
+        datetime(2018, 9, 1, 12, tzinfo=dt_util.UTC)
+
+
+class TestRecorderRollup(unittest.TestCase):
+    """Test creating the rollups."""
+
+    def setUp(self):  # pylint: disable=invalid-name
+        """Set up things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        init_recorder_component(self.hass)
+        self.hass.start()
+        self.hass.data[DATA_INSTANCE].block_till_done()
+
+    def tearDown(self):  # pylint: disable=invalid-name
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def _add_test_states(self, start):
+        """Add numeric and other states to the db."""
+        with session_scope(hass=self.hass) as session:
+            with_unit = StateAttributes(
+                hash='1', shared_attrs='{"unit_of_measurement": "W"}')
+            without_unit = StateAttributes(hash='2', shared_attrs='{}')
+            session.add_all([with_unit, without_unit])
+            session.flush()
+
+            for minutes, entity_id, state, attributes in (
+                    (1, 'sensor.power', '10', with_unit),
+                    (2, 'sensor.power', 'unavailable', with_unit),
+                    (2, 'sensor.power', 'nan', with_unit),
+                    (3, 'sensor.power', 'inf', with_unit),
+                    (3, 'sensor.power', '30', with_unit),
+                    (4, 'sensor.power', '20', with_unit),
+                    (4, 'sensor.count', '5', without_unit),
+                    (6, 'sensor.power', '50', with_unit),
+                    (11, 'sensor.power', '70', with_unit)):
+                timestamp = start + timedelta(minutes=minutes)
+                session.add(States(
+                    entity_id=entity_id,
+                    domain='sensor',
+                    state=state,
+                    attributes_id=attributes.attributes_id,
+                    last_changed=timestamp,
+                    last_updated=timestamp,
+                ))
+
+            # States recorded before schema version 8
+            timestamp = start + timedelta(minutes=7)
+            session.add(States(
+                entity_id='sensor.legacy',
+                domain='sensor',
+                state='1.5',
+                attributes=json.dumps({'unit_of_measurement': 'kWh'}),
+                last_changed=timestamp,
+                last_updated=timestamp,
+            ))
+
+    def test_create_rollups(self):
+        """Test rollups are created for completed buckets."""
+        start = rollup.bucket_start(dt_util.utcnow() - timedelta(hours=1))
+        self._add_test_states(start)
+        instance = self.hass.data[DATA_INSTANCE]
+
+        end = rollup.create_rollups(
+            instance, start + timedelta(minutes=12), start)
+        assert end == start + timedelta(minutes=10)
+
+        with session_scope(hass=self.hass) as session:
+            rollups = [
+                (row.entity_id, row.start.replace(tzinfo=None), row.min,
+                 row.max, row.mean, row.last, row.count)
+                for row in session.query(StateRollups).order_by(
+                    StateRollups.entity_id, StateRollups.start)]
+
+        naive_start = start.replace(tzinfo=None)
+        assert rollups == [
+            ('sensor.legacy', naive_start + timedelta(minutes=5),
+             1.5, 1.5, 1.5, 1.5, 1),
+            ('sensor.power', naive_start, 10, 30, 20, 20, 3),
+            ('sensor.power', naive_start + timedelta(minutes=5),
+             50, 50, 50, 50, 1),
+        ]
+
+        # Nothing to do until the next bucket completed
+        assert rollup.create_rollups(
+            instance, start + timedelta(minutes=14), end) == end
+
+        # Without start the rollups continue after the last one
+        assert rollup.create_rollups(
+            instance, start + timedelta(minutes=15)) == \
+            start + timedelta(minutes=15)
+
+        with session_scope(hass=self.hass) as session:
+            assert session.query(StateRollups).count() == 4
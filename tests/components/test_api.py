@@ -10,6 +10,7 @@ import pytest
 from homeassistant import const
 from homeassistant.bootstrap import DATA_LOGGING
 import homeassistant.core as ha
+from homeassistant.profiler import DATA_PROFILER, StartupProfiler
 from homeassistant.setup import async_setup_component
 
 from tests.common import async_mock_service
@@ -433,6 +434,25 @@ async def test_api_error_log(hass, aiohttp_client):
     assert await resp.text() == 'Hello'
 
 
+async def test_api_startup_profile(hass, aiohttp_client):
+    """Test if we can fetch the startup profile."""
+    profiler = hass.data[DATA_PROFILER] = StartupProfiler()
+    await async_setup_component(hass, 'api', {})
+    profiler.finish()
+    client = await aiohttp_client(hass.http.app)
+
+    resp = await client.get(const.URL_API_STARTUP_PROFILE)
+    assert resp.status == 200
+    data = await resp.json()
+    assert data['finished'] is True
+    assert data['durations']['api']['setup'] >= 0
+
+    resp = await client.get(const.URL_API_STARTUP_PROFILE,
+                            params={'format': 'trace'})
+    assert resp.status == 200
+    assert await resp.json() == profiler.as_trace()
+
+
 async def test_api_fire_event_context(hass, mock_api_client,
                                       hass_access_token):
     """Test if the API sets right context if we fire an event."""
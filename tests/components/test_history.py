@@ -1,13 +1,18 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
+import json
 import unittest
 from unittest.mock import patch, sentinel
 
 from homeassistant.setup import setup_component, async_setup_component
 import homeassistant.core as ha
+from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
 from homeassistant.components import history, recorder
+from homeassistant.components.recorder import rollup
+from homeassistant.components.recorder.models import StateRollups
+from homeassistant.components.recorder.snapshot import SnapshotTask
 
 from tests.common import (
     init_recorder_component, mock_state_change_event, get_test_home_assistant)
@@ -93,6 +98,57 @@ class TestComponentHistory(unittest.TestCase):
             states[0], history.get_state(self.hass, future,
                                          states[0].entity_id))
 
+    def test_get_states_from_snapshot(self):
+        """Test getting states starting from a snapshot."""
+        self.init_recorder()
+        instance = self.hass.data[recorder.DATA_INSTANCE]
+
+        def set_states(point, prefix, count):
+            """Set the states of count entities at point."""
+            with patch('homeassistant.components.recorder.dt_util.utcnow',
+                       return_value=point):
+                for i in range(count):
+                    self.hass.states.set(
+                        'test.point_in_time_{}'.format(i),
+                        '{} {}'.format(prefix, i))
+                self.wait_recording_done()
+
+        def get_states(point):
+            """Return the state of each entity at point."""
+            return {state.entity_id: state.state for state
+                    in history.get_states(self.hass, point)}
+
+        now = dt_util.utcnow()
+        snapshot_time = now + timedelta(seconds=1)
+        later = now + timedelta(seconds=2)
+
+        set_states(now, 'Before', 5)
+        instance.queue.put(SnapshotTask(snapshot_time))
+        self.wait_recording_done()
+        set_states(later, 'After', 3)
+
+        with patch('homeassistant.components.recorder.snapshot'
+                   '._most_recent_changed_state_ids',
+                   wraps=recorder.snapshot._most_recent_changed_state_ids) \
+                as changed_state_ids:
+            assert get_states(later + timedelta(seconds=1)) == {
+                'test.point_in_time_0': 'After 0',
+                'test.point_in_time_1': 'After 1',
+                'test.point_in_time_2': 'After 2',
+                'test.point_in_time_3': 'Before 3',
+                'test.point_in_time_4': 'Before 4',
+            }
+            assert get_states(snapshot_time) == {
+                'test.point_in_time_{}'.format(i): 'Before {}'.format(i)
+                for i in range(5)
+            }
+
+        # Only states since the snapshot were searched, SQLite does not
+        # store the timezone
+        snapshot_time = snapshot_time.replace(tzinfo=None)
+        assert [call[1][1] for call in changed_state_ids.mock_calls] == \
+            [snapshot_time, snapshot_time]
+
     def test_state_changes_during_period(self):
         """Test state change during period."""
         self.init_recorder()
@@ -219,6 +275,120 @@ class TestComponentHistory(unittest.TestCase):
             include_start_time_state=False)
         assert states == hist
 
+    def test_significant_states_json(self):
+        """Test streaming the significant states as JSON text chunks."""
+        zero, four, states = self.record_states()
+        one_and_half = zero + timedelta(seconds=1.5)
+        hist = history.get_significant_states(
+            self.hass, one_and_half, four, filters=history.Filters())
+
+        with patch('homeassistant.components.history.STREAM_CHUNK_SIZE', 10):
+            chunks = list(history.significant_states_json(
+                self.hass, one_and_half, four, filters=history.Filters()))
+
+        assert len(chunks) > 1
+        # Entities are ordered by entity id. media_player.test2 only has a
+        # state at the start time.
+        assert json.loads(''.join(chunks)) == json.loads(json.dumps(
+            [hist[entity_id] for entity_id in sorted(hist)],
+            cls=JSONEncoder))
+
+    def test_significant_states_json_single_entity(self):
+        """Test the states of one entity are streamed in several chunks."""
+        self.init_recorder()
+        start = dt_util.utcnow()
+
+        for idx in range(5):
+            self.hass.states.set('sensor.power', idx)
+        self.wait_recording_done()
+
+        with patch('homeassistant.components.history.STREAM_CHUNK_SIZE', 1):
+            chunks = list(history.significant_states_json(
+                self.hass, start, include_start_time_state=False))
+
+        # Every state is handed out once it is written
+        assert len(chunks) > 5
+        assert [state['state'] for state
+                in json.loads(''.join(chunks))[0]] == \
+            ['0', '1', '2', '3', '4']
+
+    def test_significant_states_json_empty(self):
+        """Test streaming the significant states without states."""
+        self.init_recorder()
+        now = dt_util.utcnow()
+
+        assert list(history.significant_states_json(
+            self.hass, now - timedelta(days=1), now)) == ['[]']
+
+    def test_get_rollups(self):
+        """Test combining the rollups into longer buckets."""
+        self.init_recorder()
+        start = rollup.bucket_start(
+            dt_util.utcnow() - timedelta(hours=2), timedelta(hours=1))
+
+        with recorder.session_scope(hass=self.hass) as session:
+            for minutes, entity_id, values, count in (
+                    (0, 'sensor.power', (10, 30, 20, 30), 3),
+                    (5, 'sensor.power', (5, 15, 10, 5), 1),
+                    (60, 'sensor.power', (40, 40, 40, 40), 1),
+                    (0, 'sensor.energy', (1, 1, 1, 1), 1),
+                    (0, 'sensor.other', (1, 1, 1, 1), 1)):
+                session.add(StateRollups(
+                    entity_id=entity_id,
+                    start=start + timedelta(minutes=minutes),
+                    min=values[0], max=values[1], mean=values[2],
+                    last=values[3], count=count))
+
+        hist = history.get_rollups(
+            self.hass, start + timedelta(minutes=30),
+            start + timedelta(hours=2), ['sensor.power', 'sensor.energy'],
+            period=timedelta(hours=1))
+
+        assert list(hist) == ['sensor.energy', 'sensor.power']
+        assert hist['sensor.power'] == [
+            {'entity_id': 'sensor.power', 'start': start, 'min': 5,
+             'max': 30, 'mean': 17.5, 'last': 5, 'count': 4},
+            {'entity_id': 'sensor.power',
+             'start': start + timedelta(hours=1), 'min': 40, 'max': 40,
+             'mean': 40, 'last': 40, 'count': 1},
+        ]
+
+        hist = history.get_rollups(
+            self.hass, start, start + timedelta(minutes=5))
+        assert [bucket['mean'] for bucket in hist['sensor.power']] == [20]
+
+    def test_get_rollups_filters(self):
+        """Test the include and exclude filters apply to the rollups."""
+        self.init_recorder()
+        start = rollup.bucket_start(
+            dt_util.utcnow() - timedelta(hours=1), rollup.ROLLUP_PERIOD)
+
+        with recorder.session_scope(hass=self.hass) as session:
+            for entity_id in ('sensor.power', 'sensor.energy',
+                              'input_number.level', 'inputxnumber.level',
+                              'climate.attic'):
+                session.add(StateRollups(
+                    entity_id=entity_id, start=start, min=1, max=1,
+                    mean=1, last=1, count=1))
+
+        filters = history.Filters()
+        filters.excluded_domains = ['input_number']
+        filters.excluded_entities = ['sensor.energy']
+        hist = history.get_rollups(self.hass, start, filters=filters)
+        assert list(hist) == [
+            'climate.attic', 'inputxnumber.level', 'sensor.power']
+
+        filters = history.Filters()
+        filters.included_domains = ['sensor']
+        filters.excluded_entities = ['sensor.energy']
+        hist = history.get_rollups(self.hass, start, filters=filters)
+        assert list(hist) == ['sensor.power']
+
+        # Requested entities are not filtered
+        hist = history.get_rollups(
+            self.hass, start, entity_ids=['sensor.energy'], filters=filters)
+        assert list(hist) == ['sensor.energy']
+
     def test_get_significant_states_entity_id(self):
         """Test that only significant states are returned for one entity."""
         zero, four, states = self.record_states()
@@ -526,3 +696,75 @@ async def test_fetch_period_api(hass, aiohttp_client):
     response = await client.get(
         '/api/history/period/{}'.format(dt_util.utcnow().isoformat()))
     assert response.status == 200
+
+
+async def test_fetch_period_api_stream(hass, aiohttp_client):
+    """Test streaming the history period."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    await hass.components.recorder.wait_connection_ready()
+    hass.states.async_set('light.kitchen', 'on')
+    await hass.async_block_till_done()
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    client = await aiohttp_client(hass.http.app)
+    response = await client.get(
+        '/api/history/period/{}?stream'.format(
+            (dt_util.utcnow() - timedelta(hours=1)).isoformat()))
+    assert response.status == 200
+    result = await response.json()
+    assert [[state['entity_id'] for state in states]
+            for states in result] == [['light.kitchen']]
+
+
+async def test_fetch_period_api_rollup(hass, aiohttp_client):
+    """Test fetching the rollups of the history period."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {})
+    await hass.components.recorder.wait_connection_ready()
+    client = await aiohttp_client(hass.http.app)
+    url = '/api/history/period/{}?rollup='.format(
+        (dt_util.utcnow() - timedelta(hours=1)).isoformat())
+
+    response = await client.get(url + '60')
+    assert response.status == 200
+    assert await response.json() == []
+
+    for rollup_minutes in ('7', '0', 'hour'):
+        response = await client.get(url + rollup_minutes)
+        assert response.status == 400
+
+
+async def test_fetch_period_api_rollup_filters(hass, aiohttp_client):
+    """Test the rollups of the history period are filtered and ordered."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'history', {
+        history.DOMAIN: {
+            history.CONF_ORDER: True,
+            history.CONF_INCLUDE: {
+                history.CONF_ENTITIES: ['sensor.power', 'sensor.energy']},
+            history.CONF_EXCLUDE: {
+                history.CONF_ENTITIES: ['sensor.energy']}}})
+    await hass.components.recorder.wait_connection_ready()
+    start = rollup.bucket_start(
+        dt_util.utcnow() - timedelta(minutes=30), rollup.ROLLUP_PERIOD)
+
+    def add_rollups():
+        """Add rollups for the sensors."""
+        with recorder.session_scope(hass=hass) as session:
+            for entity_id in ('sensor.energy', 'sensor.other',
+                              'sensor.power'):
+                session.add(StateRollups(
+                    entity_id=entity_id, start=start, min=1, max=1,
+                    mean=1, last=1, count=1))
+
+    # The recorder shares the in memory database, wait until it is idle
+    await hass.async_add_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    await hass.async_add_job(add_rollups)
+    client = await aiohttp_client(hass.http.app)
+    response = await client.get(
+        '/api/history/period/{}?rollup=60'.format(
+            (dt_util.utcnow() - timedelta(hours=1)).isoformat()))
+    assert response.status == 200
+    result = await response.json()
+    assert [[bucket['entity_id'] for bucket in buckets]
+            for buckets in result] == [['sensor.power']]
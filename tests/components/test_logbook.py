@@ -3,6 +3,7 @@
 import logging
 from datetime import timedelta
 import unittest
+from unittest.mock import patch
 
 from homeassistant.components import sun
 import homeassistant.core as ha
@@ -11,6 +12,8 @@ from homeassistant.const import (
     ATTR_HIDDEN, STATE_NOT_HOME, STATE_ON, STATE_OFF)
 import homeassistant.util.dt as dt_util
 from homeassistant.components import logbook, recorder
+from homeassistant.components.recorder.const import SIGNAL_PURGED
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.setup import setup_component, async_setup_component
 
 from tests.common import (
@@ -556,6 +559,152 @@ class TestComponentLogbook(unittest.TestCase):
         }, time_fired=event_time_fired)
 
 
+class TestLogbookQuery(unittest.TestCase):
+    """Test the filters applied by the logbook query."""
+
+    def setUp(self):
+        """Set up things to be run when tests are started."""
+        self.hass = get_test_home_assistant()
+        init_recorder_component(self.hass)  # Force an in memory DB
+        self.hass.start()
+        # Some tests write to the database, the recorder must be idle
+        self.hass.block_till_done()
+        self.hass.data[recorder.DATA_INSTANCE].block_till_done()
+
+    def tearDown(self):
+        """Stop everything that was started."""
+        self.hass.stop()
+
+    def _get_entries(self, config):
+        """Record state changes and return the logbook entries."""
+        start = dt_util.utcnow()
+        for entity_id, attributes in (
+                ('switch.kitchen', {}),
+                ('switch.garden', {}),
+                ('light.kitchen', {}),
+                ('sensor.power', {'unit_of_measurement': 'W'}),
+                ('sensor.door', {})):
+            self.hass.states.set(entity_id, 'on', attributes)
+            self.hass.states.set(entity_id, 'off', attributes)
+        # Only attributes changed
+        self.hass.states.set('switch.kitchen', 'off', {'color': 'red'})
+        self.hass.block_till_done()
+        self.hass.data[recorder.DATA_INSTANCE].block_till_done()
+
+        entries = logbook._get_events(
+            self.hass, logbook.CONFIG_SCHEMA({logbook.DOMAIN: config})[
+                logbook.DOMAIN], start, dt_util.utcnow())
+        return [(entry.entity_id, entry.message) for entry in entries]
+
+    def test_query_without_filter(self):
+        """Test the query skips sensors with a unit and attribute changes."""
+        self.assertEqual([
+            ('switch.kitchen', 'turned off'),
+            ('switch.garden', 'turned off'),
+            ('light.kitchen', 'turned off'),
+            ('sensor.door', 'turned off'),
+        ], self._get_entries({}))
+
+    def test_query_exclude(self):
+        """Test the query applies the exclude config."""
+        self.assertEqual([
+            ('light.kitchen', 'turned off'),
+            ('sensor.door', 'turned off'),
+        ], self._get_entries({logbook.CONF_EXCLUDE: {
+            logbook.CONF_DOMAINS: ['switch']}}))
+
+    def test_query_include_exclude(self):
+        """Test the query applies the include and exclude config."""
+        self.assertEqual([
+            ('switch.garden', 'turned off'),
+            ('sensor.door', 'turned off'),
+        ], self._get_entries({
+            logbook.CONF_INCLUDE: {
+                logbook.CONF_DOMAINS: ['switch'],
+                logbook.CONF_ENTITIES: ['sensor.door']},
+            logbook.CONF_EXCLUDE: {
+                logbook.CONF_ENTITIES: ['switch.kitchen']}}))
+
+    def test_query_nested_units(self):
+        """Test only a unit of the state itself hides a sensor."""
+        start = dt_util.utcnow()
+        for entity_id, attributes in (
+                ('sensor.nested', {'inner': {'unit_of_measurement': 'W'}}),
+                ('sensor.power', {'unit_of_measurement': 'W',
+                                  'inner': {'unit_of_measurement': None}})):
+            self.hass.states.set(entity_id, 'on', attributes)
+            self.hass.states.set(entity_id, 'off', attributes)
+        self.hass.block_till_done()
+        self.hass.data[recorder.DATA_INSTANCE].block_till_done()
+
+        entries = logbook._get_events(
+            self.hass, logbook.CONFIG_SCHEMA({logbook.DOMAIN: {}})[
+                logbook.DOMAIN], start, dt_util.utcnow())
+        self.assertEqual(['sensor.nested'],
+                         [entry.entity_id for entry in entries])
+
+    def _filter_states(self, json_extract, attributes_by_entity):
+        """Store the attributes and return the entities the filter keeps."""
+        from homeassistant.components.recorder.models import (
+            StateAttributes, States)
+        from homeassistant.components.recorder.util import session_scope
+
+        now = dt_util.utcnow()
+        with session_scope(hass=self.hass) as session:
+            for entity_id, shared_attrs in attributes_by_entity:
+                attrs = StateAttributes(shared_attrs=shared_attrs)
+                session.add(attrs)
+                session.flush()
+                session.add(States(
+                    entity_id=entity_id, domain='sensor', state='1',
+                    attributes_id=attrs.attributes_id,
+                    last_changed=now, last_updated=now))
+
+        with session_scope(hass=self.hass) as session:
+            return [row.entity_id for row in session.query(States.entity_id)
+                    .outerjoin(StateAttributes,
+                               States.attributes_id ==
+                               StateAttributes.attributes_id)
+                    .filter(States.entity_id.in_(
+                        [entity_id for entity_id, _ in attributes_by_entity]))
+                    .filter(logbook._states_filter(
+                        logbook.CONFIG_SCHEMA({logbook.DOMAIN: {}})[
+                            logbook.DOMAIN], json_extract))
+                    .order_by(States.entity_id)]
+
+    def test_query_unit_attributes(self):
+        """Test the query skips sensors with a unit like humanify."""
+        from homeassistant.components.recorder.util import session_scope
+
+        with session_scope(hass=self.hass) as session:
+            self.assertTrue(logbook._json_extract_supported(
+                self.hass, session))
+
+        self.assertEqual([
+            'sensor.empty', 'sensor.invalid', 'sensor.nested', 'sensor.null',
+            'sensor.text', 'sensor.wildcard', 'sensor.zero',
+        ], self._filter_states(True, (
+            ('sensor.stored', '{"unit_of_measurement": "W"}'),
+            ('sensor.compact', '{"unit_of_measurement":"W"}'),
+            ('sensor.number', '{"unit_of_measurement": 1}'),
+            ('sensor.null', '{"unit_of_measurement": null}'),
+            ('sensor.empty', '{"unit_of_measurement": ""}'),
+            ('sensor.zero', '{"unit_of_measurement": 0}'),
+            ('sensor.text', '{"note": "\\"unit_of_measurement\\": 1"}'),
+            ('sensor.wildcard', '{"unitXofXmeasurement": "W"}'),
+            ('sensor.nested', '{"inner": {"unit_of_measurement": "W"}}'),
+            ('sensor.nested_null', '{"unit_of_measurement": "W", '
+             '"inner": {"unit_of_measurement": null}}'),
+            ('sensor.invalid', '{"unit_of_measurement": "W", "x": NaN}'),
+        )))
+
+    def test_query_unit_attributes_unsupported(self):
+        """Test humanify skips sensors with a unit without JSON support."""
+        self.assertEqual(['sensor.power'], self._filter_states(False, (
+            ('sensor.power', '{"unit_of_measurement": "W"}'),
+        )))
+
+
 async def test_logbook_view(hass, aiohttp_client):
     """Test the logbook view."""
     await hass.async_add_job(init_recorder_component, hass)
@@ -566,3 +715,47 @@ async def test_logbook_view(hass, aiohttp_client):
     response = await client.get(
         '/api/logbook/{}'.format(dt_util.utcnow().isoformat()))
     assert response.status == 200
+
+
+async def test_logbook_view_cache(hass, aiohttp_client):
+    """Test the entries of past days are cached once they are committed."""
+    await hass.async_add_job(init_recorder_component, hass)
+    await async_setup_component(hass, 'logbook', {})
+    await hass.components.recorder.wait_connection_ready()
+    instance = hass.data[recorder.DATA_INSTANCE]
+    hass.bus.async_fire('test_event')
+    await hass.async_block_till_done()
+    await hass.async_add_job(instance.block_till_done)
+    client = await aiohttp_client(hass.http.app)
+    yesterday = dt_util.utcnow() - timedelta(days=2)
+    today = dt_util.utcnow().isoformat()
+
+    with patch('homeassistant.components.logbook._get_events',
+               return_value=[]) as mock_get_events:
+        # Events of the day may still be waiting in the recorder queue
+        with patch.object(instance, 'committed_until',
+                          yesterday + timedelta(hours=1)):
+            for _ in range(2):
+                response = await client.get(
+                    '/api/logbook/{}'.format(yesterday.isoformat()))
+                assert response.status == 200
+        assert mock_get_events.call_count == 2
+
+        for _ in range(2):
+            response = await client.get(
+                '/api/logbook/{}'.format(yesterday.isoformat()))
+            assert response.status == 200
+        assert mock_get_events.call_count == 3
+
+        for _ in range(2):
+            response = await client.get('/api/logbook/{}'.format(today))
+            assert response.status == 200
+        assert mock_get_events.call_count == 5
+
+        # A purge may have deleted cached entries
+        async_dispatcher_send(hass, SIGNAL_PURGED)
+        await hass.async_block_till_done()
+        response = await client.get(
+            '/api/logbook/{}'.format(yesterday.isoformat()))
+        assert response.status == 200
+        assert mock_get_events.call_count == 6
@@ -1,12 +1,13 @@
 """Tests for the Home Assistant Websocket API."""
 import asyncio
+import json
 from unittest.mock import patch
 
 from aiohttp import WSMsgType
 from async_timeout import timeout
 import pytest
 
-from homeassistant.core import callback
+from homeassistant.core import callback, State
 from homeassistant.components import websocket_api as wapi
 from homeassistant.setup import async_setup_component
 
@@ -215,6 +216,93 @@ def test_subscribe_unsubscribe_events(hass, websocket_client):
     assert sum(hass.bus.async_listeners().values()) == init_count
 
 
+async def test_subscribe_states(hass, websocket_client):
+    """Test subscribe states command with filters and diffs."""
+    hass.states.async_set('light.kitchen', 'off', {'brightness': 0})
+
+    await websocket_client.send_json({
+        'id': 5,
+        'type': wapi.TYPE_SUBSCRIBE_STATES,
+        'entity_ids': ['light.kitchen'],
+        'domains': ['sensor'],
+    })
+
+    msg = await websocket_client.receive_json()
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_RESULT
+    assert msg['success']
+
+    hass.states.async_set('switch.ignored', 'on')
+    hass.states.async_set('light.kitchen', 'on', {
+        'brightness': 255, 'color_temp': 300})
+
+    with timeout(3, loop=hass.loop):
+        msg = await websocket_client.receive_json()
+
+    # The first change of an entity contains the full state
+    assert msg['id'] == 5
+    assert msg['type'] == wapi.TYPE_EVENT
+    assert msg['event']['entity_id'] == 'light.kitchen'
+    assert msg['event']['new_state']['state'] == 'on'
+    assert msg['event']['new_state']['attributes'] == {
+        'brightness': 255, 'color_temp': 300}
+
+    hass.states.async_set('light.kitchen', 'on', {'brightness': 128})
+
+    with timeout(3, loop=hass.loop):
+        msg = await websocket_client.receive_json()
+
+    diff = msg['event']['diff']
+    assert 'state' not in diff
+    assert 'last_changed' not in diff
+    assert diff['attributes'] == {'brightness': 128}
+    assert diff['attributes_removed'] == ['color_temp']
+
+    hass.states.async_set('sensor.temperature', '21')
+
+    with timeout(3, loop=hass.loop):
+        msg = await websocket_client.receive_json()
+
+    assert msg['event']['entity_id'] == 'sensor.temperature'
+    assert msg['event']['new_state']['state'] == '21'
+
+    await websocket_client.send_json({
+        'id': 6,
+        'type': wapi.TYPE_UNSUBSCRIBE_EVENTS,
+        'subscription': 5
+    })
+
+    msg = await websocket_client.receive_json()
+    assert msg['id'] == 6
+    assert msg['success']
+
+
+def test_state_change_payloads_shared(hass):
+    """Test identical state changes are encoded once."""
+    payloads = wapi.StateChangePayloads()
+    old_state = State('light.kitchen', 'off')
+    new_state = State('light.kitchen', 'on', {'brightness': 255})
+
+    with patch.object(wapi, 'JSON_DUMP', side_effect=wapi.JSON_DUMP) \
+            as mock_dump:
+        first = payloads.get('light.kitchen', old_state, new_state)
+        second = payloads.get('light.kitchen', old_state, new_state)
+        full = payloads.get('light.kitchen', None, new_state)
+
+    assert first is second
+    # The full state uses the cached encoding of the state
+    assert mock_dump.call_count == 2
+    assert new_state.as_json() in full
+    assert json.loads(first)['diff'] == {
+        'state': 'on',
+        'last_changed': new_state.last_changed.isoformat(),
+        'last_updated': new_state.last_updated.isoformat(),
+        'context': new_state.context.as_dict(),
+        'attributes': {'brightness': 255},
+    }
+    assert json.loads(full)['new_state']['attributes'] == {'brightness': 255}
+
+
 @asyncio.coroutine
 def test_get_states(hass, websocket_client):
     """Test get_states command."""
@@ -1,10 +1,12 @@
 """Test zone component."""
 
+import random
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from homeassistant import setup
 from homeassistant.components import zone
+from homeassistant.util.location import distance
 
 from tests.common import get_test_home_assistant
 from tests.common import MockConfigEntry
@@ -38,6 +40,109 @@ async def test_unload_entry_successful(hass):
     assert not hass.data[zone.DOMAIN]
 
 
+def _full_scan_active_zone(hass, latitude, longitude, radius):
+    """Find the active zone by checking every zone."""
+    closest = None
+
+    for entity_id in sorted(hass.states.async_entity_ids(zone.DOMAIN)):
+        state = hass.states.get(entity_id)
+
+        if state.attributes.get(zone.zone.ATTR_PASSIVE) or \
+                not zone.zone.in_zone(state, latitude, longitude, radius):
+            continue
+
+        zone_dist = distance(
+            latitude, longitude, state.attributes['latitude'],
+            state.attributes['longitude'])
+        closest_dist = closest and distance(
+            latitude, longitude, closest.attributes['latitude'],
+            closest.attributes['longitude'])
+
+        if closest is None or zone_dist < closest_dist or \
+                (zone_dist == closest_dist and
+                 state.attributes['radius'] < closest.attributes['radius']):
+            closest = state
+
+    return closest
+
+
+async def test_active_zone_index_matches_full_scan(hass):
+    """Test the zone index finds the same zones as checking all of them."""
+    rand = random.Random(42)
+
+    for index in range(200):
+        hass.states.async_set('zone.zone_{}'.format(index), 'zoning', {
+            'latitude': rand.uniform(52.2, 52.6),
+            'longitude': rand.uniform(179.7, 180),
+            'radius': rand.choice([50, 100, 250, 1000, 5000, 30000]),
+            'passive': rand.random() < 0.1,
+        })
+
+    for _ in range(200):
+        location = (rand.uniform(52.2, 52.6), rand.uniform(179.7, 180),
+                    rand.choice([0, 10, 100, 20000]))
+        assert zone.zone.async_active_zone(hass, *location) == \
+            _full_scan_active_zone(hass, *location)
+
+
+async def test_active_zone_index_follows_zone_changes(hass):
+    """Test the zone index is rebuilt when a zone changes."""
+    hass.states.async_set('zone.work', 'zoning', {
+        'latitude': 32.8806, 'longitude': -117.2375, 'radius': 100})
+
+    assert zone.zone.async_active_zone(
+        hass, 32.8806, -117.2375).entity_id == 'zone.work'
+    assert zone.zone.async_active_zone(hass, 40.7128, -74.0060) is None
+
+    hass.states.async_set('zone.work', 'zoning', {
+        'latitude': 40.7128, 'longitude': -74.0060, 'radius': 100})
+    await hass.async_block_till_done()
+
+    assert zone.zone.async_active_zone(hass, 32.8806, -117.2375) is None
+    assert zone.zone.async_active_zone(
+        hass, 40.7128, -74.0060).entity_id == 'zone.work'
+
+    hass.states.async_remove('zone.work')
+    await hass.async_block_till_done()
+
+    assert zone.zone.async_active_zone(hass, 40.7128, -74.0060) is None
+
+
+async def test_active_zone_index_sees_changes_immediately(hass):
+    """Test lookups right after a zone change without yielding see it."""
+    assert zone.zone.async_active_zone(hass, 32.8806, -117.2375) is None
+
+    hass.states.async_set('zone.work', 'zoning', {
+        'latitude': 32.8806, 'longitude': -117.2375, 'radius': 100})
+    assert zone.zone.async_active_zone(
+        hass, 32.8806, -117.2375).entity_id == 'zone.work'
+
+    hass.states.async_set('zone.work', 'zoning', {
+        'latitude': 40.7128, 'longitude': -74.0060, 'radius': 100})
+    assert zone.zone.async_active_zone(hass, 32.8806, -117.2375) is None
+    assert zone.zone.async_active_zone(
+        hass, 40.7128, -74.0060).entity_id == 'zone.work'
+
+    hass.states.async_remove('zone.work')
+    assert zone.zone.async_active_zone(hass, 40.7128, -74.0060) is None
+
+
+async def test_active_zone_index_only_reads_zones(hass):
+    """Test lookups only read the zone states."""
+    hass.states.async_set('zone.work', 'zoning', {
+        'latitude': 32.8806, 'longitude': -117.2375, 'radius': 100})
+    hass.states.async_set('light.kitchen', 'on')
+
+    with patch.object(hass.states, 'async_all',
+                      side_effect=AssertionError), \
+            patch.object(hass.states, 'get',
+                         side_effect=hass.states.get) as mock_get:
+        assert zone.zone.async_active_zone(
+            hass, 32.8806, -117.2375).entity_id == 'zone.work'
+
+    assert [call[1][0] for call in mock_get.mock_calls] == ['zone.work']
+
+
 class TestComponentZone(unittest.TestCase):
     """Test the zone component."""
 
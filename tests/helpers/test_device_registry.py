@@ -10,6 +10,7 @@ def mock_registry(hass, mock_entries=None):
     """Mock the Device Registry."""
     registry = device_registry.DeviceRegistry(hass)
     registry.devices = mock_entries or OrderedDict()
+    registry.async_rebuild_index()
 
     async def _get_reg():
         return registry
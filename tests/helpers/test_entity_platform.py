@@ -13,6 +13,7 @@ from homeassistant.helpers.entity import generate_entity_id
 from homeassistant.helpers.entity_component import (
     EntityComponent, DEFAULT_SCAN_INTERVAL)
 from homeassistant.helpers import entity_platform, entity_registry
+from homeassistant.profiler import DATA_PROFILER, StartupProfiler
 
 import homeassistant.util.dt as dt_util
 
@@ -676,3 +677,27 @@ async def test_entity_registry_updates_invalid_entity_id(hass):
     assert hass.states.get('test_domain.world') is not None
     assert hass.states.get('invalid_entity_id') is None
     assert hass.states.get('diff_domain.world') is None
+
+
+async def test_platform_setup_profiled(hass):
+    """Test the platform setup and first added entities are profiled."""
+    profiler = hass.data[DATA_PROFILER] = StartupProfiler()
+
+    async def async_setup_platform(hass, config, async_add_entities,
+                                   discovery_info=None):
+        """Add an entity."""
+        async_add_entities([MockEntity(name='test')])
+
+    loader.set_component(hass, 'test_domain.platform', MockPlatform(
+        async_setup_platform=async_setup_platform))
+
+    component = EntityComponent(_LOGGER, DOMAIN, hass)
+    await component.async_setup({
+        DOMAIN: {
+            'platform': 'platform',
+        }
+    })
+    await hass.async_block_till_done()
+
+    assert set(profiler.as_dict()['durations']['test_domain.platform']) == {
+        'platform', 'first_entities'}
@@ -195,6 +195,26 @@ async def test_removing_config_entry_id(registry):
     assert entry.config_entry_id is None
 
 
+async def test_index_follows_updates(registry):
+    """Test the index follows renamed entities and moved config entries."""
+    registry.async_get_or_create(
+        'light', 'hue', '5678', config_entry_id='mock-id-1')
+    registry.async_get_or_create(
+        'light', 'hue', '5678', config_entry_id='mock-id-2')
+    registry.async_update_entity(
+        'light.hue_5678', new_entity_id='light.living_room')
+
+    assert registry.async_get_entity_id(
+        'light', 'hue', '5678') == 'light.living_room'
+
+    registry.async_clear_config_entry('mock-id-1')
+    assert registry.entities['light.living_room'].config_entry_id == \
+        'mock-id-2'
+
+    registry.async_clear_config_entry('mock-id-2')
+    assert registry.entities['light.living_room'].config_entry_id is None
+
+
 async def test_migration(hass):
     """Test migration from old data to new."""
     old_conf = {
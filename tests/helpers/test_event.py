@@ -10,9 +10,14 @@ import pytest
 from homeassistant.core import callback
 from homeassistant.setup import setup_component
 import homeassistant.core as ha
-from homeassistant.const import MATCH_ALL
+from homeassistant.const import EVENT_TIME_CHANGED, MATCH_ALL
 from homeassistant.helpers.event import (
+    DATA_STATE_CHANGE_LISTENERS,
+    DATA_TIME_LISTENERS,
     async_call_later,
+    async_track_point_in_utc_time,
+    async_track_state_change,
+    async_track_utc_time_change,
     track_point_in_utc_time,
     track_point_in_time,
     track_utc_time_change,
@@ -28,7 +33,8 @@ from homeassistant.helpers.template import Template
 from homeassistant.components import sun
 import homeassistant.util.dt as dt_util
 
-from tests.common import get_test_home_assistant, fire_time_changed
+from tests.common import (
+    async_fire_time_changed, get_test_home_assistant, fire_time_changed)
 from unittest.mock import patch
 
 
@@ -663,3 +669,125 @@ def test_async_call_later(hass):
     assert p_action is action
     assert p_point == now + timedelta(seconds=3)
     assert remove is mock()
+
+
+async def test_track_state_change_entity_index(hass):
+    """Test state change listeners only run for their own entities."""
+    kitchen_runs = []
+    both_runs = []
+
+    unsub_kitchen = async_track_state_change(
+        hass, 'light.Kitchen',
+        callback(lambda *args: kitchen_runs.append(args[0])))
+    unsub_both = async_track_state_change(
+        hass, ['light.kitchen', 'light.bowl', 'light.bowl'],
+        callback(lambda *args: both_runs.append(args[0])))
+
+    assert hass.bus.async_listeners()['state_changed'] == 1
+    assert sorted(hass.data[DATA_STATE_CHANGE_LISTENERS]) == \
+        ['light.bowl', 'light.kitchen']
+
+    hass.states.async_set('light.kitchen', 'on')
+    hass.states.async_set('light.bowl', 'on')
+    hass.states.async_set('light.ceiling', 'on')
+    await hass.async_block_till_done()
+
+    assert kitchen_runs == ['light.kitchen']
+    assert both_runs == ['light.kitchen', 'light.bowl']
+
+    unsub_kitchen()
+    unsub_kitchen()
+    assert sorted(hass.data[DATA_STATE_CHANGE_LISTENERS]) == \
+        ['light.bowl', 'light.kitchen']
+
+    unsub_both()
+    assert hass.data[DATA_STATE_CHANGE_LISTENERS] == {}
+
+    hass.states.async_set('light.kitchen', 'off')
+    await hass.async_block_till_done()
+
+    assert kitchen_runs == ['light.kitchen']
+    assert both_runs == ['light.kitchen', 'light.bowl']
+
+
+async def test_track_state_change_entity_index_remove_in_listener(hass):
+    """Test a listener can remove itself and errors do not stop dispatch."""
+    runs = []
+    unsub = None
+
+    @callback
+    def failing_listener(entity_id, old_state, new_state):
+        """Raise an error."""
+        raise ValueError
+
+    @callback
+    def remove_listener(entity_id, old_state, new_state):
+        """Remove itself on first run."""
+        runs.append(entity_id)
+        unsub()
+
+    async_track_state_change(hass, 'light.kitchen', failing_listener)
+    unsub = async_track_state_change(hass, 'light.kitchen', remove_listener)
+
+    hass.states.async_set('light.kitchen', 'on')
+    await hass.async_block_till_done()
+    hass.states.async_set('light.kitchen', 'off')
+    await hass.async_block_till_done()
+
+    assert runs == ['light.kitchen']
+
+
+async def test_time_listeners_point_in_time_heap(hass):
+    """Test point in time listeners run once in order of their time."""
+    runs = []
+    start = datetime(2018, 9, 1, 12, 0, 0, tzinfo=dt_util.UTC)
+
+    for seconds in (3, 1, 2):
+        async_track_point_in_utc_time(
+            hass, callback(lambda now, seconds=seconds: runs.append(seconds)),
+            start + timedelta(seconds=seconds))
+    unsub = async_track_point_in_utc_time(
+        hass, callback(lambda now: runs.append('removed')),
+        start + timedelta(seconds=1))
+
+    assert hass.bus.async_listeners()[EVENT_TIME_CHANGED] == 1
+
+    unsub()
+    unsub()
+    async_fire_time_changed(hass, start)
+    await hass.async_block_till_done()
+    assert runs == []
+
+    async_fire_time_changed(hass, start + timedelta(seconds=2))
+    await hass.async_block_till_done()
+    assert runs == [1, 2]
+
+    async_fire_time_changed(hass, start + timedelta(seconds=10))
+    async_fire_time_changed(hass, start + timedelta(seconds=11))
+    await hass.async_block_till_done()
+    assert runs == [1, 2, 3]
+    assert hass.data[DATA_TIME_LISTENERS]._points_in_time == []
+
+
+async def test_time_listeners_pattern_slots(hass):
+    """Test time patterns are only checked on the seconds they match."""
+    runs = []
+
+    unsub = async_track_utc_time_change(
+        hass, callback(lambda now: runs.append(now)), minute=5, second=30)
+    time_listeners = hass.data[DATA_TIME_LISTENERS]
+
+    assert [second for second, slot
+            in enumerate(time_listeners._second_slots) if slot] == [30]
+
+    for second in (0, 29, 30, 31):
+        async_fire_time_changed(
+            hass, datetime(2018, 9, 1, 12, 5, second, tzinfo=dt_util.UTC))
+    async_fire_time_changed(
+        hass, datetime(2018, 9, 1, 12, 6, 30, tzinfo=dt_util.UTC))
+    await hass.async_block_till_done()
+
+    assert runs == [datetime(2018, 9, 1, 12, 5, 30, tzinfo=dt_util.UTC)]
+
+    unsub()
+    assert not any(time_listeners._second_slots)
@@ -1,8 +1,10 @@
 """Test Home Assistant remote methods and classes."""
+import json
+
 import pytest
 
 from homeassistant import core
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import JSONEncoder, event_to_json
 from homeassistant.util import dt as dt_util
 
 
@@ -19,3 +21,17 @@ def test_json_encoder(hass):
 
     now = dt_util.utcnow()
     assert ha_json_enc.default(now) == now.isoformat()
+
+
+def test_event_to_json():
+    """Test encoding events with and without states."""
+    event = core.Event('test_event', {'hello': 'world'})
+    assert json.loads(event_to_json(event)) == \
+        json.loads(json.dumps(event, cls=JSONEncoder))
+
+    state = core.State('test.test', 'hello')
+    event = core.Event('state_changed', {
+        'entity_id': 'test.test', 'old_state': None, 'new_state': state})
+    assert json.loads(event_to_json(event)) == \
+        json.loads(json.dumps(event, cls=JSONEncoder))
+    assert state.as_json() in event_to_json(event)
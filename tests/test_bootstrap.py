@@ -6,10 +6,12 @@ from unittest.mock import Mock, patch
 import logging
 
 import homeassistant.config as config_util
-from homeassistant import bootstrap
+from homeassistant import bootstrap, loader
+from homeassistant.profiler import DATA_PROFILER, PROFILE_FILE
 import homeassistant.util.dt as dt_util
 
-from tests.common import patch_yaml_files, get_test_config_dir, mock_coro
+from tests.common import (
+    patch_yaml_files, get_test_config_dir, mock_coro, MockModule)
 
 ORIG_TIMEZONE = dt_util.DEFAULT_TIME_ZONE
 VERSION_PATH = os.path.join(get_test_config_dir(), config_util.VERSION_FILE)
@@ -54,6 +56,123 @@ def test_home_assistant_core_config_validation(hass):
     assert result is None
 
 
+@patch('homeassistant.bootstrap.async_enable_logging', Mock())
+@patch('homeassistant.bootstrap.async_register_signal_handling', Mock())
+async def test_preload_configured_components(hass):
+    """Test the configured components and platforms are preloaded."""
+    with patch('homeassistant.loader.async_preload_components',
+               return_value=mock_coro()) as mock_preload, \
+            patch('homeassistant.bootstrap.async_setup_component',
+                  return_value=mock_coro(True)):
+        await bootstrap.async_from_config_dict({
+            'homeassistant': {'preload_components': True},
+            'light': [{'platform': 'hue'}, {'platform': 'demo'}],
+            'light 2': {'platform': 'test'},
+            'http': {},
+        }, hass)
+
+    assert len(mock_preload.mock_calls) == 1
+    assert set(mock_preload.mock_calls[0][1][1]) == {
+        'light', 'light.hue', 'light.demo', 'light.test', 'http'}
+
+
+@patch('homeassistant.bootstrap.async_enable_logging', Mock())
+@patch('homeassistant.bootstrap.async_register_signal_handling', Mock())
+async def test_profile_startup(hass):
+    """Test the startup profile is written when startup is profiled."""
+    loader.set_component(hass, 'comp', MockModule('comp'))
+
+    with patch('homeassistant.bootstrap.save_json') as mock_save:
+        await bootstrap.async_from_config_dict({
+            'homeassistant': {'profile_startup': True},
+            'comp': {},
+        }, hass)
+
+    profiler = hass.data[DATA_PROFILER]
+    assert not profiler.active
+    assert {'config', 'setup'} <= set(profiler.as_dict()['durations']['comp'])
+    assert [call[1] for call in mock_save.mock_calls] == [
+        (hass.config.path(bootstrap.STARTUP_TIMELINE_FILE),
+         hass.data[bootstrap.DATA_STARTUP_TIMELINE]),
+        (hass.config.path(PROFILE_FILE), profiler.as_trace()),
+    ]
+
+
+async def test_setup_components_after_dependencies(hass):
+    """Test components are set up as soon as their dependencies are."""
+    running = set()
+    started = []
+    max_running = 0
+
+    def mock_setup(domain):
+        """Return a setup that records when it ran."""
+        async def async_setup(hass, config):
+            """Mock setup."""
+            nonlocal max_running
+            started.append((domain, set(hass.config.components)))
+            running.add(domain)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0)
+            running.remove(domain)
+            return True
+        return async_setup
+
+    for domain, dependencies in (('logger', []),
+                                 ('comp_a', []),
+                                 ('comp_b', ['comp_a', 'comp_dep']),
+                                 ('comp_dep', []),
+                                 ('comp_c', [])):
+        loader.set_component(hass, domain, MockModule(
+            domain, dependencies=dependencies,
+            async_setup=mock_setup(domain)))
+
+    hass.config.setup_concurrency = 1
+
+    with patch('homeassistant.bootstrap.save_json') as mock_save:
+        await bootstrap._async_setup_components(
+            hass, {}, {'logger', 'comp_a', 'comp_b', 'comp_c'})
+
+    assert hass.config.components == {
+        'logger', 'comp_a', 'comp_b', 'comp_c', 'comp_dep'}
+    assert max_running == 1
+
+    set_up_before = dict(started)
+    assert set_up_before['logger'] == set()
+    for domain in ('comp_a', 'comp_c', 'comp_dep'):
+        assert 'logger' in set_up_before[domain]
+    assert {'comp_a', 'comp_dep'} <= set_up_before['comp_b']
+
+    timeline = hass.data[bootstrap.DATA_STARTUP_TIMELINE]
+    assert [entry['component'] for entry in timeline] == \
+        [domain for domain, _ in started]
+    entry = next(entry for entry in timeline if entry['component'] == 'comp_b')
+    assert entry['dependencies'] == ['comp_a', 'comp_dep', 'logger']
+    assert entry['success'] is True
+    assert entry['wait_dependencies'] >= 0
+    assert entry['wait_concurrency'] >= 0
+    assert entry['setup'] >= 0
+
+    # The timeline is only written when startup is profiled
+    assert not mock_save.called
+
+
+async def test_setup_components_failed_dependency(hass):
+    """Test a component is not set up when a dependency failed."""
+    loader.set_component(hass, 'comp_a', MockModule(
+        'comp_a', async_setup=lambda hass, config: mock_coro(False)))
+    loader.set_component(hass, 'comp_b', MockModule(
+        'comp_b', dependencies=['comp_a']))
+    hass.config.config_dir = None
+
+    await bootstrap._async_setup_components(
+        hass, {}, {'comp_b', 'comp_unknown'})
+
+    assert hass.config.components == set()
+    assert {entry['component']: entry['success'] for entry
+            in hass.data[bootstrap.DATA_STARTUP_TIMELINE]} == {
+                'comp_a': False, 'comp_b': False, 'comp_unknown': False}
+
+
 def test_from_config_dict_not_mount_deps_folder(loop):
     """Test that we do not mount the deps folder inside from_config_dict."""
     with patch('homeassistant.bootstrap.is_virtual_env', return_value=False), \
@@ -1,6 +1,7 @@
 """Test to verify that Home Assistant core works."""
 # pylint: disable=protected-access
 import asyncio
+import json
 import logging
 import os
 import unittest
@@ -470,6 +471,19 @@ class TestState(unittest.TestCase):
         state = ha.State('domain.hello', 'world', {'some': 'attr'})
         self.assertEqual(state, ha.State.from_dict(state.as_dict()))
 
+    def test_json_conversion(self):
+        """Test states outside the state machine are encoded every time."""
+        state = ha.State('domain.hello', 'world', {'some': 'attr'})
+        encoded = state.as_json()
+        self.assertEqual(
+            state, ha.State.from_dict(json.loads(encoded)))
+
+        state.last_changed = state.last_updated = \
+            datetime(2018, 1, 1, tzinfo=dt_util.UTC)
+        self.assertEqual(
+            '2018-01-01T00:00:00+00:00',
+            json.loads(state.as_json())['last_changed'])
+
     def test_dict_conversion_with_wrong_data(self):
         """Test conversion with wrong data."""
         self.assertIsNone(ha.State.from_dict(None))
@@ -506,6 +520,19 @@ class TestStateMachine(unittest.TestCase):
         """Stop down stuff we started."""
         self.hass.stop()
 
+    def test_json_conversion_cached(self):
+        """Test the JSON encoding of the states is cached."""
+        state = self.states.get('light.Bowl')
+
+        with patch('homeassistant.core.json_dumps',
+                   side_effect=ha.json_dumps) as mock_dumps:
+            encoded = state.as_json()
+            self.assertIs(encoded, state.as_json())
+
+        self.assertEqual(1, mock_dumps.call_count)
+        self.assertEqual(
+            state, ha.State.from_dict(json.loads(encoded)))
+
     def test_is_state(self):
         """Test is_state method."""
         self.assertTrue(self.states.is_state('light.Bowl', 'on'))
@@ -523,6 +550,9 @@ class TestStateMachine(unittest.TestCase):
         self.assertEqual(1, len(ent_ids))
         self.assertTrue('light.bowl' in ent_ids)
 
+        self.states.set('lights.bowl', 'on')
+        self.assertEqual(['light.bowl'], self.states.entity_ids('Light'))
+
     def test_all(self):
         """Test everything."""
         states = sorted(state.entity_id for state in self.states.all())
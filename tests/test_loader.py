@@ -1,7 +1,10 @@
 """Test to verify that we can load components."""
 # pylint: disable=protected-access
 import asyncio
+import importlib
+import os
 import unittest
+from unittest.mock import patch
 
 import pytest
 
@@ -134,3 +137,84 @@ async def test_log_warning_custom_component(hass, caplog):
 
     loader.get_component(hass, 'light.test')
     assert 'You are using a custom component for light.test' in caplog.text
+
+
+def test_component_index(tmpdir):
+    """Test the component index is cached until a directory changes."""
+    config_dir = str(tmpdir)
+    platforms = tmpdir.mkdir('custom_components').mkdir('switch')
+    platforms.join('mine.py').write('')
+    platforms.join('README.md').write('')
+
+    custom, builtin = loader._load_component_index(config_dir)
+    assert custom == {'switch.mine'}
+    assert 'http' in builtin
+    assert 'light.hue' in builtin
+    assert tmpdir.join(loader.COMPONENT_INDEX_FILE).check()
+
+    with patch('homeassistant.loader._scan_components') as mock_scan:
+        assert loader._load_component_index(config_dir) == [custom, builtin]
+    assert not mock_scan.called
+
+    # A new file changes the modification time of its directory
+    with patch('homeassistant.loader._mtime',
+               side_effect=lambda path: 0 if path == str(platforms)
+               else os.stat(path).st_mtime):
+        platforms.join('other.py').write('')
+        custom, _ = loader._load_component_index(config_dir)
+    assert custom == {'switch.mine', 'switch.other'}
+
+
+def test_component_index_suffixes(tmpdir):
+    """Test the component index includes modules without source."""
+    root = tmpdir.mkdir('custom_components')
+    root.join('compiled.pyc').write('')
+    root.join('extension.cpython-36m-x86_64-linux-gnu.so').write('')
+    root.mkdir('package').join('__init__.pyc').write('')
+    root.mkdir('not_a_package').join('module.py').write('')
+    root.join('README.md').write('')
+
+    with patch('importlib.machinery.all_suffixes',
+               return_value=['.py', '.pyc',
+                             '.cpython-36m-x86_64-linux-gnu.so', '.so']):
+        custom, _ = loader._load_component_index(str(tmpdir))
+
+    assert custom == {'compiled', 'extension', 'package',
+                      'not_a_package.module'}
+
+
+async def test_get_component_skips_unknown_paths(hass):
+    """Test only the paths in the component index are imported."""
+    with patch('importlib.import_module',
+               side_effect=importlib.import_module) as mock_import:
+        assert loader.get_component(hass, 'light.hue') is not None
+        assert loader.get_component(hass, 'light.test') is not None
+        assert loader.get_component(hass, 'light.non_existing') is None
+
+    assert [call[1][0] for call in mock_import.mock_calls] == [
+        'homeassistant.components.light.hue',
+        'custom_components.light.test',
+    ]
+
+
+async def test_preload_components(hass, caplog):
+    """Test preloading components in the executor."""
+    await loader.async_preload_components(
+        hass, ['http', 'light.hue', 'light.non_existing'])
+
+    cache = hass.data[loader.DATA_KEY]
+    assert cache['http'] is http
+    assert 'light.hue' in cache
+    assert 'light.non_existing' not in cache
+    assert 'Unable to find component' not in caplog.text
+
+
+async def test_preload_components_error(hass, caplog):
+    """Test errors other than import errors are logged when preloading."""
+    with patch('importlib.import_module',
+               side_effect=SyntaxError('invalid syntax')):
+        await loader.async_preload_components(hass, ['light.hue'])
+
+    assert 'light.hue' not in hass.data[loader.DATA_KEY]
+    assert 'Error preloading light.hue' in caplog.text
+    assert 'invalid syntax' in caplog.text
@@ -0,0 +1,69 @@
+"""Test the startup profiler."""
+from unittest.mock import patch
+
+from homeassistant import loader, profiler as profiler_util
+from homeassistant.setup import async_setup_component
+
+from tests.common import MockModule, mock_coro
+
+
+def test_profile_disabled(hass):
+    """Test nothing is recorded when startup is not profiled."""
+    with profiler_util.profile(hass, profiler_util.CATEGORY_SETUP, 'light'):
+        pass
+
+    assert profiler_util.DATA_PROFILER not in hass.data
+
+
+def test_profile_records_spans(hass):
+    """Test spans are recorded until the profiler is finished."""
+    profiler = hass.data[profiler_util.DATA_PROFILER] = \
+        profiler_util.StartupProfiler()
+
+    with profiler_util.profile(hass, profiler_util.CATEGORY_IMPORT, 'light'):
+        pass
+    with profiler_util.profile(hass, profiler_util.CATEGORY_SETUP, 'light'):
+        pass
+    with profiler_util.profile(hass, profiler_util.CATEGORY_PLATFORM,
+                               'light.demo'):
+        pass
+
+    profiler.finish()
+
+    with profiler_util.profile(hass, profiler_util.CATEGORY_SETUP, 'switch'):
+        pass
+
+    data = profiler.as_dict()
+    assert data['finished'] is True
+    assert data['total'] >= 0
+    assert set(data['durations']) == {'light', 'light.demo'}
+    assert set(data['durations']['light']) == {'import', 'setup'}
+
+    trace = profiler.as_trace()
+    assert trace['displayTimeUnit'] == 'ms'
+    events = trace['traceEvents']
+    assert [(event['ph'], event['name'], event['tid'])
+            for event in events] == [
+                ('M', 'thread_name', 1), ('X', 'import', 1),
+                ('X', 'setup', 1), ('M', 'thread_name', 2),
+                ('X', 'platform', 2)]
+    assert events[0]['args'] == {'name': 'light'}
+    assert events[4]['args']['name'] == 'light.demo'
+    assert all(event['ts'] >= 0 and event['dur'] >= 0
+               for event in events if event['ph'] == 'X')
+
+
+async def test_profile_component_setup(hass):
+    """Test the steps of a component setup are profiled."""
+    profiler = hass.data[profiler_util.DATA_PROFILER] = \
+        profiler_util.StartupProfiler()
+    loader.set_component(hass, 'comp', MockModule(
+        'comp', requirements=['package==1.0']))
+    hass.config.skip_pip = False
+
+    with patch('homeassistant.setup.requirements.async_process_requirements',
+               return_value=mock_coro(True)):
+        assert await async_setup_component(hass, 'comp', {})
+
+    assert set(profiler.as_dict()['durations']['comp']) == {
+        'config', 'requirements', 'setup'}
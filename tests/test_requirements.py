@@ -4,7 +4,8 @@ from unittest.mock import patch, call
 
 from homeassistant import loader, setup
 from homeassistant.requirements import (
-    CONSTRAINT_FILE, PackageLoadable, async_process_requirements)
+    CONSTRAINT_FILE, REQUIREMENTS_INDEX_FILE, PackageLoadable,
+    async_process_requirements)
 
 import pkg_resources
 
@@ -108,18 +109,81 @@ async def test_package_loadable_installed_twice(hass):
     """
     v1 = pkg_resources.Distribution(project_name='hello', version='1.0.0')
     v2 = pkg_resources.Distribution(project_name='hello', version='2.0.0')
-
-    with patch('pkg_resources.find_distributions', side_effect=[[v1]]):
-        assert not await PackageLoadable(hass).loadable('hello==2.0.0')
-
-    with patch('pkg_resources.find_distributions', side_effect=[[v1], [v2]]):
-        assert not await PackageLoadable(hass).loadable('hello==2.0.0')
-
-    with patch('pkg_resources.find_distributions', side_effect=[[v2], [v1]]):
-        assert await PackageLoadable(hass).loadable('hello==2.0.0')
-
-    with patch('pkg_resources.find_distributions', side_effect=[[v2]]):
-        assert await PackageLoadable(hass).loadable('hello==2.0.0')
-
-    with patch('pkg_resources.find_distributions', side_effect=[[v2]]):
-        assert await PackageLoadable(hass).loadable('Hello==2.0.0')
+    # Don't cache the versions on disk
+    hass.config.config_dir = None
+
+    with patch('sys.path', ['path1', 'path2']):
+        with patch('pkg_resources.find_distributions',
+                   side_effect=[[v1], []]):
+            assert not await PackageLoadable(hass).loadable('hello==2.0.0')
+
+        with patch('pkg_resources.find_distributions',
+                   side_effect=[[v1], [v2]]):
+            assert not await PackageLoadable(hass).loadable('hello==2.0.0')
+
+        with patch('pkg_resources.find_distributions',
+                   side_effect=[[v2], [v1]]):
+            assert await PackageLoadable(hass).loadable('hello==2.0.0')
+
+        with patch('pkg_resources.find_distributions',
+                   side_effect=[[v2], []]):
+            assert await PackageLoadable(hass).loadable('hello==2.0.0')
+
+        with patch('pkg_resources.find_distributions',
+                   side_effect=[[v2], []]):
+            assert await PackageLoadable(hass).loadable('Hello==2.0.0')
+
+
+async def test_package_loadable_cached(hass, tmpdir):
+    """Test the installed versions are cached until packages change."""
+    hass.config.config_dir = str(tmpdir)
+    site_packages = tmpdir.mkdir('site-packages')
+    site_packages.mkdir('hello-1.0.0.dist-info')
+    hello = pkg_resources.Distribution(project_name='hello', version='1.0.0')
+
+    with patch('sys.path', [str(site_packages)]):
+        with patch('pkg_resources.find_distributions',
+                   return_value=[hello]) as mock_find:
+            pkg_cache = PackageLoadable(hass)
+            assert await pkg_cache.loadable('hello==1.0.0')
+            assert not await pkg_cache.loadable('world==1.0.0')
+        assert len(mock_find.mock_calls) == 1
+        assert tmpdir.join(REQUIREMENTS_INDEX_FILE).check()
+
+        # A new instance uses the cache in the config dir
+        with patch('pkg_resources.find_distributions') as mock_find:
+            assert await PackageLoadable(hass).loadable('hello==1.0.0')
+        assert len(mock_find.mock_calls) == 0
+
+        # Installing a package adds a metadata directory
+        site_packages.mkdir('world-1.0.0.dist-info')
+        world = pkg_resources.Distribution(
+            project_name='world', version='1.0.0')
+        with patch('pkg_resources.find_distributions',
+                   return_value=[hello, world]) as mock_find:
+            pkg_cache.invalidate()
+            assert await pkg_cache.loadable('world==1.0.0')
+        assert len(mock_find.mock_calls) == 1
+
+
+async def test_package_loadable_cached_config_dir_changes(hass, tmpdir):
+    """Test files written to the config dir keep the cache valid."""
+    hass.config.config_dir = str(tmpdir)
+    site_packages = tmpdir.mkdir('site-packages')
+    site_packages.mkdir('hello-1.0.0.dist-info')
+    hello = pkg_resources.Distribution(project_name='hello', version='1.0.0')
+
+    # The loader puts the config dir on sys.path
+    with patch('sys.path', [str(tmpdir), str(site_packages)]):
+        with patch('pkg_resources.find_distributions',
+                   side_effect=[[], [hello]]) as mock_find:
+            assert await PackageLoadable(hass).loadable('hello==1.0.0')
+        assert len(mock_find.mock_calls) == 2
+
+        tmpdir.join('home-assistant_v2.db-journal').write('')
+        tmpdir.join('home-assistant_v2.db-journal').remove()
+        tmpdir.join('.component_index.json').write('{}')
+
+        with patch('pkg_resources.find_distributions') as mock_find:
+            assert await PackageLoadable(hass).loadable('hello==1.0.0')
+        assert len(mock_find.mock_calls) == 0
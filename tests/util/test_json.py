@@ -0,0 +1,132 @@
+"""Test Home Assistant JSON utility functions."""
+import json
+import math
+import os
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.core import State
+from homeassistant.util import json as json_util
+from homeassistant.util import dt as dt_util
+
+TEST_DATA = {
+    'key': 'value',
+    'list': [1, 2.5, None, True],
+    'nested': {'b': 1, 'a': 2},
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request):
+    """Run the test with orjson and the json module."""
+    if request.param == 'json':
+        with patch.object(json_util, 'orjson', None):
+            yield request.param
+    else:
+        if json_util.orjson is None:
+            pytest.skip('orjson is not installed')
+        yield request.param
+
+
+def test_json_dumps(backend):
+    """Test encoding supported objects."""
+    now = dt_util.utcnow()
+    state = State('light.kitchen', 'on')
+
+    assert json.loads(json_util.json_dumps({
+        'time': now,
+        'set': {1},
+        'state': state,
+    })) == {
+        'time': now.isoformat(),
+        'set': [1],
+        'state': json.loads(state.as_json()),
+    }
+
+
+def test_json_dumps_sort_keys(backend):
+    """Test the keys are sorted on request."""
+    assert json_util.json_dumps(TEST_DATA, sort_keys=True) == \
+        json.dumps(TEST_DATA, sort_keys=True, separators=(',', ':'))
+
+
+def test_json_dumps_non_string_keys(backend):
+    """Test keys that are not strings are encoded like the json module."""
+    assert json_util.json_dumps({1: 'one'}) == '{"1":"one"}'
+
+
+def test_json_dumps_non_finite(backend):
+    """Test floats that are not finite are encoded as null."""
+    state = State('sensor.temperature', 'unknown', {'value': float('nan')})
+
+    assert json.loads(json_util.json_dumps({
+        'nan': float('nan'),
+        'list': [float('inf'), 1.5],
+        'nested': {'inf': float('-inf')},
+        'state': state,
+    })) == {
+        'nan': None,
+        'list': [None, 1.5],
+        'nested': {'inf': None},
+        'state': json.loads(state.as_json()),
+    }
+    assert json.loads(state.as_json())['attributes'] == {'value': None}
+
+
+def test_json_dumps_unsupported(backend):
+    """Test unsupported objects raise TypeError."""
+    with patch('json.dumps', side_effect=json.dumps) as mock_dumps, \
+            pytest.raises(TypeError):
+        json_util.json_dumps({'object': object()})
+
+    # orjson doesn't retry with the json module
+    assert mock_dumps.called == (backend == 'json')
+
+
+def test_json_loads(backend):
+    """Test decoding JSON."""
+    assert json_util.json_loads(json.dumps(TEST_DATA)) == TEST_DATA
+    assert json_util.json_loads(json.dumps(TEST_DATA).encode()) == TEST_DATA
+
+    with pytest.raises(ValueError):
+        json_util.json_loads('{')
+
+
+def test_save_and_load_json(backend):
+    """Test saving readable and compact JSON files."""
+    with TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'test.json')
+
+        json_util.save_json(path, TEST_DATA)
+        with open(path) as fdesc:
+            assert '\n    "key"' in fdesc.read()
+        assert json_util.load_json(path) == TEST_DATA
+
+        json_util.save_json(path, TEST_DATA, compact=True)
+        with open(path) as fdesc:
+            assert '\n' not in fdesc.read()
+        assert json_util.load_json(path) == TEST_DATA
+
+
+def test_save_and_load_json_nan(backend):
+    """Test floats that are not finite survive saving and loading."""
+    with TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'test.json')
+
+        json_util.save_json(path, {'nan': float('nan'), 'inf': float('inf')})
+        data = json_util.load_json(path)
+
+    assert math.isnan(data['nan'])
+    assert data['inf'] == float('inf')
+
+
+def test_save_json_unsupported(backend):
+    """Test saving data that can't be encoded."""
+    with TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'test.json')
+
+        for compact in (False, True):
+            with pytest.raises(json_util.SerializationError):
+                json_util.save_json(path, {'object': object()}, compact)